@@ -6,13 +6,21 @@ class StatsAnalyzer(Analyzer):
     """Computes RasterStats against the entire scene set.
     """
 
-    def __init__(self, stats_uri, sample_prob=None):
+    def __init__(self,
+                 stats_uri,
+                 sample_prob=None,
+                 num_workers=1,
+                 histograms=False):
         self.stats_uri = stats_uri
         self.sample_prob = sample_prob
+        self.num_workers = num_workers
+        self.histograms = histograms
 
     def process(self, scenes, tmp_dir):
         stats = RasterStats()
         stats.compute(
             list(map(lambda s: s.raster_source, scenes)),
-            sample_prob=self.sample_prob)
+            sample_prob=self.sample_prob,
+            num_workers=self.num_workers,
+            histograms=self.histograms)
         stats.save(self.stats_uri)
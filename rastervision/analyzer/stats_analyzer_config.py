@@ -8,15 +8,22 @@ from rastervision.protos.analyzer_pb2 import AnalyzerConfig as AnalyzerConfigMsg
 
 
 class StatsAnalyzerConfig(AnalyzerConfig):
-    def __init__(self, stats_uri=None, sample_prob=None):
+    def __init__(self,
+                 stats_uri=None,
+                 sample_prob=None,
+                 num_workers=1,
+                 histograms=False):
         super().__init__(rv.STATS_ANALYZER)
         self.stats_uri = stats_uri
         self.sample_prob = sample_prob
+        self.num_workers = num_workers
+        self.histograms = histograms
 
     def create_analyzer(self):
         if not self.stats_uri:
             raise rv.ConfigError('stats_uri is not set.')
-        return StatsAnalyzer(self.stats_uri, self.sample_prob)
+        return StatsAnalyzer(self.stats_uri, self.sample_prob,
+                             self.num_workers, self.histograms)
 
     def to_proto(self):
         msg = AnalyzerConfigMsg(analyzer_type=self.analyzer_type)
@@ -24,6 +31,8 @@ class StatsAnalyzerConfig(AnalyzerConfig):
             msg.stats_analyzer_config.stats_uri = self.stats_uri
         msg.stats_analyzer_config.sample_prob = \
             (0.0 if self.sample_prob is None else self.sample_prob)
+        msg.stats_analyzer_config.num_workers = self.num_workers
+        msg.stats_analyzer_config.histograms = self.histograms
         return msg
 
     def save_bundle_files(self, bundle_dir):
@@ -65,7 +74,9 @@ class StatsAnalyzerConfigBuilder(AnalyzerConfigBuilder):
         if prev:
             config = {
                 'stats_uri': prev.stats_uri,
-                'sample_prob': prev.sample_prob
+                'sample_prob': prev.sample_prob,
+                'num_workers': prev.num_workers,
+                'histograms': prev.histograms
             }
         super().__init__(StatsAnalyzerConfig, config)
 
@@ -76,6 +87,8 @@ class StatsAnalyzerConfigBuilder(AnalyzerConfigBuilder):
         sample_prob = msg.stats_analyzer_config.sample_prob
         sample_prob = (None if sample_prob == 0 else sample_prob)
         b = b.with_sample_prob(sample_prob)
+        b = b.with_num_workers(msg.stats_analyzer_config.num_workers)
+        b = b.with_histograms(msg.stats_analyzer_config.histograms)
         return b
 
     def with_stats_uri(self, stats_uri):
@@ -111,3 +124,27 @@ class StatsAnalyzerConfigBuilder(AnalyzerConfigBuilder):
         b = deepcopy(self)
         b.config['sample_prob'] = sample_prob
         return b
+
+    def with_num_workers(self, num_workers):
+        """Set the number of processes used to compute stats.
+
+        Args:
+            num_workers: (int) number of processes. The scenes are split between
+                the processes, and the stats for each are merged.
+        """
+        b = deepcopy(self)
+        b.config['num_workers'] = num_workers
+        return b
+
+    def with_histograms(self, histograms=True):
+        """Set whether to compute a histogram of the values in each channel.
+
+        Histograms can only be computed for rasters with unsigned integer values.
+        They are saved with the stats under the 'histograms' key.
+
+        Args:
+            histograms: (bool)
+        """
+        b = deepcopy(self)
+        b.config['histograms'] = histograms
+        return b
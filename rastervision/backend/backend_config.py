@@ -21,6 +21,15 @@ class BackendConfig(BundledConfigMixin, Config):
         """
         pass
 
+    def predicts_scores(self):
+        """Return True if the backend implements predict_scores.
+
+        Backends that predict the per-class scores of each pixel can be used with
+        the predict_stride option of semantic segmentation, and the score_output
+        option of the semantic segmentation raster store.
+        """
+        return False
+
     def to_builder(self):
         return rv._registry.get_config_builder(rv.BACKEND,
                                                self.backend_type)(self)
@@ -26,6 +26,7 @@ from rastervision.utils.misc import save_img
 from rastervision.backend import Backend
 from rastervision.data.label import ChipClassificationLabels
 from rastervision.utils.misc import terminate_at_exit
+from rastervision.backend.torch_utils.batch_augment import BatchAugmentor
 from rastervision.backend.torch_utils.chip_classification.plot import plot_xy
 from rastervision.backend.torch_utils.chip_classification.data import build_databunch
 from rastervision.backend.torch_utils.chip_classification.train import (
@@ -281,14 +282,24 @@ class PyTorchChipClassification(Backend):
             for _ in range(start_epoch * steps_per_epoch):
                 step_scheduler.step()
 
+        augment = None
+        if self.train_opts.batch_augmentors:
+            augment = BatchAugmentor(self.train_opts.batch_augmentors)
+
         # Training loop.
         for epoch in range(start_epoch, num_epochs):
             # Train one epoch.
             log.info('-----------------------------------------------------')
             log.info('epoch: {}'.format(epoch))
             start = time.time()
-            train_loss = train_epoch(model, self.device, databunch.train_dl,
-                                     opt, loss_fn, step_scheduler)
+            train_loss = train_epoch(
+                model,
+                self.device,
+                databunch.train_dl,
+                opt,
+                loss_fn,
+                step_scheduler,
+                augment=augment)
             if epoch_scheduler:
                 epoch_scheduler.step()
             log.info('train loss: {}'.format(train_loss))
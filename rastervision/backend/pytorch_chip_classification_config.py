@@ -20,7 +20,8 @@ class TrainOptions():
                  debug=None,
                  log_tensorboard=None,
                  run_tensorboard=None,
-                 augmentors=[]):
+                 augmentors=[],
+                 batch_augmentors=[]):
         self.batch_size = batch_size
         self.lr = lr
         self.one_cycle = one_cycle
@@ -31,6 +32,7 @@ class TrainOptions():
         self.log_tensorboard = log_tensorboard
         self.run_tensorboard = run_tensorboard
         self.augmentors = augmentors
+        self.batch_augmentors = batch_augmentors
 
     def __setattr__(self, name, value):
         if name in ['batch_size', 'num_epochs', 'sync_interval']:
@@ -60,7 +62,8 @@ class PyTorchChipClassificationConfigBuilder(SimpleBackendConfigBuilder):
                            debug=False,
                            log_tensorboard=True,
                            run_tensorboard=True,
-                           augmentors=[]):
+                           augmentors=[],
+                           batch_augmentors=[]):
         """Set options for training models.
 
         Args:
@@ -92,6 +95,12 @@ class PyTorchChipClassificationConfigBuilder(SimpleBackendConfigBuilder):
                 'VerticalFlip', 'GaussianBlur', or 'GaussNoise', 'RGBShift', 'ToGray'].
                 These use the default settings for each of the transforms in
                 https://albumentations.readthedocs.io
+            batch_augmentors: (list of str) any of ['HorizontalFlip',
+                'VerticalFlip', 'RandomRotate90', 'RandomResizedCrop',
+                'ColorJitter']. These are applied to whole batches on the
+                training device, which is faster than augmenting each chip in
+                the data loader. Masks and boxes are transformed along with the
+                images.
         """
         b = deepcopy(self)
         b.train_opts = TrainOptions(
@@ -104,7 +113,8 @@ class PyTorchChipClassificationConfigBuilder(SimpleBackendConfigBuilder):
             debug=debug,
             log_tensorboard=log_tensorboard,
             run_tensorboard=run_tensorboard,
-            augmentors=augmentors)
+            augmentors=augmentors,
+            batch_augmentors=batch_augmentors)
         return b
 
     def with_pretrained_uri(self, pretrained_uri):
@@ -25,6 +25,7 @@ from rastervision.utils.files import (get_local_path, make_dir, upload_or_copy,
 from rastervision.utils.misc import save_img, terminate_at_exit
 from rastervision.backend import Backend
 from rastervision.data import ObjectDetectionLabels
+from rastervision.backend.torch_utils.batch_augment import BatchAugmentor
 from rastervision.backend.torch_utils.object_detection.data import build_databunch
 from rastervision.backend.torch_utils.object_detection.plot import plot_xy
 from rastervision.backend.torch_utils.object_detection.model import MyFasterRCNN
@@ -300,14 +301,24 @@ class PyTorchObjectDetection(Backend):
             for _ in range(start_epoch * steps_per_epoch):
                 step_scheduler.step()
 
+        augment = None
+        if self.train_opts.batch_augmentors:
+            augment = BatchAugmentor(self.train_opts.batch_augmentors)
+
         # Training loop.
         for epoch in range(start_epoch, num_epochs):
             # Train one epoch.
             log.info('-----------------------------------------------------')
             log.info('epoch: {}'.format(epoch))
             start = time.time()
-            train_loss = train_epoch(model, self.device, databunch.train_dl,
-                                     opt, step_scheduler, epoch_scheduler)
+            train_loss = train_epoch(
+                model,
+                self.device,
+                databunch.train_dl,
+                opt,
+                step_scheduler,
+                epoch_scheduler,
+                augment=augment)
             if epoch_scheduler:
                 epoch_scheduler.step()
             log.info('train loss: {}'.format(train_loss))
@@ -19,7 +19,8 @@ class TrainOptions():
                  sync_interval=None,
                  log_tensorboard=None,
                  run_tensorboard=None,
-                 debug=None):
+                 debug=None,
+                 batch_augmentors=[]):
         self.batch_size = batch_size
         self.lr = lr
         self.one_cycle = one_cycle
@@ -29,6 +30,7 @@ class TrainOptions():
         self.log_tensorboard = log_tensorboard
         self.run_tensorboard = run_tensorboard
         self.debug = debug
+        self.batch_augmentors = batch_augmentors
 
     def __setattr__(self, name, value):
         if name in ['batch_size', 'num_epochs', 'sync_interval']:
@@ -58,7 +60,8 @@ class PyTorchObjectDetectionConfigBuilder(SimpleBackendConfigBuilder):
                            sync_interval=1,
                            log_tensorboard=True,
                            run_tensorboard=True,
-                           debug=False):
+                           debug=False,
+                           batch_augmentors=[]):
         """Set options for training models.
 
         Args:
@@ -86,6 +89,12 @@ class PyTorchObjectDetectionConfigBuilder(SimpleBackendConfigBuilder):
             debug: (bool) if True, save debug chips (ie. visualizations of
                 input to model during training) during training and use
                 single-core for creating minibatches.
+            batch_augmentors: (list of str) any of ['HorizontalFlip',
+                'VerticalFlip', 'RandomRotate90', 'RandomResizedCrop',
+                'ColorJitter']. These are applied to whole batches on the
+                training device, which is faster than augmenting each chip in
+                the data loader. Masks and boxes are transformed along with the
+                images.
         """
         b = deepcopy(self)
         b.train_opts = TrainOptions(
@@ -97,7 +106,8 @@ class PyTorchObjectDetectionConfigBuilder(SimpleBackendConfigBuilder):
             sync_interval=sync_interval,
             log_tensorboard=log_tensorboard,
             run_tensorboard=run_tensorboard,
-            debug=debug)
+            debug=debug,
+            batch_augmentors=batch_augmentors)
         return b
 
     def with_pretrained_uri(self, pretrained_uri):
@@ -27,13 +27,16 @@ from rastervision.utils.misc import save_img
 from rastervision.backend import Backend
 from rastervision.data.label import SemanticSegmentationLabels
 from rastervision.utils.misc import terminate_at_exit
+from rastervision.backend.torch_utils.batch_augment import BatchAugmentor
 from rastervision.backend.torch_utils.semantic_segmentation.plot import plot_xy
 from rastervision.backend.torch_utils.semantic_segmentation.data import build_databunch
 from rastervision.backend.torch_utils.semantic_segmentation.train import (
-    train_epoch, validate_epoch)
+    train_epoch, validate_epoch, prepare_batch)
 from rastervision.backend.torch_utils.semantic_segmentation.model import (
     get_model)
 from rastervision.backend.torch_utils import jaccard
+from rastervision.backend.torch_utils.shards import (NpyShardWriter,
+                                                     load_shard)
 
 log = logging.getLogger(__name__)
 
@@ -114,6 +117,8 @@ class PyTorchSemanticSegmentation(Backend):
 
         This writes a set of image chips to {scene_id}/img/{scene_id}-{ind}.png
         and corresponding label chips to {scene_id}/labels/{scene_id}-{ind}.png.
+        If the chip_format train option is 'npy', the chips are instead written to
+        the shards {scene_id}/img.npy and {scene_id}/labels.npy.
 
         Args:
             scene: (rv.data.Scene)
@@ -124,6 +129,16 @@ class PyTorchSemanticSegmentation(Backend):
             (str) path to directory with scene chips {tmp_dir}/{scene_id}
         """
         scene_dir = join(tmp_dir, str(scene.id))
+        if self.train_opts.chip_format == 'npy':
+            make_dir(scene_dir)
+            with NpyShardWriter(join(scene_dir, 'img.npy')) as img_writer, \
+                    NpyShardWriter(join(scene_dir, 'labels.npy')) as label_writer:
+                for chip, window, labels in data:
+                    img_writer.write(chip)
+                    label_writer.write(
+                        labels.get_label_arr(window).astype(np.uint8))
+            return scene_dir
+
         img_dir = join(scene_dir, 'img')
         labels_dir = join(scene_dir, 'labels')
 
@@ -150,6 +165,13 @@ class PyTorchSemanticSegmentation(Backend):
         val/img/{scene_id}-{ind}.png
         val/labels/{scene_id}-{ind}.png
 
+        If the chip_format train option is 'npy', this instead writes shards for
+        the group of scenes to:
+        {chip_uri}/{uuid}-train-img.npy
+        {chip_uri}/{uuid}-train-labels.npy
+        {chip_uri}/{uuid}-valid-img.npy
+        {chip_uri}/{uuid}-valid-labels.npy
+
         This method is called once per instance of the chip command.
         A number of instances of the chip command can run simultaneously to
         process chips in parallel. The uuid in the path above is what allows
@@ -164,6 +186,11 @@ class PyTorchSemanticSegmentation(Backend):
         self.log_options()
 
         group = str(uuid.uuid4())
+        if self.train_opts.chip_format == 'npy':
+            self._write_shards(training_results, validation_results, group,
+                               tmp_dir)
+            return
+
         group_uri = join(self.backend_opts.chip_uri, '{}.zip'.format(group))
         group_path = get_local_path(group_uri, tmp_dir)
         make_dir(group_path, use_dirname=True)
@@ -186,6 +213,23 @@ class PyTorchSemanticSegmentation(Backend):
 
         upload_or_copy(group_path, group_uri)
 
+    def _write_shards(self, training_results, validation_results, group,
+                      tmp_dir):
+        for results, split in [(training_results, 'train'),
+                               (validation_results, 'valid')]:
+            for name in ['img', 'labels']:
+                shard_uri = join(self.backend_opts.chip_uri,
+                                 '{}-{}-{}.npy'.format(group, split, name))
+                shard_path = get_local_path(shard_uri, tmp_dir)
+                make_dir(shard_path, use_dirname=True)
+                with NpyShardWriter(shard_path) as writer:
+                    for scene_dir in results:
+                        scene_shard_path = join(scene_dir, name + '.npy')
+                        if isfile(scene_shard_path):
+                            writer.write_all(load_shard(scene_shard_path))
+                if isfile(shard_path):
+                    upload_or_copy(shard_path, shard_uri)
+
     def train(self, tmp_dir):
         """Train a model.
 
@@ -212,13 +256,31 @@ class PyTorchSemanticSegmentation(Backend):
             with zipfile.ZipFile(zip_path, 'r') as zipf:
                 zipf.extractall(chip_dir)
 
+        # Shards are read in place, so they are linked into chip_dir instead.
+        for shard_uri in list_paths(self.backend_opts.chip_uri, 'npy'):
+            shard_path = download_if_needed(shard_uri, tmp_dir)
+            shard_name = basename(shard_path)
+            split = shard_name.split('-')[-2]
+            split_dir = join(chip_dir, split)
+            make_dir(split_dir)
+            link_path = join(split_dir, shard_name)
+            if not os.path.lexists(link_path):
+                os.symlink(os.path.abspath(shard_path), link_path)
+
         # Setup data loader.
         batch_size = self.train_opts.batch_size
         chip_size = self.task_config.chip_size
         class_names = self.class_map.get_class_names()
         augmentors = self.train_opts.augmentors
-        databunch = build_databunch(chip_dir, chip_size, batch_size,
-                                    class_names, augmentors)
+        # Debug chips are made using a single process.
+        num_workers = 0 if self.train_opts.debug else self.train_opts.num_workers
+        databunch = build_databunch(
+            chip_dir,
+            chip_size,
+            batch_size,
+            class_names,
+            augmentors,
+            num_workers=num_workers)
         log.info(databunch)
         num_labels = len(databunch.label_names)
         if self.train_opts.debug:
@@ -297,14 +359,24 @@ class PyTorchSemanticSegmentation(Backend):
             for _ in range(start_epoch * steps_per_epoch):
                 step_scheduler.step()
 
+        augment = None
+        if self.train_opts.batch_augmentors:
+            augment = BatchAugmentor(self.train_opts.batch_augmentors)
+
         # Training loop.
         for epoch in range(start_epoch, num_epochs):
             # Train one epoch.
             log.info('-----------------------------------------------------')
             log.info('epoch: {}'.format(epoch))
             start = time.time()
-            train_loss = train_epoch(model, self.device, databunch.train_dl,
-                                     opt, loss_fn, step_scheduler)
+            train_loss = train_epoch(
+                model,
+                self.device,
+                databunch.train_dl,
+                opt,
+                loss_fn,
+                step_scheduler,
+                augment=augment)
             if epoch_scheduler:
                 epoch_scheduler.step()
             log.info('train loss: {}'.format(train_loss))
@@ -370,31 +442,48 @@ class PyTorchSemanticSegmentation(Backend):
                 torch.load(model_path, map_location=self.device))
             self.model = model
 
+    def _predict_logits(self, chips, tmp_dir):
+        self.load_model(tmp_dir)
+
+        chips = torch.from_numpy(np.ascontiguousarray(chips))
+        chips = chips.permute((0, 3, 1, 2))
+        if chips.dtype != torch.uint8:
+            chips = chips.float() / 255.
+        chips, _ = prepare_batch(chips, None, self.device)
+        model = self.model.eval()
+
+        with torch.no_grad():
+            return model(chips)['out']
+
     def predict(self, chips, windows, tmp_dir):
-        """Return a prediction for a single chip.
+        """Return predictions for a batch of chips.
 
         Args:
-            chips: (numpy.ndarray) of shape (1, height, width, nb_channels)
-                containing a single imagery chip
-            windows: List containing a single (Box) window which is aligned
-                with the chip
+            chips: (numpy.ndarray) of shape (n, height, width, nb_channels)
+                containing a batch of imagery chips
+            windows: List of n (Box) windows which are aligned with the chips
 
         Return:
             (SemanticSegmentationLabels) containing predictions
         """
-        self.load_model(tmp_dir)
+        out = self._predict_logits(chips, tmp_dir).argmax(1)
+        out = out.to(torch.uint8).cpu().numpy()
 
-        chips = torch.Tensor(chips).permute((0, 3, 1, 2)) / 255.
-        chips = chips.to(self.device)
-        model = self.model.eval()
+        labels = SemanticSegmentationLabels()
+        for window, label_arr in zip(windows, out):
+            labels.set_label_arr(window, label_arr)
+        return labels
 
-        with torch.no_grad():
-            out = model(chips)['out'].cpu()
+    def predict_scores(self, chips, windows, tmp_dir):
+        """Return the softmax scores for each class for a batch of chips.
 
-        def label_fn(_window):
-            if _window == windows[0]:
-                return out[0].argmax(0).squeeze().numpy()
-            else:
-                raise ValueError('Trying to get labels for unknown window.')
+        Args:
+            chips: (numpy.ndarray) of shape (n, height, width, nb_channels)
+                containing a batch of imagery chips
+            windows: List of n (Box) windows which are aligned with the chips
 
-        return SemanticSegmentationLabels(windows, label_fn)
+        Return:
+            (numpy.ndarray) of shape (n, height, width, num_classes)
+        """
+        out = self._predict_logits(chips, tmp_dir)
+        return out.softmax(1).permute((0, 2, 3, 1)).cpu().numpy()
@@ -21,7 +21,10 @@ class TrainOptions():
                  debug=None,
                  log_tensorboard=None,
                  run_tensorboard=None,
-                 augmentors=[]):
+                 augmentors=[],
+                 chip_format='png',
+                 num_workers=4,
+                 batch_augmentors=[]):
         self.batch_size = batch_size
         self.lr = lr
         self.one_cycle = one_cycle
@@ -33,9 +36,14 @@ class TrainOptions():
         self.log_tensorboard = log_tensorboard
         self.run_tensorboard = run_tensorboard
         self.augmentors = augmentors
+        self.chip_format = chip_format
+        self.num_workers = num_workers
+        self.batch_augmentors = batch_augmentors
 
     def __setattr__(self, name, value):
-        if name in ['batch_size', 'num_epochs', 'sync_interval']:
+        if name in [
+                'batch_size', 'num_epochs', 'sync_interval', 'num_workers'
+        ]:
             value = int(value) if isinstance(value, float) else value
         super().__setattr__(name, value)
 
@@ -45,6 +53,9 @@ class PyTorchSemanticSegmentationConfig(SimpleBackendConfig):
     backend_type = PYTORCH_SEMANTIC_SEGMENTATION
     backend_class = PyTorchSemanticSegmentation
 
+    def predicts_scores(self):
+        return True
+
 
 class PyTorchSemanticSegmentationConfigBuilder(SimpleBackendConfigBuilder):
     config_class = PyTorchSemanticSegmentationConfig
@@ -52,6 +63,17 @@ class PyTorchSemanticSegmentationConfigBuilder(SimpleBackendConfigBuilder):
     def _applicable_tasks(self):
         return [rv.SEMANTIC_SEGMENTATION]
 
+    def validate(self):
+        super().validate()
+
+        chip_format = self.train_opts.chip_format
+        if chip_format not in ['png', 'npy']:
+            raise rv.ConfigError(
+                "chip_format must be 'png' or 'npy', got {}".format(
+                    chip_format))
+
+        return True
+
     def with_train_options(self,
                            batch_size=8,
                            lr=1e-4,
@@ -63,7 +85,10 @@ class PyTorchSemanticSegmentationConfigBuilder(SimpleBackendConfigBuilder):
                            debug=False,
                            log_tensorboard=True,
                            run_tensorboard=True,
-                           augmentors=[]):
+                           augmentors=[],
+                           chip_format='png',
+                           num_workers=4,
+                           batch_augmentors=[]):
         """Set options for training models.
 
         Args:
@@ -90,6 +115,18 @@ class PyTorchSemanticSegmentationConfigBuilder(SimpleBackendConfigBuilder):
             run_tensorboard: (bool) if True, run a Tensorboard server at
                 port 6006 that uses the logs generated by the log_tensorboard
                 option
+            chip_format: (str) format to store training chips in. 'png' stores
+                a PNG file per chip and label in zip files. 'npy' stores the chips
+                and labels in a few uncompressed .npy shards, which are read
+                in place during training without extracting them.
+            num_workers: (int) number of processes used to load training data.
+                If 0 or if debug is True, data is loaded in the main process.
+            batch_augmentors: (list of str) any of ['HorizontalFlip',
+                'VerticalFlip', 'RandomRotate90', 'RandomResizedCrop',
+                'ColorJitter']. These are applied to whole batches on the
+                training device, which is faster than augmenting each chip in
+                the data loader. Masks and boxes are transformed along with the
+                images.
         """
         b = deepcopy(self)
         b.train_opts = TrainOptions(
@@ -103,7 +140,10 @@ class PyTorchSemanticSegmentationConfigBuilder(SimpleBackendConfigBuilder):
             debug=debug,
             log_tensorboard=log_tensorboard,
             run_tensorboard=run_tensorboard,
-            augmentors=augmentors)
+            augmentors=augmentors,
+            chip_format=chip_format,
+            num_workers=num_workers,
+            batch_augmentors=batch_augmentors)
         return b
 
     def with_pretrained_uri(self, pretrained_uri):
@@ -745,24 +745,19 @@ class TFDeeplab(Backend):
         """Predict using an already-trained DeepLab model.
 
         Args:
-            chips: An np.ndarray containing the image data in a batch of size 1.
+            chips: An np.ndarray containing a batch of image data.
+            windows: List of windows aligned with the chips.
             tmp_dir: (str) temporary directory to use
 
         Returns:
-             SemanticSegmentationLabels object with predictions for a single chip
+             SemanticSegmentationLabels object with predictions for the chips
         """
         self.load_model(tmp_dir)
-        label_arr = self.sess.run(
-            OUTPUT_TENSOR_NAME, feed_dict={INPUT_TENSOR_NAME: [chips[0]]})[0]
-
-        # Return "trivial" instance of SemanticSegmentationLabels that holds a single
-        # window and has ability to get labels for that one window.
-        def label_fn(_window):
-            if _window == windows[0]:
-                return label_arr
-            else:
-                raise ValueError('Trying to get labels for unknown window.')
-
-        labels = SemanticSegmentationLabels(windows, label_fn)
+        # The exported inference graph only accepts a single image at a time.
+        labels = SemanticSegmentationLabels()
+        for chip, window in zip(chips, windows):
+            label_arr = self.sess.run(
+                OUTPUT_TENSOR_NAME, feed_dict={INPUT_TENSOR_NAME: [chip]})[0]
+            labels.set_label_arr(window, label_arr)
 
         return labels
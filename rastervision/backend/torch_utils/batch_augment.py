@@ -0,0 +1,262 @@
+import inspect
+import logging
+import math
+
+import torch
+import torch.nn.functional as F
+
+from rastervision.backend.torch_utils.object_detection.boxlist import BoxList
+
+log = logging.getLogger(__name__)
+
+BATCH_AUGMENTORS = [
+    'HorizontalFlip', 'VerticalFlip', 'RandomRotate90', 'RandomResizedCrop',
+    'ColorJitter'
+]
+
+# The align_corners argument of affine_grid and grid_sample was added in torch
+# 1.3. Before that, grids always aligned corners.
+_has_align_corners = 'align_corners' in inspect.signature(
+    F.grid_sample).parameters
+
+
+def _crop_offset(start, crop_size, size):
+    """Return the offset of the affine map used to sample a crop along one axis.
+
+    Args:
+        start: tensor with the start of each crop in pixels
+        crop_size: tensor with the size of each crop in pixels
+        size: size of the image in pixels
+    """
+    if _has_align_corners:
+        # -1 and 1 are the edges of the image.
+        return (2 * start + crop_size) / size - 1
+    # -1 and 1 are the centers of the corner pixels, so shift the crop to sample
+    # the same points as when they are the edges.
+    scale = crop_size / size
+    return scale - 1 + (2 * start - 1 + scale) / max(size - 1, 1)
+
+
+def _map_boxlists(boxlists, inds, func):
+    """Replace the BoxLists at inds with the result of func(boxlist)."""
+    if boxlists is None:
+        return None
+    boxlists = list(boxlists)
+    for i in inds.tolist():
+        boxlists[i] = func(boxlists[i])
+    return boxlists
+
+
+def _with_boxes(boxlist, boxes, keep=None):
+    extras = boxlist.extras
+    if keep is not None:
+        boxes = boxes[keep]
+        extras = dict([(k, v[keep]) for k, v in extras.items()])
+    return BoxList(boxes, **extras)
+
+
+class BatchAugmentor():
+    """Randomly augments batches of images on the device that they are on.
+
+    Each augmentation is applied to a random subset of the images in a batch, with
+    its own random parameters for each image. Segmentation masks and detection
+    boxes are transformed along with the images. This runs after the batch is
+    moved to the training device, so the cost is a few tensor operations per batch
+    rather than Python code per sample in the DataLoader.
+
+    Images are float tensors of shape (N, C, H, W) with values between 0 and 1.
+    Masks are tensors of shape (N, H, W), and boxes are BoxLists with boxes in
+    pixel coordinates in ymin, xmin, ymax, xmax order.
+    """
+
+    def __init__(self,
+                 augmentors,
+                 prob=0.5,
+                 crop_scale=(0.5, 1.0),
+                 crop_ratio=(3 / 4, 4 / 3),
+                 jitter=0.1):
+        """Constructor.
+
+        Args:
+            augmentors: list of names of augmentations to apply, from
+                BATCH_AUGMENTORS. Unknown names are ignored with a warning.
+            prob: (float) probability of applying each augmentation to an image
+            crop_scale: (tuple) range of the fraction of the image area that is
+                cropped by RandomResizedCrop
+            crop_ratio: (tuple) range of the aspect ratio of the crops
+            jitter: (float) maximum relative change of brightness, contrast and
+                saturation made by ColorJitter
+        """
+        self.augmentors = []
+        for augmentor in augmentors:
+            if augmentor in BATCH_AUGMENTORS:
+                self.augmentors.append(augmentor)
+            else:
+                log.warning(
+                    '{0} is an unknown batch augmentor. Continuing without '
+                    '{0}. Known batch augmentors are: {1}'.format(
+                        augmentor, BATCH_AUGMENTORS))
+        self.prob = prob
+        self.crop_scale = crop_scale
+        self.crop_ratio = crop_ratio
+        self.jitter = jitter
+
+    def _sample(self, x):
+        """Return the indices of a random subset of images to augment."""
+        selected = torch.rand(x.shape[0], device=x.device) < self.prob
+        return selected.nonzero().view(-1)
+
+    def __call__(self, x, masks=None, boxlists=None):
+        """Augment a batch.
+
+        Args:
+            x: float tensor of images
+            masks: optional tensor of masks
+            boxlists: optional list of BoxLists, one per image
+
+        Returns:
+            (x, masks, boxlists) after augmentation
+        """
+        if not self.augmentors:
+            return x, masks, boxlists
+        x = x.clone()
+        if masks is not None:
+            masks = masks.clone()
+
+        for augmentor in self.augmentors:
+            inds = self._sample(x)
+            if len(inds) == 0:
+                continue
+            if augmentor == 'HorizontalFlip':
+                x, masks, boxlists = self.flip(x, masks, boxlists, inds, -1)
+            elif augmentor == 'VerticalFlip':
+                x, masks, boxlists = self.flip(x, masks, boxlists, inds, -2)
+            elif augmentor == 'RandomRotate90':
+                x, masks, boxlists = self.rotate90(x, masks, boxlists, inds)
+            elif augmentor == 'RandomResizedCrop':
+                x, masks, boxlists = self.resized_crop(x, masks, boxlists,
+                                                       inds)
+            elif augmentor == 'ColorJitter':
+                x = self.color_jitter(x, inds)
+        return x, masks, boxlists
+
+    def flip(self, x, masks, boxlists, inds, dim):
+        height, width = x.shape[-2:]
+        x[inds] = x[inds].flip(dim)
+        if masks is not None:
+            masks[inds] = masks[inds].flip(dim)
+
+        size, cols = (width, [1, 3]) if dim == -1 else (height, [0, 2])
+
+        def flip_boxes(boxlist):
+            boxes = boxlist.boxes.clone()
+            boxes[:, cols] = size - boxlist.boxes[:, cols[::-1]]
+            return _with_boxes(boxlist, boxes)
+
+        return x, masks, _map_boxlists(boxlists, inds, flip_boxes)
+
+    def rotate90(self, x, masks, boxlists, inds):
+        height, width = x.shape[-2:]
+        if height != width:
+            # Rotating non-square images would change the shape of the batch.
+            return x, masks, boxlists
+
+        # Rotate each image counterclockwise by 1, 2 or 3 quarter turns.
+        turns = torch.randint(1, 4, (len(inds), ), device=x.device)
+        for k in range(1, 4):
+            k_inds = inds[turns == k]
+            if len(k_inds) == 0:
+                continue
+            x[k_inds] = torch.rot90(x[k_inds], k, dims=(-2, -1))
+            if masks is not None:
+                masks[k_inds] = torch.rot90(masks[k_inds], k, dims=(-2, -1))
+
+            def rotate_boxes(boxlist):
+                boxes = boxlist.boxes
+                for _ in range(k):
+                    # A point (y, x) moves to (size - x, y).
+                    boxes = torch.stack(
+                        [
+                            width - boxes[:, 3], boxes[:, 0],
+                            width - boxes[:, 1], boxes[:, 2]
+                        ],
+                        dim=1)
+                return _with_boxes(boxlist, boxes)
+
+            boxlists = _map_boxlists(boxlists, k_inds, rotate_boxes)
+        return x, masks, boxlists
+
+    def resized_crop(self, x, masks, boxlists, inds):
+        height, width = x.shape[-2:]
+        num = len(inds)
+        device = x.device
+
+        # Sample the size and position of a crop for each image in pixels.
+        area = torch.empty(num, device=device).uniform_(*self.crop_scale)
+        log_ratio = torch.empty(
+            num, device=device).uniform_(
+                math.log(self.crop_ratio[0]), math.log(self.crop_ratio[1]))
+        ratio = torch.exp(log_ratio)
+        crop_w = torch.sqrt(area * height * width * ratio).clamp(1, width)
+        crop_h = torch.sqrt(area * height * width / ratio).clamp(1, height)
+        x0 = torch.rand(num, device=device) * (width - crop_w)
+        y0 = torch.rand(num, device=device) * (height - crop_h)
+
+        # Affine maps from normalized output coordinates to normalized input
+        # coordinates.
+        theta = torch.zeros((num, 2, 3), device=device)
+        theta[:, 0, 0] = crop_w / width
+        theta[:, 0, 2] = _crop_offset(x0, crop_w, width)
+        theta[:, 1, 1] = crop_h / height
+        theta[:, 1, 2] = _crop_offset(y0, crop_h, height)
+        kwargs = {'align_corners': False} if _has_align_corners else {}
+        out_shape = (num, x.shape[1], height, width)
+        grid = F.affine_grid(theta, out_shape, **kwargs)
+        grid = grid.to(x.dtype)
+
+        x[inds] = F.grid_sample(x[inds], grid, mode='bilinear', **kwargs)
+        if masks is not None:
+            crop_masks = F.grid_sample(
+                masks[inds].unsqueeze(1).to(x.dtype),
+                grid,
+                mode='nearest',
+                **kwargs)
+            masks[inds] = crop_masks.squeeze(1).round().to(masks.dtype)
+
+        if boxlists is not None:
+            boxlists = list(boxlists)
+            crops = torch.stack([y0, x0, crop_h, crop_w], dim=1).tolist()
+            for i, (top, left, h, w) in zip(inds.tolist(), crops):
+                boxlist = boxlists[i]
+                boxes = boxlist.boxes.clone()
+                boxes[:, [0, 2]] = (
+                    (boxes[:, [0, 2]] - top) * height / h).clamp(0, height)
+                boxes[:, [1, 3]] = (
+                    (boxes[:, [1, 3]] - left) * width / w).clamp(0, width)
+                # Drop boxes that are outside of the crop.
+                keep = ((boxes[:, 2] > boxes[:, 0]) &
+                        (boxes[:, 3] > boxes[:, 1]))
+                boxlists[i] = _with_boxes(boxlist, boxes, keep)
+        return x, masks, boxlists
+
+    def color_jitter(self, x, inds):
+        num = len(inds)
+        shape = (num, 1, 1, 1)
+        imgs = x[inds]
+
+        def factors():
+            return torch.empty(
+                shape, device=x.device, dtype=x.dtype).uniform_(
+                    1 - self.jitter, 1 + self.jitter)
+
+        imgs = imgs * factors()
+        mean = imgs.mean(dim=(1, 2, 3), keepdim=True)
+        imgs = (imgs - mean) * factors() + mean
+        if imgs.shape[1] == 3:
+            weights = torch.tensor(
+                [0.299, 0.587, 0.114], device=x.device, dtype=x.dtype).view(
+                    1, 3, 1, 1)
+            gray = (imgs * weights).sum(dim=1, keepdim=True)
+            imgs = (imgs - gray) * factors() + gray
+        x[inds] = imgs.clamp(0, 1)
+        return x
@@ -5,7 +5,13 @@ from rastervision.backend.torch_utils.metrics import (compute_conf_mat_metrics,
                                                       compute_conf_mat)
 
 
-def train_epoch(model, device, data_loader, opt, loss_fn, step_scheduler=None):
+def train_epoch(model,
+                device,
+                data_loader,
+                opt,
+                loss_fn,
+                step_scheduler=None,
+                augment=None):
     model.train()
     total_loss = 0.0
     num_samples = 0
@@ -14,6 +20,8 @@ def train_epoch(model, device, data_loader, opt, loss_fn, step_scheduler=None):
         for batch_ind, (x, y) in enumerate(bar):
             x = x.to(device)
             y = y.to(device)
+            if augment:
+                x, _, _ = augment(x)
 
             opt.zero_grad()
             out = model(x)
@@ -16,7 +16,8 @@ def train_epoch(model,
                 data_loader,
                 opt,
                 step_scheduler=None,
-                epoch_scheduler=None):
+                epoch_scheduler=None,
+                augment=None):
     model.train()
     train_loss = defaultdict(lambda: 0.0)
     num_samples = 0
@@ -25,6 +26,8 @@ def train_epoch(model,
         for batch_ind, (x, y) in enumerate(bar):
             x = x.to(device)
             y = [_y.to(device) for _y in y]
+            if augment:
+                x, _, y = augment(x, boxlists=y)
 
             opt.zero_grad()
             loss_dict = model(x, y)
@@ -4,22 +4,37 @@ import glob
 
 import numpy as np
 from PIL import Image
-import torchvision
+import torch
 from torch.utils.data import DataLoader, Dataset
 from albumentations.augmentations.transforms import RandomSizedCrop
 
 from rastervision.backend.torch_utils.data import DataBunch
-
+from rastervision.backend.torch_utils.shards import load_shard
 
 log = logging.getLogger(__name__)
 
 
 class ToTensor(object):
-    def __init__(self):
-        self.to_tensor = torchvision.transforms.ToTensor()
+    """Convert an image and its labels to uint8 tensors.
+
+    The image is converted to CHW order. The arrays are not copied when possible,
+    and converting the image to floats and the labels to longs is left to
+    prepare_batch, which does it for a whole batch on the training device.
+    """
 
     def __call__(self, x, y):
-        return (self.to_tensor(x), (255 * self.to_tensor(y)).squeeze().long())
+        x = np.asarray(x)
+        if x.ndim == 2:
+            x = x[:, :, np.newaxis]
+        x = torch.from_numpy(_writeable(x)).permute(2, 0, 1)
+        y = torch.from_numpy(_writeable(np.asarray(y)))
+        return (x, y)
+
+
+def _writeable(arr):
+    # torch.from_numpy warns about arrays that aren't writeable, such as arrays
+    # from PIL images.
+    return arr if arr.flags.writeable else arr.copy()
 
 
 class HandlerRandomSizedCrop:
@@ -64,20 +79,87 @@ class SegmentationDataset(Dataset):
         return len(self.img_paths)
 
 
-def build_databunch(data_dir, img_sz, batch_sz, class_names, augmentors):
-    # set to zero to prevent "dataloader is killed by signal"
-    # TODO fix this
-    num_workers = 0
+class ShardSegmentationDataset(Dataset):
+    """Dataset of chips and labels stored in shards written by NpyShardWriter.
+
+    The data_dir contains {name}-img.npy shards of chips, and {name}-labels.npy
+    shards with the corresponding labels. The shards are memory-mapped, so chips
+    are read directly from them. They are mapped copy-on-write, so that samples
+    are views of the shards that can be converted to tensors without copying.
+    Transforms shouldn't modify samples in place, since changes are kept in the
+    mapping for the rest of the process, though they are never written to the
+    shards.
+    """
+
+    def __init__(self, data_dir, transforms=None):
+        self.data_dir = data_dir
+        self.img_paths = sorted(glob.glob(join(data_dir, '*-img.npy')))
+        self.label_paths = [
+            p[:-len('-img.npy')] + '-labels.npy' for p in self.img_paths
+        ]
+        self.transforms = transforms
+        self.shards = None
+        lengths = [len(load_shard(p)) for p in self.img_paths]
+        self.shard_ends = np.cumsum(lengths)
+
+    def _get_shards(self):
+        # The shards are mapped lazily, so that each DataLoader worker maps them
+        # instead of receiving a copy.
+        if self.shards is None:
+            self.shards = [(load_shard(img_path, mmap_mode='c'),
+                            load_shard(label_path, mmap_mode='c'))
+                           for img_path, label_path in zip(
+                               self.img_paths, self.label_paths)]
+        return self.shards
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['shards'] = None
+        return state
+
+    def __getitem__(self, ind):
+        if ind < 0 or ind >= len(self):
+            raise IndexError('{} is out of range'.format(ind))
+        shard_ind = int(np.searchsorted(self.shard_ends, ind, side='right'))
+        if shard_ind > 0:
+            ind -= int(self.shard_ends[shard_ind - 1])
+        imgs, labels = self._get_shards()[shard_ind]
+        x = imgs[ind]
+        y = labels[ind]
+
+        if self.transforms is not None:
+            x, y = self.transforms(x, y)
+        return (x, y)
+
+    def __len__(self):
+        return int(self.shard_ends[-1]) if len(self.shard_ends) else 0
+
+
+def build_dataset(data_dir, transforms=None):
+    """Build a dataset from a directory of PNG chips or of chip shards."""
+    if glob.glob(join(data_dir, '*-img.npy')):
+        return ShardSegmentationDataset(data_dir, transforms=transforms)
+    return SegmentationDataset(data_dir, transforms=transforms)
+
+
+def build_databunch(data_dir,
+                    img_sz,
+                    batch_sz,
+                    class_names,
+                    augmentors,
+                    num_workers=4):
+    """Build a DataBunch of chips in data_dir.
 
+    The datasets are safe to use with forked DataLoader workers. When running in
+    Docker, using several workers may require increasing the size of /dev/shm,
+    otherwise the DataLoader workers are killed. Setting num_workers to 0 loads
+    the data in the main process instead.
+    """
     train_dir = join(data_dir, 'train')
     valid_dir = join(data_dir, 'valid')
 
     random_sized_crop = HandlerRandomSizedCrop(
-        p=1,
-        min_max_height=(256, 512),
-        height=256,
-        width=256
-    )
+        p=1, min_max_height=(256, 512), height=256, width=256)
     augmentors_dict = {
         "RandomSizedCrop": random_sized_crop,
     }
@@ -95,8 +177,8 @@ def build_databunch(data_dir, img_sz, batch_sz, class_names, augmentors):
     aug_transforms = ComposeTransforms(aug_transforms + [ToTensor()])
     transforms = ComposeTransforms([ToTensor()])
 
-    train_ds = SegmentationDataset(train_dir, transforms=aug_transforms)
-    valid_ds = SegmentationDataset(valid_dir, transforms=transforms)
+    train_ds = build_dataset(train_dir, transforms=aug_transforms)
+    valid_ds = build_dataset(valid_dir, transforms=transforms)
 
     train_dl = DataLoader(
         train_ds,
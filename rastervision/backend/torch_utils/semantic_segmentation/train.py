@@ -5,15 +5,41 @@ from rastervision.backend.torch_utils.metrics import (compute_conf_mat,
                                                       compute_conf_mat_metrics)
 
 
-def train_epoch(model, device, data_loader, opt, loss_fn, step_scheduler=None):
+def prepare_batch(x, y, device):
+    """Move a batch to device and convert it for the model.
+
+    Converting on the device after the transfer means that batches of uint8 images
+    are transferred, and that the conversion runs on the GPU if there is one.
+
+    Args:
+        x: uint8 tensor of images, which is scaled to floats between 0 and 1
+        y: tensor of labels, which is converted to longs. Can be None.
+        device: device to move the batch to
+    """
+    x = x.to(device, non_blocking=True)
+    if x.dtype == torch.uint8:
+        x = x.float().div_(255)
+    if y is not None:
+        y = y.to(device, non_blocking=True).long()
+    return x, y
+
+
+def train_epoch(model,
+                device,
+                data_loader,
+                opt,
+                loss_fn,
+                step_scheduler=None,
+                augment=None):
     model.train()
     total_loss = 0.0
     num_samples = 0
 
     with click.progressbar(data_loader, label='Training') as bar:
         for batch_ind, (x, y) in enumerate(bar):
-            x = x.to(device)
-            y = y.to(device)
+            x, y = prepare_batch(x, y, device)
+            if augment:
+                x, y, _ = augment(x, masks=y)
 
             opt.zero_grad()
             out = model(x)['out']
@@ -35,11 +61,11 @@ def validate_epoch(model, device, data_loader, num_labels):
     with torch.no_grad():
         with click.progressbar(data_loader, label='Validating') as bar:
             for batch_ind, (x, y) in enumerate(bar):
-                x = x.to(device)
+                x, _ = prepare_batch(x, None, device)
                 out = model(x)['out']
 
                 out = out.argmax(1).view(-1).cpu()
-                y = y.view(-1).cpu()
+                y = y.view(-1).long()
                 conf_mat += compute_conf_mat(out, y, num_labels)
 
     # Ignore index zero.
@@ -0,0 +1,94 @@
+import struct
+
+import numpy as np
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+# Length of the header that follows the magic string and header length, chosen so
+# that the data starts at a multiple of 64 bytes, which NumPy expects.
+NPY_HEADER_LEN = 246
+
+
+def _make_npy_header(dtype, shape):
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': tuple(shape)
+    })
+    if len(header) >= NPY_HEADER_LEN:
+        raise ValueError('Shape {} is too long for a shard.'.format(shape))
+    header = header.ljust(NPY_HEADER_LEN - 1) + '\n'
+    return NPY_MAGIC + struct.pack('<H',
+                                   NPY_HEADER_LEN) + header.encode('latin1')
+
+
+class NpyShardWriter():
+    """Writes arrays with the same shape and dtype to a .npy file one at a time.
+
+    The arrays are streamed to the file as they are written, so they don't need to
+    fit in memory. The file holds an array with an extra first dimension indexing
+    the written arrays, and can be memory-mapped using
+    np.load(path, mmap_mode='r'). The file is only created if at least one array is
+    written.
+
+    Use as a context manager, or call close when done writing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+        self.dtype = None
+        self.shape = None
+
+    def write(self, arr):
+        """Append an array to the shard."""
+        arr = np.asarray(arr)
+        self.write_all(arr[np.newaxis])
+
+    def write_all(self, arrs, block_size=256):
+        """Append each array along the first dimension of arrs to the shard.
+
+        arrs can be a memory-mapped array, which is read in blocks of block_size
+        arrays.
+        """
+        for start in range(0, len(arrs), block_size):
+            block = np.ascontiguousarray(arrs[start:start + block_size])
+            if self.file is None:
+                self.dtype, self.shape = block.dtype, block.shape[1:]
+                self.file = open(self.path, 'wb')
+                # The header is written again on close with the final count.
+                self.file.write(
+                    _make_npy_header(self.dtype, (0, ) + self.shape))
+            elif block.dtype != self.dtype or block.shape[1:] != self.shape:
+                raise ValueError(
+                    'Expected arrays with dtype {} and shape {}, got {} and {}.'.
+                    format(self.dtype, self.shape, block.dtype,
+                           block.shape[1:]))
+            self.file.write(block.tobytes())
+            self.count += len(block)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.seek(0)
+        self.file.write(
+            _make_npy_header(self.dtype, (self.count, ) + self.shape))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+def load_shard(path, mmap_mode='r'):
+    """Memory-map a shard written by NpyShardWriter.
+
+    Args:
+        path: (str) path of the shard
+        mmap_mode: (str) mode passed to np.load. 'c' maps the shard copy-on-write,
+            which makes the array writeable without changing the file.
+    """
+    return np.load(path, mmap_mode=mmap_mode)
@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class BoxIndex():
+    """A grid index over a set of boxes for finding the boxes that intersect a box.
+
+    The extent of the boxes is divided into square cells, and each box is
+    registered in every cell it overlaps. A query only looks at the boxes registered
+    in the cells that the query box overlaps, so the cost of a query depends on the
+    number of boxes near the query box rather than the total number of boxes. Boxes
+    that overlap a lot of cells are kept in a separate list that is always checked,
+    so that a few very large boxes don't blow up the size of the index.
+    """
+
+    def __init__(self, npboxes, cell_size=None, max_cells_per_box=64):
+        """Constructor.
+
+        Args:
+            npboxes: float numpy array of size nx4 with cols ymin, xmin, ymax, xmax
+            cell_size: (float) size of the grid cells. If None, this is set to twice
+                the median size of the boxes.
+            max_cells_per_box: (int) boxes overlapping more cells than this are not
+                stored in the grid
+        """
+        self.npboxes = npboxes
+        num_boxes = npboxes.shape[0]
+        if num_boxes == 0:
+            self.cell_size = 1.
+            self.origin = np.zeros((2, ))
+            self.num_rows = self.num_cols = 0
+            self.cell_keys = np.empty((0, ), dtype=np.int64)
+            self.cell_box_inds = np.empty((0, ), dtype=np.int64)
+            self.large_box_inds = np.empty((0, ), dtype=np.int64)
+            return
+
+        if cell_size is None:
+            box_sizes = np.maximum(npboxes[:, 2] - npboxes[:, 0],
+                                   npboxes[:, 3] - npboxes[:, 1])
+            cell_size = 2 * np.median(box_sizes)
+        self.cell_size = max(float(cell_size), 1.)
+        self.origin = npboxes[:, 0:2].min(axis=0)
+
+        row0, col0, row1, col1 = self._get_cell_ranges(npboxes)
+        self.num_rows = int(row1.max()) + 1
+        self.num_cols = int(col1.max()) + 1
+
+        num_cells = (row1 - row0 + 1) * (col1 - col0 + 1)
+        is_large = num_cells > max_cells_per_box
+        self.large_box_inds = np.nonzero(is_large)[0]
+
+        # Make a (cell key, box index) pair for each cell that each box overlaps.
+        box_inds = np.nonzero(~is_large)[0]
+        row0, col0 = row0[box_inds], col0[box_inds]
+        num_box_rows = (row1[box_inds] - row0 + 1)
+        num_box_cols = (col1[box_inds] - col0 + 1)
+        num_cells = num_box_rows * num_box_cols
+        pair_box_inds = np.repeat(box_inds, num_cells)
+        # Position of each pair within the cells of its box.
+        starts = np.repeat(np.cumsum(num_cells) - num_cells, num_cells)
+        offsets = np.arange(len(pair_box_inds)) - starts
+        box_num_cols = np.repeat(num_box_cols, num_cells)
+        rows = np.repeat(row0, num_cells) + offsets // box_num_cols
+        cols = np.repeat(col0, num_cells) + offsets % box_num_cols
+        cell_keys = rows * self.num_cols + cols
+
+        order = np.argsort(cell_keys, kind='stable')
+        self.cell_keys = cell_keys[order]
+        self.cell_box_inds = pair_box_inds[order]
+
+    def _get_cell_ranges(self, npboxes):
+        rel = (npboxes - np.tile(self.origin, 2)) / self.cell_size
+        rel = np.floor(rel).astype(np.int64)
+        return rel[:, 0], rel[:, 1], rel[:, 2], rel[:, 3]
+
+    def query(self, npbox):
+        """Return the indices of the boxes that intersect a box.
+
+        Boxes that only touch the query box along an edge are included.
+
+        Args:
+            npbox: numpy array of size 4 with ymin, xmin, ymax, xmax
+
+        Returns:
+            sorted int numpy array of box indices
+        """
+        npbox = np.asarray(npbox, dtype=np.float64)
+        candidates = [self.large_box_inds]
+
+        if self.num_rows > 0:
+            row0, col0, row1, col1 = [
+                int(x) for x in self._get_cell_ranges(npbox[np.newaxis, :])
+            ]
+            row0, col0 = max(row0, 0), max(col0, 0)
+            row1 = min(row1, self.num_rows - 1)
+            col1 = min(col1, self.num_cols - 1)
+            if row0 <= row1 and col0 <= col1:
+                # The keys of the cells in each row of the query are contiguous.
+                rows = np.arange(row0, row1 + 1)
+                starts = np.searchsorted(self.cell_keys,
+                                         rows * self.num_cols + col0, 'left')
+                ends = np.searchsorted(self.cell_keys,
+                                       rows * self.num_cols + col1, 'right')
+                candidates.extend(self.cell_box_inds[start:end]
+                                  for start, end in zip(starts, ends)
+                                  if start < end)
+
+        candidates = np.unique(np.concatenate(candidates))
+        boxes = self.npboxes[candidates]
+        intersects = ((boxes[:, 0] <= npbox[2]) & (boxes[:, 2] >= npbox[0]) &
+                      (boxes[:, 1] <= npbox[3]) & (boxes[:, 3] >= npbox[1]))
+        return candidates[intersects]
@@ -1,18 +1,22 @@
 import numpy as np
-from shapely.geometry import shape
+from shapely.geometry import shape, box as shapely_box
+from shapely.prepared import prep
 
 from rastervision.core.box import Box
 from rastervision.data.label import Labels
+from rastervision.data.label.box_index import BoxIndex
 from rastervision.data.label.tfod_utils.np_box_list import BoxList
 from rastervision.data.label.tfod_utils.np_box_list_ops import (
     prune_non_overlapping_boxes, clip_to_window, concatenate,
-    non_max_suppression)
+    non_max_suppression, gather)
 
 
 class ObjectDetectionLabels(Labels):
     """A set of boxes and associated class_ids and scores.
 
-    Implemented using the Tensorflow Object Detection API's BoxList class.
+    Implemented using the Tensorflow Object Detection API's BoxList class. A
+    spatial index over the boxes is built the first time it is needed, and is used
+    to speed up finding the boxes in a window.
     """
 
     def __init__(self, npboxes, class_ids, scores=None):
@@ -34,6 +38,7 @@ class ObjectDetectionLabels(Labels):
         if scores is None:
             scores = np.ones(class_ids.shape)
         self.boxlist.add_field('scores', scores)
+        self._box_index = None
 
     def __add__(self, other):
         return ObjectDetectionLabels.concatenate(self, other)
@@ -50,28 +55,35 @@ class ObjectDetectionLabels(Labels):
         np.testing.assert_array_equal(self.get_scores(),
                                       expected_labels.get_scores())
 
+    def get_box_index(self):
+        """Return a BoxIndex over the boxes, which is built on first use."""
+        npboxes = self.boxlist.get()
+        if self._box_index is None or self._box_index.npboxes is not npboxes:
+            self._box_index = BoxIndex(npboxes)
+        return self._box_index
+
     def filter_by_aoi(self, aoi_polygons):
-        boxes = self.get_boxes()
-        class_ids = self.get_class_ids()
-        scores = self.get_scores()
-
-        new_boxes = []
-        new_class_ids = []
-        new_scores = []
-        for box, class_id, score in zip(boxes, class_ids, scores):
-            box_poly = box.to_shapely()
-            for aoi in aoi_polygons:
-                if box_poly.within(aoi):
-                    new_boxes.append(box.npbox_format())
-                    new_class_ids.append(class_id)
-                    new_scores.append(score)
-                    break
-
-        if len(new_boxes) == 0:
+        npboxes = self.get_npboxes()
+        box_index = self.get_box_index()
+
+        keep = np.zeros((len(npboxes), ), dtype=bool)
+        for aoi in aoi_polygons:
+            (xmin, ymin, xmax, ymax) = aoi.bounds
+            inds = box_index.query(np.array([ymin, xmin, ymax, xmax]))
+            inds = inds[~keep[inds]]
+            prepared_aoi = prep(aoi)
+            for ind in inds:
+                (box_ymin, box_xmin, box_ymax, box_xmax) = npboxes[ind]
+                box_poly = shapely_box(box_xmin, box_ymin, box_xmax, box_ymax)
+                if prepared_aoi.contains(box_poly):
+                    keep[ind] = True
+
+        if not np.any(keep):
             return ObjectDetectionLabels.make_empty()
 
-        return ObjectDetectionLabels(
-            np.array(new_boxes), np.array(new_class_ids), np.array(new_scores))
+        return ObjectDetectionLabels.from_boxlist(
+            gather(self.boxlist,
+                   np.nonzero(keep)[0]))
 
     @staticmethod
     def make_empty():
@@ -224,8 +236,11 @@ class ObjectDetectionLabels(Labels):
         """
         window_npbox = window.npbox_format()
         window_boxlist = BoxList(np.expand_dims(window_npbox, axis=0))
+        # Only compute the overlap for boxes near the window.
+        inds = labels.get_box_index().query(window_npbox)
+        boxlist = gather(labels.boxlist, inds)
         boxlist = prune_non_overlapping_boxes(
-            labels.boxlist, window_boxlist, minoverlap=ioa_thresh)
+            boxlist, window_boxlist, minoverlap=ioa_thresh)
         if clip:
             boxlist = clip_to_window(boxlist, window_npbox)
 
@@ -1,3 +1,5 @@
+import tempfile
+
 from rastervision.data.label import Labels
 
 import numpy as np
@@ -5,38 +7,172 @@ from rasterio.features import rasterize
 import shapely
 
 
+class LabelArrStore():
+    """Stores arrays keyed by window, spilling them to disk past a memory budget.
+
+    Arrays are kept in memory until their total size would exceed max_memory bytes,
+    after which they are appended to a temporary file and read back from it when
+    needed. Arrays are looked up in constant time using the window's tuple format.
+    """
+
+    def __init__(self, max_memory=None):
+        """Constructor.
+
+        Args:
+            max_memory: (int) maximum number of bytes of arrays to keep in memory,
+                or None to keep all arrays in memory
+        """
+        self.max_memory = max_memory
+        self.memory_used = 0
+        self.arrs = {}
+        self.spill_file = None
+
+    def __len__(self):
+        return len(self.arrs)
+
+    def __contains__(self, window):
+        return window.tuple_format() in self.arrs
+
+    def _set(self, key, arr):
+        old_arr = self.arrs.get(key)
+        if isinstance(old_arr, np.ndarray):
+            self.memory_used -= old_arr.nbytes
+
+        if isinstance(arr, np.ndarray) and (
+                self.max_memory is not None
+                and self.memory_used + arr.nbytes > self.max_memory):
+            arr = self._spill(arr)
+        if isinstance(arr, np.ndarray):
+            self.memory_used += arr.nbytes
+        self.arrs[key] = arr
+
+    def _spill(self, arr):
+        if self.spill_file is None:
+            # Import here to avoid circular reference.
+            from rastervision.rv_config import RVConfig
+            self.spill_file = tempfile.NamedTemporaryFile(
+                dir=RVConfig.get_tmp_dir_root(), suffix='.labels')
+        arr = np.ascontiguousarray(arr)
+        self.spill_file.seek(0, 2)
+        offset = self.spill_file.tell()
+        self.spill_file.write(arr.tobytes())
+        self.spill_file.flush()
+        # The file is referenced by the entry, so that stores that arrays were
+        # merged into can still read them.
+        return (self.spill_file, offset, arr.dtype, arr.shape)
+
+    def set(self, window, arr):
+        """Set the array for a window."""
+        self._set(window.tuple_format(), arr)
+
+    def get(self, window):
+        """Return the array for a window, or None if there isn't one.
+
+        Arrays that were spilled to disk are returned as new in-memory arrays.
+        """
+        arr = self.arrs.get(window.tuple_format())
+        if arr is None or isinstance(arr, np.ndarray):
+            return arr
+        spill_file, offset, dtype, shape = arr
+        return np.array(
+            np.memmap(
+                spill_file.name,
+                dtype=dtype,
+                mode='r',
+                offset=offset,
+                shape=shape))
+
+    def update(self, other):
+        """Add the arrays in another store to this one.
+
+        Arrays that the other store spilled to disk are not read.
+        """
+        for key, arr in other.arrs.items():
+            self._set(key, arr)
+
+
+def quantize_scores(score_arr):
+    """Quantize scores between 0 and 1 to uint8 values between 0 and 255."""
+    return np.round(np.clip(score_arr, 0, 1) * 255).astype(np.uint8)
+
+
+def dequantize_scores(score_arr):
+    """Convert scores quantized by quantize_scores back to float32 values."""
+    return score_arr.astype(np.float32) / 255
+
+
 class SemanticSegmentationLabels(Labels):
     """A set of spatially referenced semantic segmentation labels.
 
     Since labels are represented as rasters, the labels for a scene can take up a lot of
-    memory. Therefore, to avoid running out of memory, labels are computed as needed for
-    windows.
+    memory. Labels can either be computed as needed for windows using a label_fn, or
+    set for windows using set_label_arr, in which case they are stored in a
+    LabelArrStore that spills them to disk once max_memory is exceeded.
+
+    Labels can optionally hold the score of each class for each pixel, which are
+    stored as uint8 values and set or computed in the same way as label arrays.
     """
 
-    def __init__(self, windows, label_fn, aoi_polygons=None):
+    def __init__(self,
+                 windows=None,
+                 label_fn=None,
+                 aoi_polygons=None,
+                 max_memory=None,
+                 score_fn=None):
         """Constructor
 
         Args:
             windows: a list of Box representing the windows covering a scene
             label_fn: a function that takes a window (Box) and returns a label array
-                of the same shape with each value a class id.
+                of the same shape with each value a class id. Only used for
+                windows that don't have a label array set using set_label_arr.
             aoi_polygons: a list of shapely.geom that contains the AOIs
                 (areas of interest) for a scene.
+            max_memory: (int) maximum number of bytes of label arrays set using
+                set_label_arr to keep in memory before spilling them to disk, or
+                None for no limit
+            score_fn: a function that takes a window (Box) and returns a uint8 array
+                of shape (height, width, num_classes) of quantized scores. Only used
+                for windows that don't have scores set using set_score_arr.
 
         """
-        self.windows = windows
+        self.windows = windows if windows is not None else []
         self.label_fn = label_fn
         self.aoi_polygons = aoi_polygons
+        self.label_arrs = LabelArrStore(max_memory)
+        self.score_fn = score_fn
+        self.score_arrs = LabelArrStore(max_memory)
 
     def __add__(self, other):
         """Add labels to these labels.
 
         Returns a concatenation of this and the other labels.
         """
-        return SemanticSegmentationLabels(
-            self.windows + other.windows,
+        labels = SemanticSegmentationLabels(
+            list(self.windows),
             self.label_fn,
-            aoi_polygons=self.aoi_polygons)
+            aoi_polygons=self.aoi_polygons,
+            max_memory=self.label_arrs.max_memory,
+            score_fn=self.score_fn)
+        labels.label_arrs.update(self.label_arrs)
+        labels.score_arrs.update(self.score_arrs)
+        labels += other
+        return labels
+
+    def __iadd__(self, other):
+        """Add labels to these labels in place.
+
+        This takes time proportional to the size of the other labels, so adding
+        labels for each batch of a scene takes linear time overall.
+        """
+        self.windows.extend(other.windows)
+        self.label_arrs.update(other.label_arrs)
+        self.score_arrs.update(other.score_arrs)
+        if self.label_fn is None:
+            self.label_fn = other.label_fn
+        if self.score_fn is None:
+            self.score_fn = other.score_fn
+        return self
 
     def __eq__(self, other):
         for window in self.get_windows():
@@ -47,12 +183,78 @@ class SemanticSegmentationLabels(Labels):
 
     def filter_by_aoi(self, aoi_polygons):
         """Returns a new SemanticSegmentationLabels object with aoi_polygons set."""
-        return SemanticSegmentationLabels(
-            self.windows, self.label_fn, aoi_polygons=aoi_polygons)
+        labels = SemanticSegmentationLabels(
+            self.windows,
+            self.label_fn,
+            aoi_polygons=aoi_polygons,
+            score_fn=self.score_fn)
+        labels.label_arrs = self.label_arrs
+        labels.score_arrs = self.score_arrs
+        return labels
 
     def add_window(self, window):
         self.windows.append(window)
 
+    def set_label_arr(self, window, label_arr):
+        """Set the label array for a window, adding the window if it's new.
+
+        Class ids are stored as uint8 values, since there are at most 256 classes.
+
+        Args:
+            window: Box
+            label_arr: np.ndarray of class ids with the same shape as the window
+        """
+        if window not in self.label_arrs:
+            self.windows.append(window)
+        self.label_arrs.set(window, label_arr.astype(np.uint8, copy=False))
+
+    def set_score_arr(self, window, score_arr):
+        """Set the scores for a window.
+
+        The label array for the window should be set as well.
+
+        Args:
+            window: Box
+            score_arr: np.ndarray of shape (height, width, num_classes) with scores
+                between 0 and 1, which are quantized to uint8
+        """
+        self.score_arrs.set(window, quantize_scores(score_arr))
+
+    def has_scores(self):
+        """Return True if these labels have scores."""
+        return len(self.score_arrs) > 0 or self.score_fn is not None
+
+    def get_score_arr(self, window, clip_extent=None):
+        """Get the scores for a window.
+
+        Args:
+            window: Box
+            clip_extent: a Box representing the extent of the corresponding Scene
+
+        Returns:
+            np.ndarray of shape (height, width, num_classes) with float32 scores
+                between 0 and 1, clipped to the clip_extent
+        """
+        score_arr = self.score_arrs.get(window)
+        if score_arr is None:
+            if self.score_fn is None:
+                raise ValueError('No scores for window {}'.format(window))
+            score_arr = self.score_fn(window)
+
+        if clip_extent is not None:
+            clip_window = window.intersection(clip_extent)
+            score_arr = score_arr[0:clip_window.get_height(), 0:
+                                  clip_window.get_width()]
+        return dequantize_scores(score_arr)
+
+    def _get_label_arr(self, window):
+        label_arr = self.label_arrs.get(window)
+        if label_arr is not None:
+            return label_arr
+        if self.label_fn is None:
+            raise ValueError('No labels for window {}'.format(window))
+        return self.label_fn(window)
+
     def get_windows(self):
         return self.windows
 
@@ -72,7 +274,7 @@ class SemanticSegmentationLabels(Labels):
         window_geom = window.to_shapely()
 
         if not self.aoi_polygons:
-            label_arr = self.label_fn(window)
+            label_arr = self._get_label_arr(window)
         else:
             # For each aoi_polygon, intersect with window, and put in window frame of
             # reference.
@@ -91,7 +293,8 @@ class SemanticSegmentationLabels(Labels):
             if window_aois:
                 # If window intersects with AOI, set pixels outside the AOI polygon to 0,
                 # so they are ignored during eval.
-                label_arr = self.label_fn(window)
+                # Copy so that the stored label array isn't changed.
+                label_arr = self._get_label_arr(window).copy()
                 mask = rasterize(
                     [(p, 0) for p in window_aois],
                     out_shape=label_arr.shape,
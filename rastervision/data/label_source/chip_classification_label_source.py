@@ -1,5 +1,8 @@
+import math
+
 import numpy as np
-from shapely.strtree import STRtree
+from rasterio.features import rasterize
+from rasterio.transform import Affine
 from shapely.geometry import shape
 
 import rastervision as rv
@@ -72,6 +75,75 @@ def infer_cell(cell, str_tree, ioa_thresh, use_intersection_over_cell,
     return class_id
 
 
+# Polygons that overlap more cells than this are rasterized onto the grid of cells,
+# so that only the cells along their boundary need to be intersected with them.
+MAX_INTERSECTED_CELLS = 16
+
+
+def get_cell_intersections(geom, cell_size, num_rows, num_cols):
+    """Compute the area of intersection of a polygon with cells of a grid.
+
+    The grid has num_rows by num_cols square cells of size cell_size, starting at the
+    origin. Intersections are computed for all cells that the bounds of the polygon
+    touch, so some of the areas can be 0. For polygons that overlap many cells,
+    the cells that the polygon boundary passes through are found by rasterizing it
+    at the resolution of the grid. Only those cells are intersected with the polygon,
+    and the rest are either inside or outside of the polygon, which is determined by
+    whether their centers are.
+
+    Args:
+        geom: shapely polygon in pixel coordinates
+        cell_size: (int) size of cells in pixels
+        num_rows: (int) number of rows of cells
+        num_cols: (int) number of columns of cells
+
+    Returns:
+        (rows, cols, areas) arrays with the row and column of each cell and the area
+            of its intersection with the polygon
+    """
+    xmin, ymin, xmax, ymax = geom.bounds
+    # Cells that touch the bounds, including cells that only share an edge.
+    row0 = max(math.ceil(ymin / cell_size) - 1, 0)
+    row1 = min(math.floor(ymax / cell_size), num_rows - 1)
+    col0 = max(math.ceil(xmin / cell_size) - 1, 0)
+    col1 = min(math.floor(xmax / cell_size), num_cols - 1)
+    if row0 > row1 or col0 > col1:
+        empty = np.zeros((0, ), dtype=np.int64)
+        return empty, empty, np.zeros((0, ))
+
+    shape = (row1 - row0 + 1, col1 - col0 + 1)
+    rows, cols = np.mgrid[row0:row1 + 1, col0:col1 + 1]
+
+    def intersection_area(row, col):
+        cell = Box.make_square(row * cell_size, col * cell_size, cell_size)
+        return geom.intersection(cell.to_shapely()).area
+
+    if shape == (1, 1):
+        # The polygon is inside of the cell.
+        areas = np.array([[geom.area]])
+    elif shape[0] * shape[1] <= MAX_INTERSECTED_CELLS:
+        areas = np.array([
+            intersection_area(row, col)
+            for row, col in zip(rows.ravel(), cols.ravel())
+        ]).reshape(shape)
+    else:
+        transform = Affine(cell_size, 0, col0 * cell_size, 0, cell_size,
+                           row0 * cell_size)
+        inside = rasterize(
+            [(geom, 1)], out_shape=shape, transform=transform, dtype=np.uint8)
+        on_boundary = rasterize(
+            [(geom.boundary, 1)],
+            out_shape=shape,
+            transform=transform,
+            all_touched=True,
+            dtype=np.uint8)
+        areas = inside * float(cell_size * cell_size)
+        for row, col in zip(*np.nonzero(on_boundary)):
+            areas[row, col] = intersection_area(row + row0, col + col0)
+
+    return rows.ravel(), cols.ravel(), areas.ravel()
+
+
 def infer_labels(geojson, extent, cell_size, ioa_thresh,
                  use_intersection_over_cell, pick_min_class_id,
                  background_class_id):
@@ -81,6 +153,11 @@ def infer_labels(geojson, extent, cell_size, ioa_thresh,
     cells and class_ids that best captures the contents of each cell. See infer_cell for
     info on the args.
 
+    This gives the same result as calling infer_cell for each cell, but iterates
+    over the polygons rather than the cells. The intersections of each polygon with
+    the cells it overlaps are computed using get_cell_intersections, and the class
+    of each cell is then picked for all cells at once.
+
     Args:
         geojson: dict in normalized GeoJSON format (see VectorSource)
         extent: Box representing the bounds of the grid
@@ -89,23 +166,57 @@ def infer_labels(geojson, extent, cell_size, ioa_thresh,
         ChipClassificationLabels
     """
     labels = ChipClassificationLabels()
-    cells = extent.get_windows(cell_size, cell_size)
+    num_rows = math.ceil(extent.get_height() / cell_size)
+    num_cols = math.ceil(extent.get_width() / cell_size)
+    cell_area = cell_size * cell_size
 
-    # We need to associate class_id with each geom. Monkey-patching it onto the geom
-    # seems like a bad idea, but it's the only straightforward way of doing this
-    # that I've been able to find.
-    geoms = []
+    cell_inds, class_ids, inter_over_cells, inter_over_polys = [], [], [], []
     for f in geojson['features']:
-        g = shape(f['geometry'])
-        g.class_id = f['properties']['class_id']
-        geoms.append(g)
-    str_tree = STRtree(geoms)
-
-    for cell in cells:
-        class_id = infer_cell(cell, str_tree, ioa_thresh,
-                              use_intersection_over_cell, background_class_id,
-                              pick_min_class_id)
-        labels.set_cell(cell, class_id)
+        geom = shape(f['geometry'])
+        rows, cols, areas = get_cell_intersections(geom, cell_size, num_rows,
+                                                   num_cols)
+        cell_inds.append(rows * num_cols + cols)
+        class_ids.append(np.full(len(areas), f['properties']['class_id']))
+        inter_over_cells.append(areas / cell_area)
+        inter_over_polys.append(areas / geom.area)
+
+    # Class id of each cell, or -1 for cells that no polygon overlaps enough.
+    cell_class_ids = np.full(num_rows * num_cols, -1, dtype=np.int64)
+    if cell_inds:
+        cell_inds = np.concatenate(cell_inds)
+        class_ids = np.concatenate(class_ids).astype(np.int64)
+        inter_over_cells = np.concatenate(inter_over_cells)
+        inter_over_polys = np.concatenate(inter_over_polys)
+
+        if use_intersection_over_cell:
+            enough_inter = inter_over_cells >= ioa_thresh
+        else:
+            enough_inter = inter_over_polys >= ioa_thresh
+        cell_inds = cell_inds[enough_inter]
+        class_ids = class_ids[enough_inter]
+        inter_over_cells = inter_over_cells[enough_inter]
+
+        if pick_min_class_id:
+            max_id = np.iinfo(np.int64).max
+            min_class_ids = np.full(len(cell_class_ids), max_id)
+            np.minimum.at(min_class_ids, cell_inds, class_ids)
+            has_class = min_class_ids != max_id
+            cell_class_ids[has_class] = min_class_ids[has_class]
+        else:
+            # Sort by cell, and then by decreasing intersection over cell. The sort
+            # is stable, so ties are broken by picking the first polygon.
+            order = np.lexsort((-inter_over_cells, cell_inds))
+            cell_inds, first = np.unique(cell_inds[order], return_index=True)
+            cell_class_ids[cell_inds] = class_ids[order][first]
+
+    default_class_id = (None
+                        if background_class_id == 0 else background_class_id)
+    for row in range(num_rows):
+        for col in range(num_cols):
+            cell = Box.make_square(row * cell_size, col * cell_size, cell_size)
+            class_id = cell_class_ids[row * num_cols + col]
+            class_id = default_class_id if class_id < 0 else int(class_id)
+            labels.set_cell(cell, class_id)
     return labels
 
 
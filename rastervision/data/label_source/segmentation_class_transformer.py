@@ -5,58 +5,58 @@ from rastervision.data.label_source.utils import (
 
 
 class SegmentationClassTransformer():
+    """Converts between RGB label rasters and class id label rasters.
+
+    Both directions are computed with vectorized lookups: colors are packed into
+    integers and looked up in a sorted array of known colors, and class ids are
+    converted to colors by indexing into a palette.
+    """
+
     def __init__(self, class_map):
         color_to_class = dict(
             [(item.color, item.id) for item in class_map.get_items()])
 
-        # color int to class
+        # Sorted packed color ints and the class id of each, used to look up
+        # colors using binary search.
         color_int_to_class = dict(
             zip([color_to_integer(c) for c in color_to_class.keys()],
                 color_to_class.values()))
-
-        def color_int_to_class_fn(color: int) -> int:
-            # Convert unspecified colors to class 0 which is "don't care"
-            return color_int_to_class.get(color, 0x00)
-
-        self.transform_color_int_to_class = \
-            np.vectorize(color_int_to_class_fn, otypes=[np.uint8])
-
-        # class to color triple
-        class_to_color_triple = dict(
-            zip(color_to_class.values(),
-                [color_to_triple(c) for c in color_to_class.keys()]))
-
-        def class_to_channel_color(channel: int, class_id: int) -> int:
-            """Given a channel (red, green, or blue) and a class, return the
-            intensity of that channel.
-
-            Args:
-                 channel: An integer with value 0, 1, or 2
-                      representing the channel.
-                 class_id: The class id represented as an integer.
-            Returns:
-                 The intensity of the channel for the color associated
-                      with the given class.
-            """
-            default_triple = (0x00, 0x00, 0x00)
-            return class_to_color_triple.get(class_id, default_triple)[channel]
-
-        class_to_r = np.vectorize(
-            lambda c: class_to_channel_color(0, c), otypes=[np.uint8])
-        class_to_g = np.vectorize(
-            lambda c: class_to_channel_color(1, c), otypes=[np.uint8])
-        class_to_b = np.vectorize(
-            lambda c: class_to_channel_color(2, c), otypes=[np.uint8])
-        self.transform_class_to_color = [class_to_r, class_to_g, class_to_b]
+        color_ints = sorted(color_int_to_class.keys())
+        self.color_ints = np.array(color_ints, dtype=np.uint32)
+        self.color_int_classes = np.array(
+            [color_int_to_class[c] for c in color_ints], dtype=np.uint8)
+
+        # Palette with the color triple of each class id. Class ids without a
+        # color are black.
+        num_classes = max(color_to_class.values(), default=-1) + 1
+        self.palette = np.zeros((num_classes, 3), dtype=np.uint8)
+        for color, class_id in color_to_class.items():
+            self.palette[class_id] = color_to_triple(color)
+
+    def get_colormap(self):
+        """Return a dict mapping each class id to its RGB color triple."""
+        return dict((class_id, tuple(int(c) for c in color))
+                    for class_id, color in enumerate(self.palette))
 
     def rgb_to_class(self, rgb_labels):
         color_int_labels = rgb_to_int_array(rgb_labels)
-        class_labels = self.transform_color_int_to_class(color_int_labels)
-        return class_labels.astype(np.uint8)
+        if len(self.color_ints) == 0:
+            return np.zeros(color_int_labels.shape, dtype=np.uint8)
+
+        inds = np.searchsorted(self.color_ints, color_int_labels)
+        inds[inds == len(self.color_ints)] = 0
+        # Convert unspecified colors to class 0 which is "don't care"
+        is_known = self.color_ints[inds] == color_int_labels
+        return np.where(is_known, self.color_int_classes[inds],
+                        0).astype(np.uint8)
 
     def class_to_rgb(self, class_labels):
-        rgb_labels = np.empty(class_labels.shape + (3, ))
-        for chan in range(3):
-            class_to_channel_color = self.transform_class_to_color[chan]
-            rgb_labels[:, :, chan] = class_to_channel_color(class_labels)
-        return rgb_labels.astype(np.uint8)
+        class_labels = np.asarray(class_labels)
+        is_known = (class_labels >= 0) & (class_labels < len(self.palette))
+        if len(self.palette) == 0 or not np.any(is_known):
+            return np.zeros(class_labels.shape + (3, ), dtype=np.uint8)
+
+        inds = np.where(is_known, class_labels, 0).astype(np.int64)
+        rgb_labels = self.palette[inds]
+        rgb_labels[~is_known] = 0
+        return rgb_labels
@@ -1,12 +1,76 @@
+import json
+import os
+import queue
+import threading
+
 import numpy as np
 import rasterio
+import rasterio.shutil
+from rasterio.enums import Resampling
+from shapely.geometry import mapping, shape
+from shapely.ops import transform as transform_geom
 
 import rastervision as rv
+from rastervision.core.box import Box
 from rastervision.utils.files import (get_local_path, make_dir, upload_or_copy,
                                       file_exists)
-from rastervision.data.label import SemanticSegmentationLabels
+from rastervision.data.label import (SemanticSegmentationLabels,
+                                     quantize_scores)
 from rastervision.data.label_store import LabelStore
 from rastervision.data.label_source import SegmentationClassTransformer
+from rastervision.data.label_store.utils import merge_touching_polygons
+
+# Size of the tiles of the saved GeoTIFF, which label arrays are assembled into
+# strips of before they are written.
+BLOCK_SIZE = 256
+COMPRESSION = 'deflate'
+# Max number of strips waiting to be written by the writer thread.
+WRITE_QUEUE_SIZE = 4
+
+
+def get_score_uri(uri):
+    """Return the URI of the GeoTIFF that scores are saved to for a label URI."""
+    return '{}-scores.tif'.format(os.path.splitext(uri)[0])
+
+
+def get_overview_factors(height, width, block_size=BLOCK_SIZE):
+    """Return the overview factors needed to get down to a single block."""
+    factors = []
+    factor = 2
+    while max(height, width) / factor >= block_size:
+        factors.append(factor)
+        factor *= 2
+    return factors
+
+
+def write_strips(dataset, strips):
+    """Write strips of rows taken from a queue until None is taken.
+
+    This runs on a writer thread so that compressing and writing the strips
+    overlaps with computing the labels. If writing fails, the rest of the strips
+    are taken without being written so that the producer isn't blocked, and the
+    exception is returned.
+
+    Args:
+        dataset: rasterio dataset open for writing
+        strips: queue.Queue of (row, array) tuples for strips of the first band
+            starting at row and spanning the width of the dataset
+    """
+    error = None
+    while True:
+        item = strips.get()
+        if item is None:
+            return error
+        if error is not None:
+            continue
+        row, strip = item
+        try:
+            dataset.write(
+                strip,
+                1,
+                window=((row, row + strip.shape[0]), (0, strip.shape[1])))
+        except Exception as e:
+            error = e
 
 
 class SemanticSegmentationRasterStore(LabelStore):
@@ -19,22 +83,32 @@ class SemanticSegmentationRasterStore(LabelStore):
                  crs_transformer,
                  tmp_dir,
                  vector_output=None,
-                 class_map=None):
+                 class_map=None,
+                 vector_window_size=0,
+                 score_output=False):
         """Constructor.
 
         Args:
-            uri: (str) URI of GeoTIFF file used for storing predictions as RGB values
+            uri: (str) URI of GeoTIFF file used for storing predictions
             extent: (Box) The extent of the scene
             crs_transformer: (CRSTransformer)
             tmp_dir: (str) temp directory to use
             vector_output: (None or array of dicts) containing vectorifiction
                 configuration information
-            class_map: (ClassMap) with color values used to convert class ids to
-                RGB values
+            class_map: (ClassMap) with color values used for the color palette of
+                the GeoTIFF
+            vector_window_size: (int) if > 0, vectorize the predictions in windows of
+                this size and stitch together polygons that cross the seams between
+                windows, instead of vectorizing a mask of the whole scene at once.
+                This only gives the same result for vector outputs in polygons mode.
+            score_output: (bool) if True, save the scores of each class in labels
+                that have them to a GeoTIFF at get_score_uri(uri), and read them
+                back in get_labels
 
         """
         self.uri = uri
         self.vector_output = vector_output
+        self.vector_window_size = vector_window_size
         self.extent = extent
         self.crs_transformer = crs_transformer
         self.tmp_dir = tmp_dir
@@ -44,65 +118,138 @@ class SemanticSegmentationRasterStore(LabelStore):
         else:
             self.class_trans = None
 
-        self.source = None
-        if file_exists(uri):
-            self.source = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
-                                               .with_uri(self.uri) \
-                                               .build() \
-                                               .create_source(self.tmp_dir)
+        self.score_output = score_output
+        self.score_uri = get_score_uri(uri)
+
+        self.source = self._make_source(uri)
+        self.score_source = None
+        if score_output:
+            self.score_source = self._make_source(self.score_uri)
+
+    def _make_source(self, uri):
+        if not file_exists(uri):
+            return None
+        return rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                                    .with_uri(uri) \
+                                    .build() \
+                                    .create_source(self.tmp_dir)
 
     def _subcomponents_to_activate(self):
-        if self.source is not None:
-            return [self.source]
-        return []
+        return [s for s in [self.source, self.score_source] if s is not None]
 
     def get_labels(self, chip_size=1000):
         """Get all labels.
 
         Returns:
             SemanticSegmentationLabels with windows of size chip_size covering the
-                scene with no overlap.
+                scene with no overlap. If score_output is set and scores were saved,
+                the labels also have the scores, which can be thresholded without
+                predicting again.
         """
 
         def label_fn(window):
-            raw_labels = self.source.get_raw_chip(window)
-            if self.class_trans:
-                labels = self.class_trans.rgb_to_class(raw_labels)
-            else:
-                labels = np.squeeze(raw_labels)
-            return labels
+            return self._raw_to_class(self.source.get_raw_chip(window))
 
         if self.source is None:
             raise Exception('Raster source at {} does not exist'.format(
                 self.uri))
 
+        score_fn = None
+        if self.score_source is not None:
+            score_fn = self.score_source.get_raw_chip
+
         extent = self.source.get_extent()
         windows = extent.get_windows(chip_size, chip_size)
-        return SemanticSegmentationLabels(windows, label_fn)
+        return SemanticSegmentationLabels(windows, label_fn, score_fn=score_fn)
+
+    def _raw_to_class(self, raw_labels):
+        """Convert a (height, width, bands) array read from a GeoTIFF to class ids.
+
+        Predictions are saved as a single band of class ids with a color palette,
+        but GeoTIFFs with RGB bands are also read, for backward compatibility.
+        """
+        if self.class_trans and raw_labels.shape[2] == 3:
+            return self.class_trans.rgb_to_class(raw_labels)
+        return raw_labels[:, :, 0]
+
+    def _get_strips(self, labels, mask=None):
+        """Assemble label arrays into strips of rows aligned with the blocks.
+
+        Windows are visited from top to bottom, and the rows above the block
+        containing the top of a window are complete once it's reached, so only the
+        rows spanned by a window and the block above it are held in memory.
+
+        Args:
+            labels: SemanticSegmentationLabels
+            mask: if not None, array of shape (height, width) that the label arrays
+                are copied to
+
+        Yields:
+            (row, array) for strips that span the width of the extent, where row is a
+                multiple of BLOCK_SIZE
+        """
+        height, width = self.extent.ymax, self.extent.xmax
+        windows = sorted(labels.get_windows(), key=lambda w: (w.ymin, w.xmin))
+        strip_row = 0
+        strip = np.zeros((0, width), dtype=np.uint8)
+        for window in windows:
+            done_row = min(window.ymin // BLOCK_SIZE * BLOCK_SIZE, height)
+            if done_row > strip_row:
+                yield strip_row, strip[:done_row - strip_row]
+                strip = strip[done_row - strip_row:]
+                strip_row = done_row
+
+            class_labels = labels.get_label_arr(
+                window, clip_extent=self.extent)
+            if class_labels.size == 0:
+                continue
+            ymax = window.ymin + class_labels.shape[0]
+            xmax = window.xmin + class_labels.shape[1]
+            if ymax > strip_row + strip.shape[0]:
+                extra_rows = ymax - strip_row - strip.shape[0]
+                strip = np.concatenate(
+                    [strip,
+                     np.zeros((extra_rows, width), dtype=np.uint8)])
+            rows = slice(window.ymin - strip_row, ymax - strip_row)
+            strip[rows, window.xmin:xmax] = class_labels
+            if mask is not None:
+                mask[window.ymin:ymax, window.xmin:xmax] = class_labels
+
+        if strip.shape[0] > 0:
+            yield strip_row, strip
 
     def save(self, labels):
         """Save.
 
+        The labels are saved as a Cloud Optimized GeoTIFF with a single band of
+        class ids, using a color palette if the store has a class_map. The label
+        arrays are assembled into strips aligned with the tiles of the GeoTIFF,
+        which are compressed and written on a writer thread while the next strip is
+        assembled.
+
         Args:
             labels - (SemanticSegmentationLabels) labels to be saved
         """
         local_path = get_local_path(self.uri, self.tmp_dir)
         make_dir(local_path, use_dirname=True)
+        tiled_path = os.path.join(
+            os.path.dirname(local_path), 'tiled-{}'.format(
+                os.path.basename(local_path)))
 
-        transform = self.crs_transformer.get_affine_transform()
-        crs = self.crs_transformer.get_image_crs()
-
-        band_count = 1
-        dtype = np.uint8
-        if self.class_trans:
-            band_count = 3
+        height, width = self.extent.ymax, self.extent.xmax
+        creation_options = {
+            'tiled': True,
+            'blockxsize': BLOCK_SIZE,
+            'blockysize': BLOCK_SIZE,
+            'compress': COMPRESSION,
+            'BIGTIFF': 'IF_SAFER'
+        }
 
-        if self.vector_output:
+        if self.vector_output and not self.vector_window_size:
             # We need to store the whole output mask to run feature extraction.
             # If the raster is large, this will result in running out of memory, so
-            # more work will be needed to get this to work in a scalable way. But this
-            # is complicated because of the need to merge features that are split
-            # across windows.
+            # vector_window_size should be used to vectorize the predictions one
+            # window at a time instead.
             mask = np.zeros(
                 (self.extent.ymax, self.extent.xmax), dtype=np.uint8)
         else:
@@ -110,77 +257,225 @@ class SemanticSegmentationRasterStore(LabelStore):
 
         # https://github.com/mapbox/rasterio/blob/master/docs/quickstart.rst
         # https://rasterio.readthedocs.io/en/latest/topics/windowed-rw.html
-        with rasterio.open(
+        with rasterio.Env(
+                GDAL_TIFF_OVR_BLOCKSIZE=BLOCK_SIZE,
+                COMPRESS_OVERVIEW=COMPRESSION):
+            with rasterio.open(
+                    tiled_path,
+                    'w',
+                    driver='GTiff',
+                    height=height,
+                    width=width,
+                    count=1,
+                    dtype=np.uint8,
+                    transform=self.crs_transformer.get_affine_transform(),
+                    crs=self.crs_transformer.get_image_crs(),
+                    **creation_options) as dataset:
+                if self.class_trans:
+                    dataset.write_colormap(1, self.class_trans.get_colormap())
+
+                strips = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+                result = {}
+
+                def write():
+                    result['error'] = write_strips(dataset, strips)
+
+                writer = threading.Thread(target=write)
+                writer.start()
+                try:
+                    for strip in self._get_strips(labels, mask):
+                        strips.put(strip)
+                finally:
+                    strips.put(None)
+                    writer.join()
+                if result['error'] is not None:
+                    raise result['error']
+
+                dataset.build_overviews(
+                    get_overview_factors(height, width), Resampling.nearest)
+
+            # Copying puts the overviews before the full resolution image, which
+            # is the layout of a COG.
+            rasterio.shutil.copy(
+                tiled_path,
                 local_path,
-                'w',
                 driver='GTiff',
-                height=self.extent.ymax,
-                width=self.extent.xmax,
-                count=band_count,
-                dtype=dtype,
-                transform=transform,
-                crs=crs) as dataset:
-            for window in labels.get_windows():
-                class_labels = labels.get_label_arr(
-                    window, clip_extent=self.extent)
-                clipped_window = ((window.ymin,
-                                   window.ymin + class_labels.shape[0]),
-                                  (window.xmin,
-                                   window.xmin + class_labels.shape[1]))
-                if mask is not None:
-                    mask[clipped_window[0][0]:clipped_window[0][1],
-                         clipped_window[1][0]:clipped_window[1][
-                             1]] = class_labels
-                if self.class_trans:
-                    rgb_labels = self.class_trans.class_to_rgb(class_labels)
-                    for chan in range(3):
-                        dataset.write_band(
-                            chan + 1,
-                            rgb_labels[:, :, chan],
-                            window=clipped_window)
-                else:
-                    img = class_labels.astype(dtype)
-                    dataset.write_band(1, img, window=clipped_window)
+                copy_src_overviews=True,
+                **creation_options)
+        os.remove(tiled_path)
 
         upload_or_copy(local_path, self.uri)
 
-        if self.vector_output:
-            import mask_to_polygons.vectorification as vectorification
-            import mask_to_polygons.processing.denoise as denoise
+        if self.score_output and labels.has_scores():
+            self._save_scores(labels, creation_options)
 
+        if self.vector_output:
             for vo in self.vector_output:
-                denoise_radius = vo['denoise']
                 uri = vo['uri']
-                mode = vo['mode']
-                class_id = vo['class_id']
-                class_mask = np.array(mask == class_id, dtype=np.uint8)
                 local_geojson_path = get_local_path(uri, self.tmp_dir)
 
-                def transform(x, y):
-                    return self.crs_transformer.pixel_to_map((x, y))
-
-                if denoise_radius > 0:
-                    class_mask = denoise.denoise(class_mask, denoise_radius)
-
-                if uri and mode == 'buildings':
-                    options = vo['building_options']
-                    geojson = vectorification.geojson_from_mask(
-                        mask=class_mask,
-                        transform=transform,
-                        mode=mode,
-                        min_aspect_ratio=options['min_aspect_ratio'],
-                        min_area=options['min_area'],
-                        width_factor=options['element_width_factor'],
-                        thickness=options['element_thickness'])
-                elif uri and mode == 'polygons':
-                    geojson = vectorification.geojson_from_mask(
-                        mask=class_mask, transform=transform, mode=mode)
+                if self.vector_window_size:
+                    geojson = self._get_windowed_geojson(vo, local_path)
+                else:
+                    class_mask = np.array(
+                        mask == vo['class_id'], dtype=np.uint8)
+
+                    def transform(x, y):
+                        return self.crs_transformer.pixel_to_map((x, y))
+
+                    geojson = self._get_geojson(vo, class_mask, transform)
 
                 if local_geojson_path:
                     with open(local_geojson_path, 'w') as file_out:
                         file_out.write(geojson)
                         upload_or_copy(local_geojson_path, uri)
 
+    def _save_scores(self, labels, creation_options):
+        """Save the scores of each class as uint8 bands of a tiled GeoTIFF.
+
+        The scores are written one window at a time, so only the scores of a single
+        window are held in memory.
+        """
+        local_path = get_local_path(self.score_uri, self.tmp_dir)
+        make_dir(local_path, use_dirname=True)
+        windows = sorted(labels.get_windows(), key=lambda w: (w.ymin, w.xmin))
+
+        dataset = None
+        try:
+            for window in windows:
+                score_arr = labels.get_score_arr(
+                    window, clip_extent=self.extent)
+                if score_arr.size == 0:
+                    continue
+                if dataset is None:
+                    dataset = rasterio.open(
+                        local_path,
+                        'w',
+                        driver='GTiff',
+                        height=self.extent.ymax,
+                        width=self.extent.xmax,
+                        count=score_arr.shape[2],
+                        dtype=np.uint8,
+                        transform=self.crs_transformer.get_affine_transform(),
+                        crs=self.crs_transformer.get_image_crs(),
+                        **creation_options)
+                dataset.write(
+                    np.transpose(quantize_scores(score_arr), (2, 0, 1)),
+                    window=((window.ymin, window.ymin + score_arr.shape[0]),
+                            (window.xmin, window.xmin + score_arr.shape[1])))
+        finally:
+            if dataset is not None:
+                dataset.close()
+
+        if dataset is not None:
+            upload_or_copy(local_path, self.score_uri)
+
+    def _get_geojson(self, vo, class_mask, transform):
+        """Vectorize a mask of a single class.
+
+        Args:
+            vo: (dict) vector output configuration
+            class_mask: (np.ndarray) of shape (height, width) which is 1 where the
+                class is present
+            transform: function that maps (x, y) pixel coordinates in class_mask to
+                the coordinates to use in the output
+
+        Returns:
+            (str) GeoJSON with the polygons
+        """
+        import mask_to_polygons.vectorification as vectorification
+        import mask_to_polygons.processing.denoise as denoise
+
+        denoise_radius = vo['denoise']
+        uri = vo['uri']
+        mode = vo['mode']
+
+        if denoise_radius > 0:
+            class_mask = denoise.denoise(class_mask, denoise_radius)
+
+        if uri and mode == 'buildings':
+            options = vo['building_options']
+            geojson = vectorification.geojson_from_mask(
+                mask=class_mask,
+                transform=transform,
+                mode=mode,
+                min_aspect_ratio=options['min_aspect_ratio'],
+                min_area=options['min_area'],
+                width_factor=options['element_width_factor'],
+                thickness=options['element_thickness'])
+        elif uri and mode == 'polygons':
+            geojson = vectorification.geojson_from_mask(
+                mask=class_mask, transform=transform, mode=mode)
+
+        return geojson
+
+    def _get_windowed_geojson(self, vo, local_path):
+        """Vectorize the predictions of a single class one window at a time.
+
+        Each window is read from the saved predictions with a halo of extra pixels
+        around it, so that denoising gives the same result as it would over the whole
+        scene. The polygons are clipped to the window, and polygons that cross the
+        seams between windows are merged afterwards, so only one window of the mask
+        is held in memory at a time.
+
+        Args:
+            vo: (dict) vector output configuration
+            local_path: (str) path to the GeoTIFF that the predictions were saved to
+
+        Returns:
+            (str) GeoJSON with the polygons in map coordinates
+        """
+        halo = 2 * vo['denoise'] + 1
+        window_size = self.vector_window_size
+        polygons = []
+
+        with rasterio.open(local_path) as dataset:
+            for window in self.extent.get_windows(window_size, window_size):
+                window = window.intersection(self.extent)
+                outer = Box(
+                    max(window.ymin - halo, 0), max(window.xmin - halo, 0),
+                    min(window.ymax + halo, self.extent.ymax),
+                    min(window.xmax + halo, self.extent.xmax))
+                raw_labels = dataset.read(
+                    window=((outer.ymin, outer.ymax), (outer.xmin,
+                                                       outer.xmax)))
+                class_labels = self._raw_to_class(
+                    np.transpose(raw_labels, (1, 2, 0)))
+                class_mask = np.array(
+                    class_labels == vo['class_id'], dtype=np.uint8)
+                if not np.any(class_mask):
+                    continue
+
+                def transform(x, y):
+                    return (x + outer.xmin, y + outer.ymin)
+
+                geojson = json.loads(
+                    self._get_geojson(vo, class_mask, transform))
+                window_geom = window.to_shapely()
+                for feature in geojson['features']:
+                    geom = shape(feature['geometry']).intersection(window_geom)
+                    if geom.geom_type == 'Polygon':
+                        polygons.append(geom)
+                    elif hasattr(geom, 'geoms'):
+                        polygons.extend(
+                            g for g in geom.geoms if g.geom_type == 'Polygon')
+
+        def pixel_to_map(x, y):
+            return self.crs_transformer.pixel_to_map((x, y))
+
+        features = []
+        for polygon in merge_touching_polygons(polygons):
+            if polygon.is_empty:
+                continue
+            features.append({
+                'type':
+                'Feature',
+                'geometry':
+                mapping(transform_geom(pixel_to_map, polygon)),
+                'properties': {}
+            })
+        return json.dumps({'type': 'FeatureCollection', 'features': features})
+
     def empty_labels(self):
         """Returns an empty SemanticSegmentationLabels object."""
         return SemanticSegmentationLabels()
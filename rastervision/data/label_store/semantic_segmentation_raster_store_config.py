@@ -4,17 +4,26 @@ from copy import deepcopy
 import rastervision as rv
 from rastervision.data.label_store import (
     LabelStoreConfig, LabelStoreConfigBuilder, SemanticSegmentationRasterStore)
+from rastervision.data.label_store.semantic_segmentation_raster_store import (
+    get_score_uri)
 from rastervision.protos.label_store_pb2 import LabelStoreConfig as LabelStoreConfigMsg
 
 VectorOutput = LabelStoreConfigMsg.SemanticSegmentationRasterStore.VectorOutput
 
 
 class SemanticSegmentationRasterStoreConfig(LabelStoreConfig):
-    def __init__(self, uri=None, vector_output=[], rgb=False):
+    def __init__(self,
+                 uri=None,
+                 vector_output=[],
+                 rgb=False,
+                 vector_window_size=0,
+                 score_output=False):
         super().__init__(store_type=rv.SEMANTIC_SEGMENTATION_RASTER)
         self.uri = uri
         self.vector_output = vector_output
         self.rgb = rgb
+        self.vector_window_size = vector_window_size
+        self.score_output = score_output
 
     def to_proto(self):
         """Turn this configuration into a ProtoBuf message.
@@ -75,6 +84,10 @@ class SemanticSegmentationRasterStoreConfig(LabelStoreConfig):
                 ar.append(vo_msg)
             msg.semantic_segmentation_raster_store.vector_output.extend(ar)
         msg.semantic_segmentation_raster_store.rgb = self.rgb
+        msg.semantic_segmentation_raster_store.vector_window_size = \
+            self.vector_window_size
+        msg.semantic_segmentation_raster_store.score_output = \
+            self.score_output
         return msg
 
     def for_prediction(self, label_uri):
@@ -93,7 +106,9 @@ class SemanticSegmentationRasterStoreConfig(LabelStoreConfig):
             crs_transformer,
             tmp_dir,
             vector_output=self.vector_output,
-            class_map=class_map)
+            class_map=class_map,
+            vector_window_size=self.vector_window_size,
+            score_output=self.score_output)
 
     def update_for_command(self, command_type, experiment_config,
                            context=None):
@@ -132,6 +147,8 @@ class SemanticSegmentationRasterStoreConfig(LabelStoreConfig):
             for vo in self.vector_output:
                 io_def.add_output(vo['uri'])
             io_def.add_output(self.uri)
+            if self.score_output:
+                io_def.add_output(get_score_uri(self.uri))
 
         if command_type == rv.EVAL:
             if self.uri:
@@ -143,6 +160,9 @@ class SemanticSegmentationRasterStoreConfig(LabelStoreConfig):
             for vo in self.vector_output:
                 io_def.add_input(vo['uri'])
 
+            if self.uri and self.score_output:
+                io_def.add_input(get_score_uri(self.uri))
+
 
 class SemanticSegmentationRasterStoreConfigBuilder(LabelStoreConfigBuilder):
     def __init__(self, prev=None):
@@ -152,6 +172,8 @@ class SemanticSegmentationRasterStoreConfigBuilder(LabelStoreConfigBuilder):
                 'uri': prev.uri,
                 'vector_output': prev.vector_output,
                 'rgb': prev.rgb,
+                'vector_window_size': prev.vector_window_size,
+                'score_output': prev.score_output
             }
 
         super().__init__(SemanticSegmentationRasterStoreConfig, config)
@@ -161,10 +183,15 @@ class SemanticSegmentationRasterStoreConfigBuilder(LabelStoreConfigBuilder):
         uri = msg.semantic_segmentation_raster_store.uri
         rgb = msg.semantic_segmentation_raster_store.rgb
         vo_msg = msg.semantic_segmentation_raster_store.vector_output
+        vector_window_size = \
+            msg.semantic_segmentation_raster_store.vector_window_size
+        score_output = msg.semantic_segmentation_raster_store.score_output
 
         return self.with_uri(uri) \
                    .with_vector_output(vo_msg) \
-                   .with_rgb(rgb)
+                   .with_rgb(rgb) \
+                   .with_vector_window_size(vector_window_size) \
+                   .with_score_output(score_output)
 
     def with_uri(self, uri):
         """Set URI for a GeoTIFF used to read/write predictions."""
@@ -223,14 +250,51 @@ class SemanticSegmentationRasterStoreConfigBuilder(LabelStoreConfigBuilder):
         return b
 
     def with_rgb(self, rgb):
-        """Set flag for writing RGB data using the class map.
+        """Set flag for writing the colors of the class map as a color palette.
 
-        Otherwise this method will write the class ID into a single band.
+        The class ID is always written into a single band. If this flag is set, the
+        band has a color palette with the colors of the class map, so that viewers
+        display it in RGB.
         """
         b = deepcopy(self)
         b.config['rgb'] = rgb
         return b
 
+    def with_vector_window_size(self, vector_window_size):
+        """Vectorize predictions one window at a time.
+
+        By default, a mask of the whole scene is held in memory while computing
+        vector output, which can run out of memory for large scenes. If
+        vector_window_size > 0, the predictions are instead vectorized in windows of
+        that size, and polygons that cross the seams between windows are merged, so
+        that memory use is bounded by the window size. This is only supported for
+        vector outputs in polygons mode, since the filters of buildings mode would
+        see buildings that cross a seam in pieces.
+
+        Args:
+            vector_window_size: (int) size of windows in pixels, or 0 to vectorize
+                the whole scene at once
+        """
+        b = deepcopy(self)
+        b.config['vector_window_size'] = vector_window_size
+        return b
+
+    def with_score_output(self, score_output):
+        """Save the score of each class along with the predicted classes.
+
+        The scores are saved as one band of uint8 values per class, where 255 is a
+        score of 1, in a tiled GeoTIFF next to the predictions with a -scores
+        suffix. They are read back by get_labels, so that the predictions can be
+        thresholded differently without running prediction again. This requires a
+        backend that implements predict_scores.
+
+        Args:
+            score_output: (bool) whether to save the scores
+        """
+        b = deepcopy(self)
+        b.config['score_output'] = score_output
+        return b
+
     def validate(self):
         vector_output = self.config.get('vector_output')
 
@@ -261,3 +325,11 @@ class SemanticSegmentationRasterStoreConfigBuilder(LabelStoreConfigBuilder):
                     raise rv.ConfigError(
                         'mode key in vector_output dictionary must be one of {}'
                         .format(self.valid_modes))
+
+        if vector_output and self.config.get('vector_window_size'):
+            for vo in vector_output:
+                mode = vo['mode'] if isinstance(vo, dict) else vo.mode
+                if mode == 'buildings':
+                    raise rv.ConfigError(
+                        'vector_window_size can only be used with vector outputs '
+                        'in polygons mode, not buildings mode')
@@ -1,3 +1,7 @@
+from shapely.ops import unary_union
+from shapely.strtree import STRtree
+
+
 def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
                      scores=None):
     """Convert boxes and associated data into a GeoJSON dict.
@@ -47,3 +51,52 @@ def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
         features.append(feature)
 
     return {'type': 'FeatureCollection', 'features': features}
+
+
+def merge_touching_polygons(polygons):
+    """Merge polygons that share an edge into single polygons.
+
+    This is used to stitch together polygons that were split along the seams of
+    the windows that a mask was vectorized in. Polygons that only touch at a
+    point are not merged.
+
+    Args:
+        polygons: list of shapely Polygons
+
+    Returns:
+        list of shapely Polygons
+    """
+    if not polygons:
+        return []
+
+    # Union-find over the indices of the polygons.
+    parents = list(range(len(polygons)))
+
+    def find(ind):
+        while parents[ind] != ind:
+            parents[ind] = parents[parents[ind]]
+            ind = parents[ind]
+        return ind
+
+    polygon_inds = dict((id(p), ind) for ind, p in enumerate(polygons))
+    tree = STRtree(polygons)
+    for ind, polygon in enumerate(polygons):
+        for other in tree.query(polygon):
+            other_ind = polygon_inds[id(other)]
+            if other_ind <= ind:
+                continue
+            if polygon.intersection(other).length > 0:
+                parents[find(other_ind)] = find(ind)
+
+    groups = {}
+    for ind, polygon in enumerate(polygons):
+        groups.setdefault(find(ind), []).append(polygon)
+
+    merged = []
+    for group in groups.values():
+        geom = group[0] if len(group) == 1 else unary_union(group)
+        if geom.geom_type == 'Polygon':
+            merged.append(geom)
+        else:
+            merged.extend(g for g in geom.geoms if g.geom_type == 'Polygon')
+    return merged
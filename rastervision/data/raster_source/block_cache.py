@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from threading import RLock
+
+import numpy as np
+from rasterio.windows import Window
+
+
+class BlockCache():
+    """A least-recently-used cache of decoded raster blocks bounded by size in bytes.
+
+    Blocks are evicted in least-recently-used order whenever the total size of the
+    cached arrays exceeds max_bytes. The number of cache hits and misses is recorded
+    so the effectiveness of the cache can be monitored.
+    """
+
+    def __init__(self, max_bytes):
+        """Constructor.
+
+        Args:
+            max_bytes: (int) maximum total size of the cached arrays in bytes
+        """
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def get(self, key):
+        """Return the array stored under key, or None if it is not cached."""
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+    def put(self, key, block):
+        """Store an array under key, evicting old blocks if needed.
+
+        Arrays that are larger than max_bytes are not stored.
+        """
+        with self._lock:
+            if block.nbytes > self.max_bytes:
+                return
+            old_block = self._blocks.pop(key, None)
+            if old_block is not None:
+                self.num_bytes -= old_block.nbytes
+            self._blocks[key] = block
+            self.num_bytes += block.nbytes
+            while self.num_bytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self.num_bytes -= evicted.nbytes
+
+    def clear(self):
+        """Remove all blocks from the cache.
+
+        The hit and miss counters are not reset.
+        """
+        with self._lock:
+            self._blocks.clear()
+            self.num_bytes = 0
+
+    def get_stats(self):
+        """Return a dict with the number of hits, misses, blocks and bytes cached."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'blocks': len(self._blocks),
+                'bytes': self.num_bytes
+            }
+
+
+class BlockReader():
+    """Reads windows from a Rasterio dataset by assembling cached native blocks.
+
+    Each window is split along the block grid of the dataset, and each block is only
+    decoded the first time it is needed. This avoids decoding the same compressed
+    blocks over and over when reading overlapping windows.
+    """
+
+    def __init__(self, image_dataset, cache, is_masked=False):
+        """Constructor.
+
+        Args:
+            image_dataset: a Rasterio dataset
+            cache: (BlockCache) used to store decoded blocks
+            is_masked: If True, read masked arrays from rasterio and fill masked
+                pixels with zeros
+        """
+        self.image_dataset = image_dataset
+        self.cache = cache
+        self.is_masked = is_masked
+        self.block_height, self.block_width = image_dataset.block_shapes[0]
+        self._lock = RLock()
+
+    @staticmethod
+    def can_read(image_dataset):
+        """Return True if all bands of image_dataset share the same block shape."""
+        return len(set(image_dataset.block_shapes)) == 1
+
+    def _read_block(self, block_row, block_col):
+        # Rasterio datasets can't be read from concurrently, so decoding a block is
+        # done while holding the lock.
+        with self._lock:
+            key = (block_row, block_col)
+            block = self.cache.get(key)
+            if block is not None:
+                return block
+
+            row_off = block_row * self.block_height
+            col_off = block_col * self.block_width
+            height = min(self.block_height,
+                         self.image_dataset.height - row_off)
+            width = min(self.block_width, self.image_dataset.width - col_off)
+            window = Window(col_off, row_off, width, height)
+            if self.is_masked:
+                block = self.image_dataset.read(window=window, masked=True)
+                block = np.ma.filled(block, fill_value=0)
+            else:
+                block = self.image_dataset.read(window=window)
+
+            # Handle non-zero NODATA values by setting the data to 0.
+            for channel, nodata in enumerate(self.image_dataset.nodatavals):
+                if nodata is not None and nodata != 0:
+                    block[channel, block[channel] == nodata] = 0
+
+            self.cache.put(key, block)
+            return block
+
+    def read(self, window):
+        """Read a window from the dataset.
+
+        Args:
+            window: ((row_start, row_stop), (col_start, col_stop)) with integer
+                values. The window may extend beyond the dataset, in which case the
+                pixels outside are set to zero.
+
+        Returns:
+            np.ndarray of shape (height, width, channels) where channels is the
+                number of channels in the image_dataset.
+        """
+        (row_start, row_stop), (col_start, col_stop) = window
+        im = np.zeros(
+            (self.image_dataset.count, row_stop - row_start,
+             col_stop - col_start),
+            dtype=self.image_dataset.dtypes[0])
+
+        # Clip the window to the extent of the dataset.
+        ymin = max(row_start, 0)
+        ymax = min(row_stop, self.image_dataset.height)
+        xmin = max(col_start, 0)
+        xmax = min(col_stop, self.image_dataset.width)
+
+        if ymin < ymax and xmin < xmax:
+            for block_row in range(ymin // self.block_height,
+                                   (ymax - 1) // self.block_height + 1):
+                block_ymin = block_row * self.block_height
+                for block_col in range(xmin // self.block_width,
+                                       (xmax - 1) // self.block_width + 1):
+                    block_xmin = block_col * self.block_width
+                    block = self._read_block(block_row, block_col)
+
+                    # Intersection of the window and block in dataset coordinates.
+                    y0 = max(ymin, block_ymin)
+                    y1 = min(ymax, block_ymin + block.shape[1])
+                    x0 = max(xmin, block_xmin)
+                    x1 = min(xmax, block_xmin + block.shape[2])
+
+                    out_rows = slice(y0 - row_start, y1 - row_start)
+                    out_cols = slice(x0 - col_start, x1 - col_start)
+                    block_rows = slice(y0 - block_ymin, y1 - block_ymin)
+                    block_cols = slice(x0 - block_xmin, x1 - block_xmin)
+                    im[:, out_rows, out_cols] = block[:, block_rows,
+                                                      block_cols]
+
+        return np.transpose(im, axes=[1, 2, 0])
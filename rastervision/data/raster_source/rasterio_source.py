@@ -1,3 +1,4 @@
+from contextlib import ExitStack
 import logging
 import math
 import os
@@ -5,16 +6,21 @@ import pyproj
 import subprocess
 from decimal import Decimal
 import tempfile
+from threading import Lock
+from urllib.parse import urlparse
 
 import numpy as np
 import rasterio
 from rasterio.enums import (ColorInterp, MaskFlags)
+from rasterio.errors import RasterioIOError
 
 from rastervision.core.box import Box
 from rastervision.data.crs_transformer import RasterioCRSTransformer
-from rastervision.utils.files import download_if_needed
+from rastervision.utils.files import download_all_if_needed
 from rastervision.data import (ActivateMixin, ActivationError)
 from rastervision.data.raster_source import RasterSource
+from rastervision.data.raster_source.block_cache import (BlockCache,
+                                                         BlockReader)
 
 log = logging.getLogger(__name__)
 wgs84 = pyproj.Proj({'init': 'epsg:4326'})
@@ -22,19 +28,56 @@ wgs84_proj4 = '+init=epsg:4326'
 meters_per_degree = 111319.5
 
 
-def build_vrt(vrt_path, image_paths):
-    """Build a VRT for a set of TIFF files."""
+def build_vrt(vrt_path, image_paths, gdal_options=None):
+    """Build a VRT for a set of TIFF files.
+
+    Args:
+        vrt_path: path of the VRT to write
+        image_paths: paths of the files, which can be GDAL virtual filesystem paths
+        gdal_options: dict of GDAL config options to set while building the VRT
+    """
     cmd = ['gdalbuildvrt', vrt_path]
     cmd.extend(image_paths)
-    subprocess.run(cmd)
+    env = None
+    if gdal_options:
+        env = dict(os.environ)
+        env.update({k: str(v) for k, v in gdal_options.items()})
+    subprocess.run(cmd, env=env)
+
+
+def get_vsi_path(uri):
+    """Return the path to read a remote file from through GDAL's virtual filesystem.
+
+    Args:
+        uri: (string) URI of a file
+
+    Returns:
+        (string) a /vsis3/ or /vsicurl/ path, or None if the file is not on S3 or
+            HTTP(S) and can't be streamed
+    """
+    parsed_uri = urlparse(uri)
+    if parsed_uri.scheme == 's3':
+        return '/vsis3/{}{}'.format(parsed_uri.netloc, parsed_uri.path)
+    if parsed_uri.scheme in ['http', 'https']:
+        return '/vsicurl/{}'.format(uri)
+    return None
 
 
-def download_and_build_vrt(image_uris, temp_dir):
-    log.info('Building VRT...')
-    image_paths = [download_if_needed(uri, temp_dir) for uri in image_uris]
-    image_path = os.path.join(temp_dir, 'index.vrt')
-    build_vrt(image_path, image_paths)
-    return image_path
+def get_stream_gdal_options(cache_size_mb, readahead_kb):
+    """Return the GDAL config options used to stream remote files.
+
+    Args:
+        cache_size_mb: (int) size of the cache of bytes read from each remote file
+        readahead_kb: (int) minimum number of bytes to fetch with each request
+    """
+    return {
+        # Don't list the remote directory looking for sidecar files.
+        'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+        'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+        'VSI_CACHE': 'TRUE',
+        'VSI_CACHE_SIZE': cache_size_mb * 1024 * 1024,
+        'CPL_VSIL_CURL_CHUNK_SIZE': readahead_kb * 1024
+    }
 
 
 def load_window(image_dataset, window=None, is_masked=False):
@@ -72,7 +115,11 @@ class RasterioSource(ActivateMixin, RasterSource):
                  temp_dir,
                  channel_order=None,
                  x_shift_meters=0.0,
-                 y_shift_meters=0.0):
+                 y_shift_meters=0.0,
+                 block_cache_size_mb=0,
+                 stream=False,
+                 stream_cache_size_mb=64,
+                 stream_readahead_kb=256):
         """Constructor.
 
         This RasterSource can read any file that can be opened by Rasterio/GDAL
@@ -82,15 +129,42 @@ class RasterioSource(ActivateMixin, RasterSource):
         If channel_order is None, then use non-alpha channels. This also sets any
         masked or NODATA pixel values to be zeros.
 
+        If block_cache_size_mb > 0, windows are read by decoding the native blocks
+        of the raster (ie. tiles or strips) that they overlap, and keeping the
+        decoded blocks in an LRU cache. This avoids decoding the same blocks many
+        times when reading overlapping windows.
+
+        If stream is True, files on S3 or HTTP(S) are read in place through GDAL's
+        virtual filesystem (/vsis3/ and /vsicurl/) using range requests, so only
+        the parts of the files that are needed are fetched. This is only done for
+        tiled files such as cloud-optimized GeoTIFFs; other files are downloaded.
+
         Args:
             channel_order: list of indices of channels to extract from raw imagery
+            block_cache_size_mb: maximum size of the cache of decoded blocks in
+                megabytes. If 0, windows are read directly from the raster.
+            stream: if True, stream tiled remote files instead of downloading them
+            stream_cache_size_mb: size of the cache of bytes read from each
+                streamed file in megabytes
+            stream_readahead_kb: minimum number of kilobytes to fetch with each
+                request when streaming
         """
         self.uris = uris
         self.temp_dir = temp_dir
         self.image_temp_dir = None
         self.image_dataset = None
+        self.download_stack = None
         self.x_shift_meters = x_shift_meters
         self.y_shift_meters = y_shift_meters
+        self.block_cache = None
+        if block_cache_size_mb > 0:
+            self.block_cache = BlockCache(block_cache_size_mb * 1024 * 1024)
+        self.block_reader = None
+        self.read_lock = None
+        self.gdal_options = None
+        if stream:
+            self.gdal_options = get_stream_gdal_options(
+                stream_cache_size_mb, stream_readahead_kb)
 
         num_channels = None
 
@@ -130,11 +204,53 @@ class RasterioSource(ActivateMixin, RasterSource):
         """Download any data needed for this Raster Source.
 
         Return a single local path representing the image or a VRT of the data.
+        Files in the download cache are kept until the source is deactivated.
         """
-        if len(self.uris) == 1:
-            return download_if_needed(self.uris[0], temp_dir)
-        else:
-            return download_and_build_vrt(self.uris, temp_dir)
+        image_paths = self.download_stack.enter_context(
+            download_all_if_needed(self.uris, temp_dir))
+        if len(image_paths) == 1:
+            return image_paths[0]
+        log.info('Building VRT...')
+        image_path = os.path.join(temp_dir, 'index.vrt')
+        build_vrt(image_path, image_paths)
+        return image_path
+
+    def _get_gdal_env(self):
+        """Return a context manager that sets the GDAL options used to stream."""
+        if self.gdal_options is None:
+            return ExitStack()
+        return rasterio.Env(**self.gdal_options)
+
+    def _open_stream(self, temp_dir):
+        """Open the remote files without downloading them.
+
+        Returns None if any of the files are not remote or not tiled, in which
+        case they need to be downloaded.
+        """
+        vsi_paths = [get_vsi_path(uri) for uri in self.uris]
+        if any(vsi_path is None for vsi_path in vsi_paths):
+            return None
+
+        for uri, vsi_path in zip(self.uris, vsi_paths):
+            try:
+                image_dataset = rasterio.open(vsi_path)
+            except RasterioIOError as e:
+                log.warning(
+                    'Could not stream {}, so it will be downloaded: {}'.format(
+                        uri, e))
+                return None
+            if not image_dataset.profile.get('tiled', False):
+                log.info(
+                    '{} is not tiled, so it will be downloaded.'.format(uri))
+                image_dataset.close()
+                return None
+            if len(vsi_paths) == 1:
+                return image_dataset
+            image_dataset.close()
+
+        vrt_path = os.path.join(temp_dir, 'index.vrt')
+        build_vrt(vrt_path, vsi_paths, gdal_options=self.gdal_options)
+        return rasterio.open(vrt_path)
 
     def get_crs_transformer(self):
         return self.crs_transformer
@@ -146,20 +262,61 @@ class RasterioSource(ActivateMixin, RasterSource):
         """Return the numpy.dtype of this scene"""
         return self.dtype
 
+    def _get_block_reader(self, window):
+        """Return a BlockReader that can read window, or None if there isn't one."""
+        if self.block_cache is None:
+            return None
+        # Windows with fractional pixel coordinates (which can result from shifting)
+        # need to be resampled by Rasterio.
+        if not all(float(v).is_integer() for v in window.tuple_format()):
+            return None
+        if self.block_reader is None and BlockReader.can_read(
+                self.image_dataset):
+            self.block_reader = BlockReader(
+                self.image_dataset, self.block_cache, is_masked=self.is_masked)
+        return self.block_reader
+
     def _get_chip(self, window):
         if self.image_dataset is None:
             raise ActivationError('RasterSource must be activated before use')
         shifted_window = self._get_shifted_window(window)
-        return load_window(
-            self.image_dataset,
-            window=shifted_window.rasterio_format(),
-            is_masked=self.is_masked)
+        block_reader = self._get_block_reader(shifted_window)
+        with self._get_gdal_env():
+            if block_reader is not None:
+                ymin, xmin, ymax, xmax = map(int,
+                                             shifted_window.tuple_format())
+                return block_reader.read(((ymin, ymax), (xmin, xmax)))
+            # Rasterio datasets can't be read from concurrently.
+            with self.read_lock:
+                return load_window(
+                    self.image_dataset,
+                    window=shifted_window.rasterio_format(),
+                    is_masked=self.is_masked)
+
+    def get_block_cache_stats(self):
+        """Return a dict with the hits and misses of the block cache.
+
+        Returns None if the block cache is disabled.
+        """
+        if self.block_cache is None:
+            return None
+        return self.block_cache.get_stats()
 
     def _activate(self):
         # Download images to temporary directory and delete it when done.
         self.image_temp_dir = tempfile.TemporaryDirectory(dir=self.temp_dir)
-        self.imagery_path = self._download_data(self.image_temp_dir.name)
-        self.image_dataset = rasterio.open(self.imagery_path)
+        self.download_stack = ExitStack()
+        image_dataset = None
+        if self.gdal_options is not None:
+            with self._get_gdal_env():
+                image_dataset = self._open_stream(self.image_temp_dir.name)
+        if image_dataset is None:
+            self.imagery_path = self._download_data(self.image_temp_dir.name)
+            image_dataset = rasterio.open(self.imagery_path)
+        else:
+            self.imagery_path = image_dataset.name
+        self.image_dataset = image_dataset
+        self.read_lock = Lock()
         self._set_crs_transformer()
 
     def _set_crs_transformer(self):
@@ -173,8 +330,16 @@ class RasterioSource(ActivateMixin, RasterSource):
         self.crs = str(self.crs)
 
     def _deactivate(self):
+        if self.block_cache is not None:
+            log.debug('Block cache stats for {}: {}'.format(
+                self.uris, self.block_cache.get_stats()))
+            self.block_cache.clear()
+            self.block_reader = None
         self.image_dataset.close()
         self.image_dataset = None
+        self.read_lock = None
+        self.download_stack.close()
+        self.download_stack = None
         self.image_temp_dir.cleanup()
         self.image_temp_dir = None
 
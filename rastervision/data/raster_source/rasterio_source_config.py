@@ -1,7 +1,8 @@
 from copy import deepcopy
 
 import rastervision as rv
-from rastervision.data.raster_source.rasterio_source import RasterioSource
+from rastervision.data.raster_source.rasterio_source import (RasterioSource,
+                                                             get_vsi_path)
 from rastervision.data.raster_source.raster_source_config \
     import (RasterSourceConfig, RasterSourceConfigBuilder)
 from rastervision.protos.raster_source_pb2 \
@@ -15,7 +16,11 @@ class RasterioSourceConfig(RasterSourceConfig):
                  x_shift_meters=0.0,
                  y_shift_meters=0.0,
                  transformers=None,
-                 channel_order=None):
+                 channel_order=None,
+                 block_cache_size_mb=0,
+                 stream=False,
+                 stream_cache_size_mb=64,
+                 stream_readahead_kb=256):
         super().__init__(
             source_type=rv.RASTERIO_SOURCE,
             transformers=transformers,
@@ -23,6 +28,10 @@ class RasterioSourceConfig(RasterSourceConfig):
         self.uris = uris
         self.x_shift_meters = x_shift_meters
         self.y_shift_meters = y_shift_meters
+        self.block_cache_size_mb = block_cache_size_mb
+        self.stream = stream
+        self.stream_cache_size_mb = stream_cache_size_mb
+        self.stream_readahead_kb = stream_readahead_kb
 
     def to_proto(self):
         msg = super().to_proto()
@@ -30,7 +39,11 @@ class RasterioSourceConfig(RasterSourceConfig):
             RasterSourceConfigMsg.RasterioSource(
                 uris=self.uris,
                 x_shift_meters=self.x_shift_meters,
-                y_shift_meters=self.y_shift_meters))
+                y_shift_meters=self.y_shift_meters,
+                block_cache_size_mb=self.block_cache_size_mb,
+                stream=self.stream,
+                stream_cache_size_mb=self.stream_cache_size_mb,
+                stream_readahead_kb=self.stream_readahead_kb))
         return msg
 
     def save_bundle_files(self, bundle_dir):
@@ -48,7 +61,10 @@ class RasterioSourceConfig(RasterSourceConfig):
                    .build()
 
     def create_local(self, tmp_dir):
-        new_uris = [download_if_needed(uri, tmp_dir) for uri in self.uris]
+        new_uris = [
+            uri if self.stream and get_vsi_path(uri) else download_if_needed(
+                uri, tmp_dir, use_cache=True) for uri in self.uris
+        ]
         return self.to_builder() \
                    .with_uris(new_uris) \
                    .build()
@@ -67,7 +83,11 @@ class RasterioSourceConfig(RasterSourceConfig):
             temp_dir=tmp_dir,
             channel_order=self.channel_order,
             x_shift_meters=x_shift_meters,
-            y_shift_meters=y_shift_meters)
+            y_shift_meters=y_shift_meters,
+            block_cache_size_mb=self.block_cache_size_mb,
+            stream=self.stream,
+            stream_cache_size_mb=self.stream_cache_size_mb,
+            stream_readahead_kb=self.stream_readahead_kb)
 
     def report_io(self, command_type, io_def):
         super().report_io(command_type, io_def)
@@ -90,6 +110,10 @@ class RasterioSourceConfigBuilder(RasterSourceConfigBuilder):
                 'channel_order': prev.channel_order,
                 'x_shift_meters': prev.x_shift_meters,
                 'y_shift_meters': prev.y_shift_meters,
+                'block_cache_size_mb': prev.block_cache_size_mb,
+                'stream': prev.stream,
+                'stream_cache_size_mb': prev.stream_cache_size_mb,
+                'stream_readahead_kb': prev.stream_readahead_kb,
             }
 
         super().__init__(RasterioSourceConfig, config)
@@ -119,9 +143,14 @@ class RasterioSourceConfigBuilder(RasterSourceConfigBuilder):
             else:
                 source = msg.rasterio_source
 
-            return b \
+            b = b \
                 .with_uris(source.uris) \
                 .with_shifts(source.x_shift_meters, source.y_shift_meters)
+            if msg.HasField('rasterio_source'):
+                b = b.with_block_cache_size(source.block_cache_size_mb) \
+                     .with_stream(source.stream, source.stream_cache_size_mb,
+                                  source.stream_readahead_kb)
+            return b
         elif msg.HasField('image_file'):
             source = msg.image_file
             return b.with_uri(source.uri)
@@ -158,3 +187,38 @@ class RasterioSourceConfigBuilder(RasterSourceConfigBuilder):
         b.config['x_shift_meters'] = x
         b.config['y_shift_meters'] = y
         return b
+
+    def with_block_cache_size(self, size_mb):
+        """Set the size of the cache of decoded raster blocks.
+
+        When reading a window, the native blocks (ie. tiles or strips) of the raster
+        that overlap it are decoded and stored in an LRU cache, so that overlapping
+        windows don't decode the same blocks again.
+
+        Args:
+            size_mb: (int) maximum size of the cache in megabytes. If 0, windows
+                are read directly from the raster without a cache.
+        """
+        b = deepcopy(self)
+        b.config['block_cache_size_mb'] = size_mb
+        return b
+
+    def with_stream(self, stream=True, cache_size_mb=64, readahead_kb=256):
+        """Set whether to stream remote files instead of downloading them.
+
+        Tiled files (such as cloud-optimized GeoTIFFs) on S3 or HTTP(S) are read
+        through GDAL's virtual filesystem using range requests, so only the parts
+        that are needed are fetched. Files that are not tiled are still
+        downloaded.
+
+        Args:
+            stream: (bool) whether to stream remote files
+            cache_size_mb: (int) size of the cache of bytes read from each file in
+                megabytes
+            readahead_kb: (int) minimum number of kilobytes fetched by each request
+        """
+        b = deepcopy(self)
+        b.config['stream'] = stream
+        b.config['stream_cache_size_mb'] = cache_size_mb
+        b.config['stream_readahead_kb'] = readahead_kb
+        return b
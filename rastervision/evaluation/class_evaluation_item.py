@@ -19,7 +19,8 @@ class ClassEvaluationItem(EvaluationItem):
                  class_id=None,
                  class_name=None,
                  conf_mat=None,
-                 iou=None):
+                 iou=None,
+                 ap=None):
         self.precision = precision
         self.recall = recall
         self.f1 = f1
@@ -31,6 +32,8 @@ class ClassEvaluationItem(EvaluationItem):
         self.conf_mat = conf_mat
         self.class_id = class_id
         self.class_name = class_name
+        # Average precision, which is only computed for object detection.
+        self.ap = ap
 
     def merge(self, other):
         """Merges another item from a different scene into this one.
@@ -56,6 +59,8 @@ class ClassEvaluationItem(EvaluationItem):
             self.iou = weighted_avg(self.iou, other.iou)
             self.count_error = weighted_avg(self.count_error,
                                             other.count_error)
+            if self.ap is not None or other.ap is not None:
+                self.ap = weighted_avg(self.ap, other.ap)
             self.gt_count = total_gt_count
 
         if other.conf_mat is not None:
@@ -81,6 +86,8 @@ class ClassEvaluationItem(EvaluationItem):
             new_dict[k] = v.tolist() if isinstance(v, np.ndarray) else v
         if new_dict['conf_mat'] is None:
             del new_dict['conf_mat']
+        if new_dict['ap'] is None:
+            del new_dict['ap']
         return new_dict
 
     def __repr__(self):
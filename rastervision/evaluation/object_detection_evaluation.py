@@ -1,81 +1,231 @@
 import numpy as np
-import shapely
-import shapely.strtree
-import shapely.geometry
 
 from rastervision.data import ObjectDetectionLabels
+from rastervision.data.label.box_index import BoxIndex
+from rastervision.data.label.tfod_utils import np_box_ops
 from rastervision.evaluation import ClassEvaluationItem
 from rastervision.evaluation import ClassificationEvaluation
 
 
+def get_iou_pairs(gt_npboxes, pred_npboxes, min_iou, block_size=256):
+    """Find the pairs of ground truth and predicted boxes that overlap.
+
+    The predictions are sorted into horizontal bands (and by xmin within each band)
+    and split into blocks of block_size boxes, so that each block covers a compact
+    area. The IoU matrix of each block is only computed against the ground truth
+    boxes that intersect the extent of the block, so the matrices stay small even
+    when there are a lot of boxes.
+
+    Args:
+        gt_npboxes: float numpy array of size nx4
+        pred_npboxes: float numpy array of size mx4
+        min_iou: (float) only pairs with IoU greater than this are returned
+        block_size: (int) number of predictions per IoU matrix
+
+    Returns:
+        (pred_inds, gt_inds, ious) numpy arrays with an element per pair
+    """
+    pred_inds, gt_inds, ious = [], [], []
+    if len(gt_npboxes) > 0 and len(pred_npboxes) > 0:
+        gt_index = BoxIndex(gt_npboxes)
+        # Make the bands about as tall as a block of predictions is wide.
+        pred_min = pred_npboxes[:, 0:2].min(axis=0)
+        pred_max = pred_npboxes[:, 2:4].max(axis=0)
+        extent_size = pred_max - pred_min
+        band_height = max(
+            np.sqrt(np.prod(extent_size) * block_size / len(pred_npboxes)),
+            gt_index.cell_size)
+        bands = np.floor(pred_npboxes[:, 0] / band_height)
+        order = np.lexsort((pred_npboxes[:, 1], bands))
+        # Blocks don't cross bands, otherwise they would span the whole extent.
+        band_starts = np.nonzero(np.diff(bands[order]))[0] + 1
+        band_starts = np.concatenate([[0], band_starts, [len(order)]])
+        block_starts = np.concatenate([
+            np.arange(band_start, band_end, block_size)
+            for band_start, band_end in zip(band_starts[:-1], band_starts[1:])
+        ] + [[len(order)]])
+        for start, end in zip(block_starts[:-1], block_starts[1:]):
+            block_inds = order[start:end]
+            block = pred_npboxes[block_inds]
+            extent = np.concatenate(
+                [block[:, 0:2].min(axis=0), block[:, 2:4].max(axis=0)])
+            block_gt_inds = gt_index.query(extent)
+            if len(block_gt_inds) == 0:
+                continue
+
+            block_ious = np_box_ops.iou(block, gt_npboxes[block_gt_inds])
+            rows, cols = np.nonzero(block_ious > min_iou)
+            pred_inds.append(block_inds[rows])
+            gt_inds.append(block_gt_inds[cols])
+            ious.append(block_ious[rows, cols])
+
+    if len(pred_inds) == 0:
+        return (np.empty((0, ), dtype=np.int64), np.empty(
+            (0, ), dtype=np.int64), np.empty((0, )))
+    return (np.concatenate(pred_inds), np.concatenate(gt_inds),
+            np.concatenate(ious))
+
+
+def match_boxes(gt_npboxes, pred_npboxes, pred_scores, iou_threshs):
+    """Greedily match predicted boxes to ground truth boxes of a single class.
+
+    Predictions are visited in order of decreasing score, and each is matched to
+    the unmatched ground truth box that it has the highest IoU with, as long as the
+    IoU is greater than the threshold. Matching is done separately for each
+    threshold, but the IoUs are only computed once.
+
+    Args:
+        gt_npboxes: float numpy array of size nx4
+        pred_npboxes: float numpy array of size mx4
+        pred_scores: float numpy array of size m
+        iou_threshs: list of IoU thresholds
+
+    Returns:
+        bool numpy array of shape (len(iou_threshs), m) which is True for
+            predictions that are true positives
+    """
+    num_preds = len(pred_npboxes)
+    is_tp = np.zeros((len(iou_threshs), num_preds), dtype=bool)
+    if num_preds == 0 or len(gt_npboxes) == 0:
+        return is_tp
+
+    pred_inds, gt_inds, ious = get_iou_pairs(gt_npboxes, pred_npboxes,
+                                             min(iou_threshs))
+    # Visit pairs by decreasing score, then by prediction, then by decreasing IoU
+    # so that each prediction tries its best ground truth box first.
+    order = np.lexsort((-ious, pred_inds, -pred_scores[pred_inds]))
+    pred_inds, gt_inds, ious = pred_inds[order], gt_inds[order], ious[order]
+
+    for thresh_ind, iou_thresh in enumerate(iou_threshs):
+        is_pair = ious > iou_thresh
+        gt_matched = np.zeros((len(gt_npboxes), ), dtype=bool)
+        pred_matched = is_tp[thresh_ind]
+        for pred_ind, gt_ind in zip(pred_inds[is_pair].tolist(),
+                                    gt_inds[is_pair].tolist()):
+            if not (pred_matched[pred_ind] or gt_matched[gt_ind]):
+                pred_matched[pred_ind] = True
+                gt_matched[gt_ind] = True
+
+    return is_tp
+
+
+def compute_ap(is_tp, scores, gt_count):
+    """Compute the average precision of a set of predictions.
+
+    This is the area under the precision-recall curve after making precision
+    monotonically decreasing, using all points on the curve as in Pascal VOC.
+
+    Args:
+        is_tp: bool numpy array of size m that is True for true positives
+        scores: float numpy array of size m
+        gt_count: (int) number of ground truth boxes
+
+    Returns:
+        (float) average precision, or None if gt_count is 0
+    """
+    if gt_count == 0:
+        return None
+    if len(is_tp) == 0:
+        return 0.
+
+    order = np.argsort(-scores, kind='stable')
+    tp = np.cumsum(is_tp[order])
+    fp = np.cumsum(~is_tp[order])
+    recall = tp / gt_count
+    precision = tp / (tp + fp)
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    recall_diffs = np.diff(np.concatenate([[0.], recall]))
+    return float(np.sum(recall_diffs * precision))
+
+
 def compute_metrics(gt_labels: ObjectDetectionLabels,
                     pred_labels: ObjectDetectionLabels,
                     num_classes: int,
-                    iou_thresh=0.5):
-    gt_geoms = [b.to_shapely() for b in gt_labels.get_boxes()]
-    gt_classes = gt_labels.get_class_ids() - 1
-    pred_geoms = [b.to_shapely() for b in pred_labels.get_boxes()]
-    pred_classes = pred_labels.get_class_ids() - 1
-
-    for pred, class_id in zip(pred_geoms, pred_classes):
-        pred.class_id = class_id
-    pred_tree = shapely.strtree.STRtree(pred_geoms)
-
-    def iou(a, b):
-        return a.intersection(b).area / a.union(b).area
-
-    def is_matched(geom):
-        return hasattr(geom, 'iou_matched')
-
-    tp = np.zeros((num_classes, ))
-    fp = np.zeros((num_classes, ))
-    fn = np.zeros((num_classes, ))
-
-    for gt, gt_class in zip(gt_geoms, gt_classes):
-        matches = list(
-            filter(lambda g: (not is_matched(g)) and g.class_id == gt_class,
-                   pred_tree.query(gt)))
-        scores = [iou(m, gt) for m in matches]
-        if len(scores) > 0:
-            max_ind = np.argmax(scores)
-            if scores[max_ind] > iou_thresh:
-                matches[max_ind].iou_matched = True
-                tp[gt_class] += 1
-            else:
-                fn[gt_class] += 1
-        else:
-            fn[gt_class] += 1
+                    iou_threshs=(0.5, )):
+    """Compute object detection metrics for each class and IoU threshold.
+
+    Args:
+        gt_labels: ground truth labels
+        pred_labels: predicted labels
+        num_classes: (int) number of classes
+        iou_threshs: list of IoU thresholds that a prediction needs to exceed to
+            be matched to a ground truth box
+
+    Returns:
+        (tp, fp, fn, ap) where tp, fp and fn are numpy arrays of shape
+            (len(iou_threshs), num_classes) with the number of true positives,
+            false positives and false negatives, and ap is a list with a list of
+            average precisions (or None) for each threshold
+    """
+    gt_npboxes = gt_labels.get_npboxes()
+    gt_classes = gt_labels.get_class_ids().astype(np.int64) - 1
+    pred_npboxes = pred_labels.get_npboxes()
+    pred_classes = pred_labels.get_class_ids().astype(np.int64) - 1
+    pred_scores = pred_labels.get_scores()
+
+    num_threshs = len(iou_threshs)
+    tp = np.zeros((num_threshs, num_classes))
+    fp = np.zeros((num_threshs, num_classes))
+    fn = np.zeros((num_threshs, num_classes))
+    ap = [[None] * num_classes for _ in range(num_threshs)]
 
     for class_id in range(num_classes):
-        pred_not_matched = np.array([not is_matched(g) for g in pred_geoms])
-        fp[class_id] = np.sum(pred_not_matched[pred_classes == class_id])
+        class_gt_npboxes = gt_npboxes[gt_classes == class_id]
+        is_class_pred = pred_classes == class_id
+        class_pred_scores = pred_scores[is_class_pred]
+        is_tp = match_boxes(class_gt_npboxes, pred_npboxes[is_class_pred],
+                            class_pred_scores, iou_threshs)
+
+        gt_count = len(class_gt_npboxes)
+        tp[:, class_id] = is_tp.sum(axis=1)
+        fp[:, class_id] = is_tp.shape[1] - tp[:, class_id]
+        fn[:, class_id] = gt_count - tp[:, class_id]
+        for thresh_ind in range(num_threshs):
+            ap[thresh_ind][class_id] = compute_ap(is_tp[thresh_ind],
+                                                  class_pred_scores, gt_count)
 
-    return tp, fp, fn
+    return tp, fp, fn, ap
 
 
 class ObjectDetectionEvaluation(ClassificationEvaluation):
-    def __init__(self, class_map):
+    def __init__(self, class_map, iou_threshs=(0.5, )):
+        """Constructor.
+
+        Args:
+            class_map: ClassMap
+            iou_threshs: list of IoU thresholds. Precision, recall and f1 are
+                computed using the first threshold, and ap is averaged over all
+                of them.
+        """
         super().__init__()
         self.class_map = class_map
+        self.iou_threshs = list(iou_threshs)
 
     def compute(self, ground_truth_labels, prediction_labels):
         self.class_to_eval_item = ObjectDetectionEvaluation.compute_eval_items(
-            ground_truth_labels, prediction_labels, self.class_map)
+            ground_truth_labels, prediction_labels, self.class_map,
+            self.iou_threshs)
         self.compute_avg()
 
     @staticmethod
-    def compute_eval_items(gt_labels, pred_labels, class_map):
-        iou_thresh = 0.5
+    def compute_eval_items(gt_labels,
+                           pred_labels,
+                           class_map,
+                           iou_threshs=(0.5, )):
         num_classes = len(class_map)
-        tps, fps, fns = compute_metrics(gt_labels, pred_labels, num_classes,
-                                        iou_thresh)
+        tps, fps, fns, aps = compute_metrics(gt_labels, pred_labels,
+                                             num_classes, iou_threshs)
         class_to_eval_item = {}
 
-        for class_ind, (tp, fp, fn) in enumerate(zip(tps, fps, fns)):
+        for class_ind, (tp, fp, fn) in enumerate(zip(tps[0], fps[0], fns[0])):
             class_id = class_ind + 1
             gt_count = tp + fn
             pred_count = tp + fp
             class_name = class_map.get_by_id(class_id).name
+            ap = None
+            if gt_count > 0:
+                ap = float(
+                    np.mean([thresh_aps[class_ind] for thresh_aps in aps]))
 
             if gt_count == 0:
                 eval_item = ClassEvaluationItem(
@@ -86,7 +236,8 @@ class ObjectDetectionEvaluation(ClassificationEvaluation):
                     recall=0,
                     gt_count=gt_count,
                     class_id=class_id,
-                    class_name=class_name)
+                    class_name=class_name,
+                    ap=ap)
             else:
                 prec = tp / (tp + fp)
                 recall = tp / (tp + fn)
@@ -105,7 +256,8 @@ class ObjectDetectionEvaluation(ClassificationEvaluation):
                     count_error=norm_count_err,
                     gt_count=gt_count,
                     class_id=class_id,
-                    class_name=class_name)
+                    class_name=class_name,
+                    ap=ap)
 
             class_to_eval_item[class_id] = eval_item
 
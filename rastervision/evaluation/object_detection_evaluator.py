@@ -6,8 +6,9 @@ class ObjectDetectionEvaluator(ClassificationEvaluator):
     """Evaluates predictions for a set of scenes.
     """
 
-    def __init__(self, class_map, output_uri):
+    def __init__(self, class_map, output_uri, iou_thresholds=(0.5, )):
         super().__init__(class_map, output_uri)
+        self.iou_thresholds = iou_thresholds
 
     def create_evaluation(self):
-        return ObjectDetectionEvaluation(self.class_map)
+        return ObjectDetectionEvaluation(self.class_map, self.iou_thresholds)
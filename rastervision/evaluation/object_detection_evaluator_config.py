@@ -1,3 +1,5 @@
+from copy import deepcopy
+
 import rastervision as rv
 from rastervision.evaluation import ObjectDetectionEvaluator
 from rastervision.evaluation \
@@ -5,14 +7,54 @@ from rastervision.evaluation \
 
 
 class ObjectDetectionEvaluatorConfig(ClassificationEvaluatorConfig):
-    def __init__(self, class_map, output_uri=None):
+    def __init__(self, class_map, output_uri=None, iou_thresholds=(0.5, )):
         super().__init__(rv.OBJECT_DETECTION_EVALUATOR, class_map, output_uri)
+        self.iou_thresholds = list(iou_thresholds)
+
+    def to_proto(self):
+        msg = super().to_proto()
+        msg.classification_config.iou_thresholds[:] = self.iou_thresholds
+        return msg
 
     def create_evaluator(self):
-        return ObjectDetectionEvaluator(self.class_map, self.output_uri)
+        return ObjectDetectionEvaluator(self.class_map, self.output_uri,
+                                        self.iou_thresholds)
 
 
 class ObjectDetectionEvaluatorConfigBuilder(
         ClassificationEvaluatorConfigBuilder):
     def __init__(self, prev=None):
         super().__init__(ObjectDetectionEvaluatorConfig, prev)
+        if prev:
+            self.config['iou_thresholds'] = prev.iou_thresholds
+
+    def validate(self):
+        super().validate()
+        iou_thresholds = self.config.get('iou_thresholds')
+        if iou_thresholds is not None:
+            if len(iou_thresholds) == 0:
+                raise rv.ConfigError('iou_thresholds must not be empty')
+            if any(t < 0 or t >= 1 for t in iou_thresholds):
+                raise rv.ConfigError(
+                    'iou_thresholds must be in [0, 1), got {}'.format(
+                        iou_thresholds))
+
+    @classmethod
+    def from_proto(cls, msg):
+        b = super().from_proto(msg)
+        iou_thresholds = list(msg.classification_config.iou_thresholds)
+        if iou_thresholds:
+            b = b.with_iou_thresholds(iou_thresholds)
+        return b
+
+    def with_iou_thresholds(self, iou_thresholds):
+        """Set the IoU thresholds used to match predicted and ground truth boxes.
+
+            Args:
+                iou_thresholds: list of IoU thresholds. Precision, recall and f1
+                    are computed using the first threshold, and the average
+                    precision (ap) is averaged over all of them.
+        """
+        b = deepcopy(self)
+        b.config['iou_thresholds'] = list(iou_thresholds)
+        return b
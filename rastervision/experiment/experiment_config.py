@@ -223,6 +223,24 @@ class ExperimentConfigBuilder(ConfigBuilder):
                 'Dataset set with "with_dataset" needs to be of type'
                 'DatasetConfig, got {}'.format(type(dataset)))
 
+        if not backend.predicts_scores():
+            # Check this here so that it fails before running any commands,
+            # rather than in the PREDICT command.
+            scenes = [
+                *dataset.train_scenes, *dataset.validation_scenes,
+                *dataset.test_scenes
+            ]
+            if getattr(task, 'predict_stride', None) is not None:
+                raise rv.ConfigError(
+                    'predict_stride requires a backend that predicts scores, '
+                    'which {} does not.'.format(backend.backend_type))
+            if any(
+                    getattr(scene.label_store, 'score_output', False)
+                    for scene in scenes):
+                raise rv.ConfigError(
+                    'score_output requires a backend that predicts scores, '
+                    'which {} does not.'.format(backend.backend_type))
+
         if not isinstance(self.config.get('id'), str):
             raise rv.ConfigError(
                 'ID set with "with_id" needs to be of type str, got {}'.format(
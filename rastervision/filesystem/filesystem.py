@@ -1,5 +1,7 @@
 from abc import (ABC, abstractmethod)
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import List
 
 import rastervision as rv
 
@@ -43,6 +45,31 @@ class FileSystem(ABC):
         """
         pass  # pragma: no cover
 
+    @classmethod
+    def files_exist(cls,
+                    uris: List[str],
+                    include_dir: bool = True,
+                    num_workers: int = 16) -> List[bool]:
+        """Check if each of a list of files exists.
+
+        This calls file_exists for each URI using a pool of threads. FileSystems
+        that can check many files at once more efficiently should override this.
+
+        Args:
+          uris: The URIs to check
+          include_dir: See file_exists
+          num_workers: Maximum number of checks that are run concurrently
+
+        Returns:
+          A list with a bool for each URI
+        """
+        if len(uris) <= 1:
+            return [cls.file_exists(uri, include_dir) for uri in uris]
+        with ThreadPoolExecutor(min(num_workers, len(uris))) as executor:
+            return list(
+                executor.map(lambda uri: cls.file_exists(uri, include_dir),
+                             uris))
+
     @staticmethod
     @abstractmethod
     def read_str(uri: str) -> str:
@@ -113,6 +140,13 @@ class FileSystem(ABC):
         """
         pass  # pragma: no cover
 
+    @staticmethod
+    def etag(uri: str) -> str:
+        """Returns the ETag of this URI, which changes when the file changes,
+        or None if this FileSystem does not support this operation.
+        """
+        return None
+
     @staticmethod
     @abstractmethod
     def list_paths(uri, ext=None):
@@ -86,6 +86,15 @@ class HttpFileSystem(FileSystem):
     def last_modified(uri: str) -> datetime:
         return None
 
+    @staticmethod
+    def etag(uri: str) -> str:
+        request = urllib.request.Request(uri, method='HEAD')
+        with urllib.request.urlopen(request) as response:
+            # Fall back to the Last-Modified header which also changes with the
+            # file, since not all servers send an ETag.
+            return (response.headers.get('ETag')
+                    or response.headers.get('Last-Modified'))
+
     @staticmethod
     def list_paths(uri, suffix=None):  # pragma: no cover
         raise NotImplementedError()
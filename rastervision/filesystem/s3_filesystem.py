@@ -1,7 +1,9 @@
 import io
 import os
-import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from threading import Lock
 from urllib.parse import urlparse
 
 from rastervision.filesystem import (FileSystem, NotReadableError,
@@ -20,8 +22,7 @@ def get_matching_s3_objects(bucket, prefix='', suffix='',
     :param suffix: Only fetch objects whose keys end with
         this suffix (optional).
     """
-    import boto3
-    s3 = boto3.client('s3')
+    s3 = S3FileSystem.get_client()
     kwargs = {'Bucket': bucket, 'RequestPayer': request_payer}
 
     # If the prefix is a single string (not a tuple of strings), we can
@@ -66,6 +67,118 @@ def get_matching_s3_keys(bucket, prefix='', suffix='', request_payer='None'):
         yield obj['Key']
 
 
+def list_local_files(dir_path):
+    """Return a dict from the relative path of each file in a directory (using
+    forward slashes) to its (size, modification time)."""
+    files = {}
+    for root, _, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            rel_path = os.path.relpath(path, dir_path).replace(os.sep, '/')
+            stat = os.stat(path)
+            files[rel_path] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+def list_s3_files(bucket, prefix, request_payer='None'):
+    """Return a dict from the path of each object under a prefix, relative to the
+    prefix, to its (size, modification time)."""
+    files = {}
+    for obj in get_matching_s3_objects(
+            bucket, prefix=prefix, request_payer=request_payer):
+        rel_path = obj['Key'][len(prefix):]
+        # Skip objects that are used as directory markers.
+        if rel_path and not rel_path.endswith('/'):
+            files[rel_path] = (obj['Size'], obj['LastModified'].timestamp())
+    return files
+
+
+def get_files_to_sync(src_files, dest_files):
+    """Return the paths of the source files that are missing or out of date in
+    the destination.
+
+    As with "aws s3 sync", a file is out of date if its size differs or if the
+    source file is newer than the destination file. Times are compared in whole
+    seconds since S3 doesn't keep fractions of seconds.
+    """
+    paths = []
+    for path, (src_size, src_mtime) in src_files.items():
+        dest_file = dest_files.get(path)
+        if dest_file is None:
+            paths.append(path)
+            continue
+        dest_size, dest_mtime = dest_file
+        if src_size != dest_size or int(src_mtime) > int(dest_mtime):
+            paths.append(path)
+    return paths
+
+
+def get_dir_prefix(key):
+    """Return a key prefix that only matches keys inside the "directory" key."""
+    if key and not key.endswith('/'):
+        key += '/'
+    return key
+
+
+class S3ClientPool():
+    """Caches the S3 clients of a process so that they are shared by all threads.
+
+    Creating a client reads credentials and sets up a new pool of HTTP connections,
+    which is slow, so a client is only created the first time it is needed for each
+    combination of options. Clients are thread-safe, but can't be shared with
+    forked processes, so new clients are created after a fork. The number of
+    requests made by the clients is counted by operation.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._clients = {}
+        self._pid = None
+        self.request_counts = Counter()
+
+    def _count_request(self, model, **kwargs):
+        with self._lock:
+            self.request_counts[model.name] += 1
+
+    def get_client(self, max_pool_connections, max_attempts):
+        """Return an S3 client.
+
+        Args:
+            max_pool_connections: (int) maximum number of HTTP connections kept
+            max_attempts: (int) maximum number of attempts made for each request
+                including retries
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._clients = {}
+                self._pid = os.getpid()
+
+            key = (max_pool_connections, max_attempts)
+            client = self._clients.get(key)
+            if client is None:
+                from botocore.config import Config
+                config = Config(
+                    max_pool_connections=max_pool_connections,
+                    retries={'max_attempts': max_attempts})
+                client = S3FileSystem.get_session().client('s3', config=config)
+                client.meta.events.register('before-call.s3',
+                                            self._count_request)
+                self._clients[key] = client
+            return client
+
+    def get_request_counts(self):
+        """Return a dict from S3 operation name to the number of requests made."""
+        with self._lock:
+            return dict(self.request_counts)
+
+    def reset_request_counts(self):
+        with self._lock:
+            self.request_counts.clear()
+
+
+_client_pool = S3ClientPool()
+
+
 class S3FileSystem(FileSystem):
     @staticmethod
     def get_request_payer():
@@ -78,12 +191,66 @@ class S3FileSystem(FileSystem):
         return ('requester' if s3_config(
             'requester_pays', parser=bool, default='False') else 'None')
 
+    @staticmethod
+    def get_transfer_options():
+        """Return (part size in bytes, max concurrency) from the AWS_S3 config."""
+        # Import here to avoid circular reference.
+        from rastervision.rv_config import RVConfig
+        rv_config = RVConfig.get_instance()
+        s3_config = rv_config.get_subconfig('AWS_S3')
+        part_size_mb = s3_config(
+            'transfer_part_size_mb', parser=int, default='8')
+        max_concurrency = s3_config(
+            'transfer_max_concurrency', parser=int, default='10')
+        return part_size_mb * 1024 * 1024, max_concurrency
+
+    @staticmethod
+    def get_transfer_config():
+        """Return the boto3 TransferConfig used to transfer files.
+
+        Files larger than the part size are uploaded using multipart uploads and
+        downloaded using ranged requests, with up to max concurrency parts
+        transferred in parallel.
+        """
+        from boto3.s3.transfer import TransferConfig
+        part_size, max_concurrency = S3FileSystem.get_transfer_options()
+        return TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency)
+
     @staticmethod
     def get_session():
         # Lazily load boto
         import boto3
         return boto3.Session()
 
+    @staticmethod
+    def get_client():
+        """Return the S3 client shared by this process.
+
+        The size of its connection pool and number of attempts for each request are
+        set by max_pool_connections and max_attempts in the AWS_S3 config.
+        """
+        # Import here to avoid circular reference.
+        from rastervision.rv_config import RVConfig
+        rv_config = RVConfig.get_instance()
+        s3_config = rv_config.get_subconfig('AWS_S3')
+        max_pool_connections = s3_config(
+            'max_pool_connections', parser=int, default='100')
+        max_attempts = s3_config('max_attempts', parser=int, default='5')
+        return _client_pool.get_client(max_pool_connections, max_attempts)
+
+    @staticmethod
+    def get_request_counts():
+        """Return a dict from S3 operation name to the number of requests made by
+        the clients of this process."""
+        return _client_pool.get_request_counts()
+
+    @staticmethod
+    def reset_request_counts():
+        _client_pool.reset_request_counts()
+
     @staticmethod
     def matches_uri(uri: str, mode: str) -> bool:
         parsed_uri = urlparse(uri)
@@ -100,7 +267,7 @@ class S3FileSystem(FileSystem):
         request_payer = S3FileSystem.get_request_payer()
 
         if include_dir:
-            s3 = S3FileSystem.get_session().client('s3')
+            s3 = S3FileSystem.get_client()
             try:
                 # Ensure key ends in slash so that this won't pick up files that
                 # contain the key as a prefix, but aren't actually directories.
@@ -118,13 +285,79 @@ class S3FileSystem(FileSystem):
             except botocore.exceptions.ClientError as e:
                 return False
         else:
-            s3r = S3FileSystem.get_session().resource('s3')
+            s3 = S3FileSystem.get_client()
             try:
-                s3r.Object(bucket, key).load(RequestPayer=request_payer)
+                s3.head_object(
+                    Bucket=bucket, Key=key, RequestPayer=request_payer)
                 return True
             except botocore.exceptions.ClientError as e:
                 return False
 
+    @classmethod
+    def files_exist(cls,
+                    uris,
+                    include_dir=True,
+                    num_workers=16,
+                    max_list_keys=10000):
+        """Check if each of a list of files exists.
+
+        The URIs are grouped by the "directory" that contains them, and the objects
+        in each directory that contains more than one of the URIs are listed,
+        which takes one request per 1000 objects instead of one or two requests per
+        URI. If a directory contains more than max_list_keys objects, its URIs are
+        checked one at a time instead. Directories are checked concurrently.
+        """
+        import botocore
+
+        request_payer = S3FileSystem.get_request_payer()
+        dir_to_inds = {}
+        for ind, uri in enumerate(uris):
+            parsed_uri = urlparse(uri)
+            key = parsed_uri.path[1:]
+            prefix = key[:key.rfind('/') + 1]
+            dir_to_inds.setdefault((parsed_uri.netloc, prefix), []).append(ind)
+
+        exists = [False] * len(uris)
+
+        def check_dir(item):
+            (bucket, prefix), inds = item
+            keys = None
+            if len(inds) > 1:
+                keys = set()
+                try:
+                    for obj in get_matching_s3_objects(
+                            bucket, prefix=prefix,
+                            request_payer=request_payer):
+                        keys.add(obj['Key'])
+                        if len(keys) > max_list_keys:
+                            keys = None
+                            break
+                except botocore.exceptions.ClientError:
+                    keys = None
+
+            dir_keys = set()
+            if keys is not None and include_dir:
+                # Include the prefix itself, which may be one of the URIs.
+                for key in keys:
+                    slash_ind = key.find('/', max(len(prefix) - 1, 0))
+                    while slash_ind != -1:
+                        dir_keys.add(key[:slash_ind + 1])
+                        slash_ind = key.find('/', slash_ind + 1)
+
+            for ind in inds:
+                if keys is None:
+                    exists[ind] = S3FileSystem.file_exists(
+                        uris[ind], include_dir)
+                    continue
+                key = urlparse(uris[ind]).path[1:]
+                dir_key = key if key.endswith('/') else key + '/'
+                exists[ind] = key in keys or dir_key in dir_keys
+
+        with ThreadPoolExecutor(max(1, min(num_workers,
+                                           len(dir_to_inds)))) as executor:
+            list(executor.map(check_dir, dir_to_inds.items()))
+        return exists
+
     @staticmethod
     def read_str(uri: str) -> str:
         return S3FileSystem.read_bytes(uri).decode('utf-8')
@@ -133,7 +366,7 @@ class S3FileSystem(FileSystem):
     def read_bytes(uri: str) -> bytes:
         import botocore
 
-        s3 = S3FileSystem.get_session().client('s3')
+        s3 = S3FileSystem.get_client()
         request_payer = S3FileSystem.get_request_payer()
 
         parsed_uri = urlparse(uri)
@@ -155,7 +388,7 @@ class S3FileSystem(FileSystem):
 
     @staticmethod
     def write_bytes(uri: str, data: bytes) -> None:
-        s3 = S3FileSystem.get_session().client('s3')
+        s3 = S3FileSystem.get_client()
 
         parsed_uri = urlparse(uri)
         bucket = parsed_uri.netloc
@@ -169,32 +402,89 @@ class S3FileSystem(FileSystem):
     @staticmethod
     def sync_from_dir(src_dir_uri: str,
                       dest_dir_uri: str,
-                      delete: bool = False) -> None:  # pragma: no cover
-        command = ['aws', 's3', 'sync', src_dir_uri, dest_dir_uri]
+                      delete: bool = False) -> None:
+        request_payer = S3FileSystem.get_request_payer()
+        transfer_config = S3FileSystem.get_transfer_config()
+        s3 = S3FileSystem.get_client()
+
+        parsed_uri = urlparse(src_dir_uri)
+        bucket = parsed_uri.netloc
+        prefix = get_dir_prefix(parsed_uri.path[1:])
+        src_files = list_s3_files(bucket, prefix, request_payer=request_payer)
+        dest_files = list_local_files(dest_dir_uri)
+
+        def download(rel_path):
+            path = os.path.join(dest_dir_uri, *rel_path.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            s3.download_file(
+                bucket,
+                prefix + rel_path,
+                path,
+                ExtraArgs={'RequestPayer': request_payer},
+                Config=transfer_config)
+            # Use the modification time of the object so that the file isn't
+            # considered out of date by the next sync.
+            mtime = src_files[rel_path][1]
+            os.utime(path, (mtime, mtime))
+
+        rel_paths = get_files_to_sync(src_files, dest_files)
+        with ThreadPoolExecutor(transfer_config.max_concurrency) as executor:
+            list(executor.map(download, rel_paths))
+
         if delete:
-            command.append('--delete')
-        subprocess.run(command)
+            for rel_path in set(dest_files.keys()) - set(src_files.keys()):
+                os.remove(os.path.join(dest_dir_uri, *rel_path.split('/')))
 
     @staticmethod
     def sync_to_dir(src_dir_uri: str, dest_dir_uri: str,
-                    delete: bool = False) -> None:  # pragma: no cover
-        command = ['aws', 's3', 'sync', src_dir_uri, dest_dir_uri]
-        if delete:
-            command.append('--delete')
+                    delete: bool = False) -> None:
         request_payer = S3FileSystem.get_request_payer()
-        if request_payer:
-            command.append('--request-payer')
-        subprocess.run(command)
+        transfer_config = S3FileSystem.get_transfer_config()
+        s3 = S3FileSystem.get_client()
+
+        parsed_uri = urlparse(dest_dir_uri)
+        bucket = parsed_uri.netloc
+        prefix = get_dir_prefix(parsed_uri.path[1:])
+        src_files = list_local_files(src_dir_uri)
+        dest_files = list_s3_files(bucket, prefix, request_payer=request_payer)
+
+        def upload(rel_path):
+            path = os.path.join(src_dir_uri, *rel_path.split('/'))
+            s3.upload_file(
+                path, bucket, prefix + rel_path, Config=transfer_config)
+
+        rel_paths = get_files_to_sync(src_files, dest_files)
+        with ThreadPoolExecutor(transfer_config.max_concurrency) as executor:
+            list(executor.map(upload, rel_paths))
+
+        if delete:
+            keys = [
+                prefix + rel_path
+                for rel_path in set(dest_files.keys()) - set(src_files.keys())
+            ]
+            # At most 1000 objects can be deleted by each request.
+            for i in range(0, len(keys), 1000):
+                s3.delete_objects(
+                    Bucket=bucket,
+                    Delete={
+                        'Objects': [{
+                            'Key': key
+                        } for key in keys[i:i + 1000]]
+                    },
+                    RequestPayer=request_payer)
 
     @staticmethod
     def copy_to(src_path: str, dst_uri: str) -> None:
-        s3 = S3FileSystem.get_session().client('s3')
+        s3 = S3FileSystem.get_client()
 
         parsed_uri = urlparse(dst_uri)
         if os.path.isfile(src_path):
             try:
-                s3.upload_file(src_path, parsed_uri.netloc,
-                               parsed_uri.path[1:])
+                s3.upload_file(
+                    src_path,
+                    parsed_uri.netloc,
+                    parsed_uri.path[1:],
+                    Config=S3FileSystem.get_transfer_config())
             except Exception as e:
                 raise NotWritableError(
                     'Could not write {}'.format(dst_uri)) from e
@@ -205,7 +495,7 @@ class S3FileSystem(FileSystem):
     def copy_from(uri: str, path: str) -> None:
         import botocore
 
-        s3 = S3FileSystem.get_session().client('s3')
+        s3 = S3FileSystem.get_client()
         request_payer = S3FileSystem.get_request_payer()
 
         parsed_uri = urlparse(uri)
@@ -214,7 +504,8 @@ class S3FileSystem(FileSystem):
                 parsed_uri.netloc,
                 parsed_uri.path[1:],
                 path,
-                ExtraArgs={'RequestPayer': request_payer})
+                ExtraArgs={'RequestPayer': request_payer},
+                Config=S3FileSystem.get_transfer_config())
         except botocore.exceptions.ClientError:
             raise NotReadableError('Could not read {}'.format(uri))
 
@@ -229,12 +520,22 @@ class S3FileSystem(FileSystem):
     def last_modified(uri: str) -> datetime:
         parsed_uri = urlparse(uri)
         bucket, key = parsed_uri.netloc, parsed_uri.path[1:]
-        s3 = S3FileSystem.get_session().client('s3')
+        s3 = S3FileSystem.get_client()
         request_payer = S3FileSystem.get_request_payer()
         head_data = s3.head_object(
             Bucket=bucket, Key=key, RequestPayer=request_payer)
         return head_data['LastModified']
 
+    @staticmethod
+    def etag(uri: str) -> str:
+        parsed_uri = urlparse(uri)
+        bucket, key = parsed_uri.netloc, parsed_uri.path[1:]
+        s3 = S3FileSystem.get_client()
+        request_payer = S3FileSystem.get_request_payer()
+        head_data = s3.head_object(
+            Bucket=bucket, Key=key, RequestPayer=request_payer)
+        return head_data['ETag']
+
     @staticmethod
     def list_paths(uri, ext=''):
         request_payer = S3FileSystem.get_request_payer()
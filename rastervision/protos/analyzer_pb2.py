@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='rastervision/protos/analyzer.proto',
   package='rv.protos',
   syntax='proto2',
-  serialized_pb=_b('\n\"rastervision/protos/analyzer.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\"\x9a\x02\n\x0e\x41nalyzerConfig\x12\x15\n\ranalyzer_type\x18\x01 \x02(\t\x12N\n\x15stats_analyzer_config\x18\x04 \x01(\x0b\x32-.rv.protos.AnalyzerConfig.StatsAnalyzerConfigH\x00\x12\x13\n\tstats_uri\x18\x05 \x01(\tH\x00\x12\x30\n\rcustom_config\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x1a=\n\x13StatsAnalyzerConfig\x12\x11\n\tstats_uri\x18\x01 \x02(\t\x12\x13\n\x0bsample_prob\x18\x02 \x01(\x02\x42\x1b\n\x19raster_transformer_config')
+  serialized_pb=_b('\n\"rastervision/protos/analyzer.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\"\xcd\x02\n\x0e\x41nalyzerConfig\x12\x15\n\ranalyzer_type\x18\x01 \x02(\t\x12N\n\x15stats_analyzer_config\x18\x04 \x01(\x0b\x32-.rv.protos.AnalyzerConfig.StatsAnalyzerConfigH\x00\x12\x13\n\tstats_uri\x18\x05 \x01(\tH\x00\x12\x30\n\rcustom_config\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x1ap\n\x13StatsAnalyzerConfig\x12\x11\n\tstats_uri\x18\x01 \x02(\t\x12\x13\n\x0bsample_prob\x18\x02 \x01(\x02\x12\x16\n\x0bnum_workers\x18\x03 \x01(\x05:\x01\x31\x12\x19\n\nhistograms\x18\x04 \x01(\x08:\x05\x66\x61lseB\x1b\n\x19raster_transformer_config')
   ,
   dependencies=[google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,])
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -49,6 +49,20 @@ _ANALYZERCONFIG_STATSANALYZERCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='num_workers', full_name='rv.protos.AnalyzerConfig.StatsAnalyzerConfig.num_workers', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=True, default_value=1,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='histograms', full_name='rv.protos.AnalyzerConfig.StatsAnalyzerConfig.histograms', index=3,
+      number=4, type=8, cpp_type=7, label=1,
+      has_default_value=True, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -62,7 +76,7 @@ _ANALYZERCONFIG_STATSANALYZERCONFIG = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=272,
-  serialized_end=333,
+  serialized_end=384,
 )
 
 _ANALYZERCONFIG = _descriptor.Descriptor(
@@ -116,7 +130,7 @@ _ANALYZERCONFIG = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=80,
-  serialized_end=362,
+  serialized_end=413,
 )
 
 _ANALYZERCONFIG_STATSANALYZERCONFIG.containing_type = _ANALYZERCONFIG
@@ -21,7 +21,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='rastervision/protos/evaluator.proto',
   package='rv.protos',
   syntax='proto2',
-  serialized_pb=_b('\n#rastervision/protos/evaluator.proto\x12\trv.protos\x1a$rastervision/protos/class_item.proto\x1a\x1cgoogle/protobuf/struct.proto\"\xc5\x02\n\x0f\x45valuatorConfig\x12\x16\n\x0e\x65valuator_type\x18\x01 \x02(\t\x12Y\n\x15\x63lassification_config\x18\x02 \x01(\x0b\x32\x38.rv.protos.EvaluatorConfig.ClassificationEvaluatorConfigH\x00\x12\x30\n\rcustom_config\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x1ay\n\x1d\x43lassificationEvaluatorConfig\x12\x12\n\noutput_uri\x18\x01 \x02(\t\x12\x19\n\x11vector_output_uri\x18\x03 \x01(\t\x12)\n\x0b\x63lass_items\x18\x02 \x03(\x0b\x32\x14.rv.protos.ClassItemB\x12\n\x10\x65valuator_config')
+  serialized_pb=_b('\n#rastervision/protos/evaluator.proto\x12\trv.protos\x1a$rastervision/protos/class_item.proto\x1a\x1cgoogle/protobuf/struct.proto\"\xde\x02\n\x0f\x45valuatorConfig\x12\x16\n\x0e\x65valuator_type\x18\x01 \x02(\t\x12Y\n\x15\x63lassification_config\x18\x02 \x01(\x0b\x32\x38.rv.protos.EvaluatorConfig.ClassificationEvaluatorConfigH\x00\x12\x30\n\rcustom_config\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x1a\x91\x01\n\x1d\x43lassificationEvaluatorConfig\x12\x12\n\noutput_uri\x18\x01 \x02(\t\x12\x19\n\x11vector_output_uri\x18\x03 \x01(\t\x12)\n\x0b\x63lass_items\x18\x02 \x03(\x0b\x32\x14.rv.protos.ClassItem\x12\x16\n\x0eiou_thresholds\x18\x04 \x03(\x02\x42\x12\n\x10\x65valuator_config')
   ,
   dependencies=[rastervision_dot_protos_dot_class__item__pb2.DESCRIPTOR,google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,])
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -57,6 +57,13 @@ _EVALUATORCONFIG_CLASSIFICATIONEVALUATORCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='iou_thresholds', full_name='rv.protos.EvaluatorConfig.ClassificationEvaluatorConfig.iou_thresholds', index=3,
+      number=4, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -69,8 +76,8 @@ _EVALUATORCONFIG_CLASSIFICATIONEVALUATORCONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=303,
-  serialized_end=424,
+  serialized_start=304,
+  serialized_end=449,
 )
 
 _EVALUATORCONFIG = _descriptor.Descriptor(
@@ -117,7 +124,7 @@ _EVALUATORCONFIG = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=119,
-  serialized_end=444,
+  serialized_end=469,
 )
 
 _EVALUATORCONFIG_CLASSIFICATIONEVALUATORCONFIG.fields_by_name['class_items'].message_type = rastervision_dot_protos_dot_class__item__pb2._CLASSITEM
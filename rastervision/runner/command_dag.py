@@ -2,9 +2,7 @@ import networkx as nx
 import logging
 
 import rastervision as rv
-from rastervision.utils.files import file_exists
-
-import click
+from rastervision.utils.files import files_exist
 
 log = logging.getLogger(__name__)
 
@@ -38,7 +36,8 @@ class CommandDAG:
             for output_uri in command_def.io_def.output_uris:
                 uri_dag.add_edge(idx, output_uri)
 
-        # Find all source input_uris, and ensure they exist.
+        # Find all source input_uris, and ensure they exist. The existence of all
+        # files is checked at once, which is much faster for remote files.
         if not skip_file_check:
             log.debug('Ensuring input files exist...')
             unsolved_sources = [
@@ -46,14 +45,11 @@ class CommandDAG:
                 if (type(uri) == str and len(uri_dag.in_edges(uri)) == 0)
             ]
 
-            missing_files = []
-
-            with click.progressbar(
-                    unsolved_sources,
-                    label='Ensuring input files exist  ') as uris:
-                for uri in uris:
-                    if not file_exists(uri):
-                        missing_files.append(uri)
+            missing_files = [
+                uri for uri, exists in zip(unsolved_sources,
+                                           files_exist(unsolved_sources))
+                if not exists
+            ]
 
             if any(missing_files):
                 raise rv.ConfigError(
@@ -67,12 +63,11 @@ class CommandDAG:
             commands_to_outputs = [(idx, edge[1]) for idx in uri_dag.nodes
                                    if type(idx) == int
                                    for edge in uri_dag.out_edges(idx)]
-            with click.progressbar(
-                    commands_to_outputs,
-                    label='Checking for existing output') as lst:
-                for idx, output_uri in lst:
-                    if file_exists(output_uri):
-                        uri_dag.remove_edge(idx, output_uri)
+            output_uris = [output_uri for _, output_uri in commands_to_outputs]
+            for (idx, output_uri), exists in zip(commands_to_outputs,
+                                                 files_exist(output_uris)):
+                if exists:
+                    uri_dag.remove_edge(idx, output_uri)
 
             for idx in set(map(lambda x: x[0], commands_to_outputs)):
                 if len(uri_dag.out_edges(idx)) == 0:
@@ -1,8 +1,14 @@
-from subprocess import Popen
+from collections import namedtuple
+from queue import Queue
+from subprocess import Popen, PIPE, STDOUT
+from threading import Lock, Thread
+import shlex
 import sys
 import logging
 import os
 
+import click
+
 from rastervision.runner import OutOfProcessExperimentRunner
 from rastervision.runner import make_command
 from rastervision.utils.misc import (terminate_at_exit)
@@ -11,59 +17,233 @@ from rastervision.rv_config import RVConfig
 
 log = logging.getLogger(__name__)
 
+LocalJob = namedtuple(
+    'LocalJob', ['id', 'name', 'command', 'upstream_ids', 'utilizes_gpu'])
+
+
+class LocalJobScheduler():
+    """Runs shell commands concurrently on this machine in dependency order.
+
+    A job is started once all of its upstream jobs have succeeded and a slot is
+    free. Jobs that utilize the GPU take one of the GPU slots, and other jobs take
+    one of the CPU slots. There is always at least one GPU slot, so that GPU jobs
+    such as training run one at a time by default, even on machines without a GPU
+    where they use all of the CPUs instead. If there is more than one GPU slot, each
+    GPU job is restricted to the GPU with the index of its slot using
+    CUDA_VISIBLE_DEVICES.
+
+    The output of each job is echoed with a prefix naming the job and, if log_dir
+    is set, written to a log file per job. When a job fails, the running jobs are
+    terminated if fail_fast is True. Otherwise, the jobs that don't depend on the
+    failed job keep running, and the jobs that do are skipped. The id of the first
+    job that failed is stored in first_failed_id.
+    """
+
+    def __init__(self, cpu_slots=1, gpu_slots=1, fail_fast=True, log_dir=None):
+        self.cpu_slots = max(1, cpu_slots)
+        self.gpu_slots = max(1, gpu_slots)
+        self.fail_fast = fail_fast
+        self.log_dir = log_dir
+        self.echo_lock = Lock()
+        self.first_failed_id = None
+
+    def get_log_path(self, job):
+        if not self.log_dir:
+            return None
+        file_name = '{}-{}.log'.format(job.id, job.name)
+        return os.path.join(self.log_dir, file_name)
+
+    def _echo(self, job, line):
+        with self.echo_lock:
+            click.echo('[{}] {}'.format(job.name, line))
+
+    def _start(self, job, gpu_slot, done_queue):
+        env = None
+        if gpu_slot is not None and self.gpu_slots > 1:
+            env = dict(os.environ, CUDA_VISIBLE_DEVICES=str(gpu_slot))
+        process = Popen(
+            shlex.split(job.command), stdout=PIPE, stderr=STDOUT, env=env)
+        terminate_at_exit(process)
+
+        def stream_output():
+            log_path = self.get_log_path(job)
+            log_file = open(log_path, 'w') if log_path else None
+            try:
+                for line in iter(process.stdout.readline, b''):
+                    line = line.decode('utf-8', errors='replace').rstrip('\n')
+                    self._echo(job, line)
+                    if log_file:
+                        log_file.write(line + '\n')
+                        log_file.flush()
+            finally:
+                if log_file:
+                    log_file.close()
+            done_queue.put((job.id, process.wait()))
+
+        Thread(target=stream_output, daemon=True).start()
+        return process
+
+    def run(self, jobs):
+        """Run jobs and wait for them to finish.
+
+        Args:
+            jobs: list of LocalJob sorted so that each job comes after its
+                upstream jobs
+
+        Returns:
+            dict from job id to exit code, which is None for jobs that were not run
+        """
+        if self.log_dir:
+            make_dir(self.log_dir)
+
+        id_to_job = dict([(job.id, job) for job in jobs])
+        waiting = [job.id for job in jobs]
+        exit_codes = {}
+        running = {}
+        free_cpu_slots = self.cpu_slots
+        free_gpu_slots = list(range(self.gpu_slots))
+        done_queue = Queue()
+        stopping = False
+        self.first_failed_id = None
+
+        while waiting or running:
+            for job_id in list(waiting):
+                job = id_to_job[job_id]
+                upstream_codes = [
+                    exit_codes.get(i, 0) for i in job.upstream_ids
+                ]
+                if stopping or any(code != 0 for code in upstream_codes):
+                    # Skip jobs that can no longer succeed.
+                    waiting.remove(job_id)
+                    exit_codes[job_id] = None
+                    continue
+                if not all(i in exit_codes or i not in id_to_job
+                           for i in job.upstream_ids):
+                    continue
+
+                if job.utilizes_gpu and free_gpu_slots:
+                    slot = free_gpu_slots.pop(0)
+                elif not job.utilizes_gpu and free_cpu_slots > 0:
+                    free_cpu_slots -= 1
+                    slot = None
+                else:
+                    continue
+
+                waiting.remove(job_id)
+                log.info('Starting {}'.format(job.name))
+                running[job_id] = (self._start(job, slot, done_queue), slot)
+
+            if not running:
+                continue
+
+            job_id, exit_code = done_queue.get()
+            job = id_to_job[job_id]
+            _, slot = running.pop(job_id)
+            if slot is None:
+                free_cpu_slots += 1
+            else:
+                free_gpu_slots.append(slot)
+            exit_codes[job_id] = exit_code
+
+            if exit_code == 0:
+                log.info('Finished {}'.format(job.name))
+            elif not stopping:
+                # Jobs terminated because of this failure also fail, but with
+                # their own exit codes.
+                if self.first_failed_id is None:
+                    self.first_failed_id = job_id
+                msg = '{} failed with exit code {}'.format(job.name, exit_code)
+                if self.log_dir:
+                    msg += ', see {}'.format(self.get_log_path(job))
+                click.echo(click.style(msg, fg='red'))
+                if self.fail_fast:
+                    stopping = True
+                    for process, _ in running.values():
+                        process.terminate()
+
+        return exit_codes
+
 
 class LocalExperimentRunner(OutOfProcessExperimentRunner):
-    def __init__(self, tmp_dir=None):
+    """Runs experiments by running each command in a separate local process.
+
+    Commands that don't depend on each other are run concurrently, limited by the
+    cpu_slots and gpu_slots options in the [LOCAL] section of the RV config. See
+    LocalJobScheduler for details.
+    """
+
+    def __init__(self,
+                 tmp_dir=None,
+                 cpu_slots=None,
+                 gpu_slots=None,
+                 fail_fast=None,
+                 log_dir=None):
         super().__init__()
 
+        rv_config = RVConfig.get_instance()
+        local_config = rv_config.get_subconfig('LOCAL')
+        if cpu_slots is None:
+            cpu_slots = local_config(
+                'cpu_slots', parser=int, default=str(os.cpu_count() or 1))
+        if gpu_slots is None:
+            gpu_slots = local_config('gpu_slots', parser=int, default='1')
+        if fail_fast is None:
+            fail_fast = local_config('fail_fast', parser=bool, default='true')
+        if log_dir is None:
+            log_dir = local_config('log_dir', default='')
+
         self.submit = None
         self.execution_environment = 'Shell'
         self.tmp_dir = tmp_dir
+        self.cpu_slots = cpu_slots
+        self.gpu_slots = gpu_slots
+        self.fail_fast = fail_fast
+        self.log_dir = log_dir
 
     def _run_experiment(self, command_dag):
         tmp_dir = self.tmp_dir or RVConfig.get_tmp_dir().name
         make_dir(tmp_dir)
-        makefile_name = os.path.join(tmp_dir, 'Makefile')
-        with open(makefile_name, 'w') as makefile:
-            command_ids = command_dag.get_sorted_command_ids()
-
-            # .PHONY: 0 1 2 3 4 5
-            makefile.write('.PHONY:')
-            for command_id in command_ids:
-                makefile.write(' {}'.format(command_id))
-            makefile.write('\n\n')
-
-            # all: 0 1 2 3 4 5
-            makefile.write('all:')
-            for command_id in command_ids:
-                makefile.write(' {}'.format(command_id))
-            makefile.write('\n\n')
-
-            for command_id in command_ids:
-                # 0: 1 2
-                makefile.write('{}:'.format(command_id))
-                for upstream_id in command_dag.get_upstream_command_ids(
-                        command_id):
-                    makefile.write(' {}'.format(upstream_id))
-                makefile.write('\n')
-
-                # \t rastervision ...
-                command_def = command_dag.get_command_definition(command_id)
-                command_config = command_def.command_config
-                command_root_uri = command_config.root_uri
-                command_basename = 'command-config-{}.json'.format(
-                    command_config.split_id)
-                command_uri = os.path.join(command_root_uri, command_basename)
-                print('Saving command configuration to {}...'.format(
-                    command_uri))
-                save_json_config(command_config.to_proto(), command_uri)
-                run_command = make_command(command_uri, self.tmp_dir)
-                makefile.write('\t{}\n\n'.format(run_command))
-
-        process = Popen(['make', '-j', '-f', makefile_name])
-        terminate_at_exit(process)
-        exitcode = process.wait()
-        if exitcode != 0:
-            sys.exit(exitcode)
+
+        jobs = []
+        for command_id in command_dag.get_sorted_command_ids():
+            command_def = command_dag.get_command_definition(command_id)
+            command_config = command_def.command_config
+            command_root_uri = command_config.root_uri
+            command_basename = 'command-config-{}.json'.format(
+                command_config.split_id)
+            command_uri = os.path.join(command_root_uri, command_basename)
+            print('Saving command configuration to {}...'.format(command_uri))
+            save_json_config(command_config.to_proto(), command_uri)
+
+            name = '{}-{}'.format(command_config.command_type,
+                                  command_config.split_id)
+            if command_def.experiment_id is not None:
+                name = '{}-{}'.format(name, command_def.experiment_id)
+            jobs.append(
+                LocalJob(
+                    id=command_id,
+                    name=name,
+                    command=make_command(command_uri, self.tmp_dir),
+                    upstream_ids=command_dag.get_upstream_command_ids(
+                        command_id),
+                    utilizes_gpu=command_config.utilizes_gpu()))
+
+        log_dir = self.log_dir or os.path.join(tmp_dir, 'logs')
+        scheduler = LocalJobScheduler(
+            cpu_slots=self.cpu_slots,
+            gpu_slots=self.gpu_slots,
+            fail_fast=self.fail_fast,
+            log_dir=log_dir)
+        exit_codes = scheduler.run(jobs)
+
+        skipped = [i for i, code in exit_codes.items() if code is None]
+        if skipped:
+            click.echo(
+                click.style(
+                    '{} commands were not run because of failures'.format(
+                        len(skipped)),
+                    fg='red'))
+        if scheduler.first_failed_id is not None:
+            sys.exit(exit_codes[scheduler.first_failed_id])
         else:
             return 0
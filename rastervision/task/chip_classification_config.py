@@ -16,9 +16,15 @@ class ChipClassificationConfig(TaskConfig):
                  predict_package_uri=None,
                  debug=False,
                  predict_debug_uri=None,
-                 chip_size=300):
+                 chip_size=300,
+                 predict_num_workers=1,
+                 predict_prefetch_batches=1,
+                 chip_num_workers=1,
+                 chip_worker_memory_mb=0):
         super().__init__(rv.CHIP_CLASSIFICATION, predict_batch_size,
-                         predict_package_uri, debug, predict_debug_uri)
+                         predict_package_uri, debug, predict_debug_uri,
+                         predict_num_workers, predict_prefetch_batches,
+                         chip_num_workers, chip_worker_memory_mb)
         self.class_map = class_map
         self.chip_size = chip_size
 
@@ -31,7 +37,11 @@ class ChipClassificationConfig(TaskConfig):
         return TaskConfigMsg(
             task_type=rv.CHIP_CLASSIFICATION,
             chip_classification_config=conf,
-            predict_package_uri=self.predict_package_uri)
+            predict_package_uri=self.predict_package_uri,
+            predict_num_workers=self.predict_num_workers,
+            predict_prefetch_batches=self.predict_prefetch_batches,
+            chip_num_workers=self.chip_num_workers,
+            chip_worker_memory_mb=self.chip_worker_memory_mb)
 
     def save_bundle_files(self, bundle_dir):
         return (self, [])
@@ -48,6 +58,10 @@ class ChipClassificationConfigBuilder(TaskConfigBuilder):
                 'class_map': prev.class_map,
                 'chip_size': prev.chip_size,
                 'predict_batch_size': prev.predict_batch_size,
+                'predict_num_workers': prev.predict_num_workers,
+                'predict_prefetch_batches': prev.predict_prefetch_batches,
+                'chip_num_workers': prev.chip_num_workers,
+                'chip_worker_memory_mb': prev.chip_worker_memory_mb,
                 'predict_package_uri': prev.predict_package_uri,
                 'debug': prev.debug,
                 'predict_debug_uri': prev.predict_debug_uri
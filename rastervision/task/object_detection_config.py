@@ -34,9 +34,15 @@ class ObjectDetectionConfig(TaskConfig):
                  predict_debug_uri=None,
                  chip_size=300,
                  chip_options=ChipOptions(),
-                 predict_options=PredictOptions()):
+                 predict_options=PredictOptions(),
+                 predict_num_workers=1,
+                 predict_prefetch_batches=1,
+                 chip_num_workers=1,
+                 chip_worker_memory_mb=0):
         super().__init__(rv.OBJECT_DETECTION, predict_batch_size,
-                         predict_package_uri, debug, predict_debug_uri)
+                         predict_package_uri, debug, predict_debug_uri,
+                         predict_num_workers, predict_prefetch_batches,
+                         chip_num_workers, chip_worker_memory_mb)
         self.class_map = class_map
         self.chip_size = chip_size
         self.chip_options = chip_options
@@ -82,6 +88,10 @@ class ObjectDetectionConfigBuilder(TaskConfigBuilder):
         if prev:
             config = {
                 'predict_batch_size': prev.predict_batch_size,
+                'predict_num_workers': prev.predict_num_workers,
+                'predict_prefetch_batches': prev.predict_prefetch_batches,
+                'chip_num_workers': prev.chip_num_workers,
+                'chip_worker_memory_mb': prev.chip_worker_memory_mb,
                 'predict_package_uri': prev.predict_package_uri,
                 'debug': prev.debug,
                 'predict_debug_uri': prev.predict_debug_uri,
@@ -7,7 +7,10 @@ from .task import Task
 from rastervision.core.box import Box
 from rastervision.data.scene import Scene
 from rastervision.data.label import SemanticSegmentationLabels
+from rastervision.data.label_store import SemanticSegmentationRasterStore
 from rastervision.core.training_data import TrainingData
+from rastervision.utils.misc import prefetch_map, get_available_memory
+from rastervision.rv_config import RVConfig
 
 TRAIN = 'train'
 VALIDATION = 'validation'
@@ -15,6 +18,23 @@ VALIDATION = 'validation'
 log = logging.getLogger(__name__)
 
 
+def get_predict_label_memory():
+    """Return the max number of bytes of predicted labels to keep in memory.
+
+    This is set by predict_label_memory_mb in the [RV] section of the RV config.
+    If it isn't set, it defaults to a quarter of the available memory, or None (no
+    limit) if the available memory can't be determined.
+    """
+    subconfig = RVConfig.get_instance().get_subconfig('RV')
+    memory_mb = subconfig('predict_label_memory_mb', default='')
+    if memory_mb:
+        return int(memory_mb) * 1024 * 1024
+    available_memory = get_available_memory()
+    if available_memory is None:
+        return None
+    return available_memory // 4
+
+
 def get_random_sample_train_windows(label_store, chip_size, class_map, extent,
                                     chip_options, filter_windows):
     prob = chip_options.negative_survival_probability
@@ -47,6 +67,129 @@ def get_random_sample_train_windows(label_store, chip_size, class_map, extent,
     return windows
 
 
+def get_sliding_positions(start, end, size, stride):
+    """Return the starting positions of windows sliding over [start, end).
+
+    The windows are stride apart, except for the last one which is moved back so
+    that it ends at end. If end - start < size, a single window is used.
+    """
+    last = max(end - size, start)
+    positions = list(range(start, last + 1, stride))
+    if positions[-1] != last:
+        positions.append(last)
+    return positions
+
+
+def get_blend_weights(size, blend='cosine'):
+    """Return a (size, size) array of weights for blending the scores of a window.
+
+    The weights are highest in the center of the window and fall off towards the
+    edges, but are positive everywhere so that pixels covered by a single window
+    keep its scores.
+
+    Args:
+        size: (int) size of the window
+        blend: (str) 'cosine' for a Hann window or 'linear' for a triangular one
+    """
+    # Pixel centers in (0, 1).
+    t = (np.arange(size) + 0.5) / size
+    if blend == 'cosine':
+        weights = 0.5 - 0.5 * np.cos(2 * np.pi * t)
+    elif blend == 'linear':
+        weights = 1 - np.abs(2 * t - 1)
+    else:
+        raise ValueError('Unknown blend: {}'.format(blend))
+    return np.outer(weights, weights).astype(np.float32)
+
+
+class ScoreBandAccumulator():
+    """Blends scores of overlapping windows over a band of rows of a scene.
+
+    The band holds the weighted sum of scores for size rows across the full width
+    of the extent. Windows must be added in row-major order, with tops that are
+    increasing. Before a window with a new top is added, the rows above it are
+    complete, so their labels are computed by taking the argmax over classes, and
+    the band is shifted down. If keep_scores is True, the blended scores of the
+    complete rows, normalized to sum to 1, are returned along with the labels.
+    """
+
+    def __init__(self, extent, size, blend='cosine', keep_scores=False):
+        self.extent = extent
+        self.size = size
+        self.keep_scores = keep_scores
+        self.weights = get_blend_weights(size, blend)[:, :, np.newaxis]
+        # Windows are wider than the extent if the scene is smaller than a window.
+        self.width = max(extent.get_width(), size)
+        self.top = extent.ymin
+        self.scores = None
+        self.nodata = np.zeros((size, self.width), dtype=np.bool_)
+
+    def add(self, window, scores, chip):
+        """Add the scores for a window, and return any labels that are complete.
+
+        Args:
+            window: Box of size by size pixels
+            scores: (size, size, num_classes) array of scores
+            chip: (size, size, channels) array of imagery for the window
+
+        Returns:
+            list of (Box, label_arr, score_arr) for the complete rows
+        """
+        completed = []
+        if window.ymin != self.top:
+            completed = self.finish(window.ymin)
+
+        if self.scores is None:
+            self.scores = np.zeros(
+                (self.size, self.width, scores.shape[2]), dtype=np.float32)
+        # The window starts at the top of the band.
+        x0 = window.xmin - self.extent.xmin
+        x1 = x0 + self.size
+        self.scores[:, x0:x1] += scores * self.weights
+        self.nodata[:, x0:x1] = np.sum(chip, axis=2) == 0
+        return completed
+
+    def finish(self, bottom=None):
+        """Compute labels for the rows from the top of the band to bottom.
+
+        Args:
+            bottom: row that ends the completed rows, or None to complete all rows
+                in the band
+
+        Returns:
+            list of (Box, label_arr, score_arr) for the completed rows, split into
+            windows of at most size by size pixels, where score_arr is None unless
+            keep_scores is True
+        """
+        if bottom is None:
+            bottom = min(self.top + self.size, self.extent.ymax)
+        height = bottom - self.top
+        completed = []
+        if self.scores is not None and height > 0:
+            xmin, xmax = self.extent.xmin, self.extent.xmax
+            for x in range(xmin, xmax, self.size):
+                x1 = min(x + self.size, xmax)
+                cols = slice(x - xmin, x1 - xmin)
+                scores = self.scores[:height, cols]
+                label_arr = np.argmax(scores, axis=2).astype(np.uint8)
+                # Set NODATA pixels in imagery to predicted value of 0 (ie. ignore)
+                label_arr[self.nodata[:height, cols]] = 0
+                score_arr = None
+                if self.keep_scores:
+                    total = np.sum(scores, axis=2, keepdims=True)
+                    score_arr = scores / np.maximum(total, 1e-6)
+                completed.append((Box(self.top, x, bottom, x1), label_arr,
+                                  score_arr))
+
+            # Shift the rows that aren't complete to the top of the band.
+            self.scores[:-height] = self.scores[height:]
+            self.scores[-height:] = 0
+            self.nodata[:-height] = self.nodata[height:]
+            self.nodata[-height:] = False
+        self.top = bottom
+        return completed
+
+
 class SemanticSegmentation(Task):
     """Task-derived type that implements the semantic segmentation task."""
 
@@ -95,62 +238,46 @@ class SemanticSegmentation(Task):
             return list(
                 filter_windows((extent.get_windows(chip_size, stride))))
 
-    def make_chips(self, train_scenes, validation_scenes, augmentors, tmp_dir):
-        """Make training chips.
-
-        Convert Scenes with a ground_truth_label_store into training
-        chips in MLBackend-specific format, and write to URI specified in
-        options.
+    def make_scene_chips(self, scene, type_, augmentors, tmp_dir):
+        """Make training chips for a single scene.
 
         Args:
-            train_scenes: list of Scenes
-            validation_scenes: list of Scenes
-                (that is disjoint from train_scenes)
-            augmentors: Augmentors used to augment training data
-        """
+            scene: Scene
+            type_: TRAIN or VALIDATION
+            augmentors: Augmentors used to augment the training data
+            tmp_dir: (str) temporary directory to use
 
-        def _process_scene(scene, type_, augment):
-            with scene.activate():
-                data = TrainingData()
-                log.info('Making {} chips for scene: {}'.format(
-                    type_, scene.id))
-                windows = self.get_train_windows(scene)
-                for window in windows:
-                    chip = scene.raster_source.get_chip(window)
-                    labels = self.get_train_labels(window, scene)
-
-                    # If chip has ignore labels, fill in those pixels with
-                    # nodata.
-                    label_arr = labels.get_label_arr(window)
-                    zero_inds = label_arr.ravel() == 0
-                    chip_shape = chip.shape
-                    if np.any(zero_inds):
-                        chip = np.reshape(chip, (-1, chip.shape[2]))
-                        chip[zero_inds, :] = 0
-                        chip = np.reshape(chip, chip_shape)
-
-                    data.append(chip, window, labels)
-                # Shuffle data so the first N samples which are displayed in
-                # Tensorboard are more diverse.
-                data.shuffle()
-
-                # Process augmentation
-                if augment:
-                    for augmentor in augmentors:
-                        data = augmentor.process(data, tmp_dir)
-
-                return self.backend.process_scene_data(scene, data, tmp_dir)
-
-        def _process_scenes(scenes, type_, augment):
-            return [_process_scene(scene, type_, augment) for scene in scenes]
-
-        processed_training_results = _process_scenes(
-            train_scenes, TRAIN, augment=True)
-        processed_validation_results = _process_scenes(
-            validation_scenes, VALIDATION, augment=False)
-
-        self.backend.process_sceneset_results(
-            processed_training_results, processed_validation_results, tmp_dir)
+        Returns:
+            the result of calling process_scene_data on the backend
+        """
+        with scene.activate():
+            data = TrainingData()
+            log.info('Making {} chips for scene: {}'.format(type_, scene.id))
+            windows = self.get_train_windows(scene)
+            for window in windows:
+                chip = scene.raster_source.get_chip(window)
+                labels = self.get_train_labels(window, scene)
+
+                # If chip has ignore labels, fill in those pixels with
+                # nodata.
+                label_arr = labels.get_label_arr(window)
+                zero_inds = label_arr.ravel() == 0
+                chip_shape = chip.shape
+                if np.any(zero_inds):
+                    chip = np.reshape(chip, (-1, chip.shape[2]))
+                    chip[zero_inds, :] = 0
+                    chip = np.reshape(chip, chip_shape)
+
+                data.append(chip, window, labels)
+            # Shuffle data so the first N samples which are displayed in
+            # Tensorboard are more diverse.
+            data.shuffle()
+
+            # Process augmentation
+            for augmentor in augmentors:
+                data = augmentor.process(data, tmp_dir)
+
+            return self.backend.process_scene_data(scene, data, tmp_dir)
 
     def get_train_labels(self, window: Box, scene: Scene) -> np.ndarray:
         """Get the training labels for the given window in the given scene.
@@ -189,21 +316,114 @@ class SemanticSegmentation(Task):
         # TODO implement this
         pass
 
+    def get_overlapping_predict_windows(self, extent: Box) -> List[Box]:
+        """Get overlapping windows for blended prediction in row-major order.
+
+        Args:
+             extent: The overall extent of the area.
+
+        Returns:
+             A list of windows of size predict_chip_size every predict_stride
+             pixels.
+        """
+        chip_size = self.config.predict_chip_size
+        stride = self.config.predict_stride
+        return [
+            Box(y, x, y + chip_size,
+                x + chip_size) for y in get_sliding_positions(
+                    extent.ymin, extent.ymax, chip_size, stride) for x in
+            get_sliding_positions(extent.xmin, extent.xmax, chip_size, stride)
+        ]
+
     def predict_scene(self, scene, tmp_dir):
-        """Predict on a single scene, and return the labels."""
-        log.info('Making predictions for scene')
-        raster_source = scene.raster_source
-        windows = self.get_predict_windows(raster_source.get_extent())
+        """Predict on a single scene, and return the labels.
 
-        def label_fn(window):
-            chip = raster_source.get_chip(window)
-            labels = self.backend.predict([chip], [window], tmp_dir)
-            label_arr = labels.get_label_arr(window)
+        Windows are grouped into batches of predict_batch_size, and each batch is
+        predicted in a single call to the backend. The label arrays are stored in
+        the returned labels, which keep up to predict_label_memory_mb megabytes of
+        them in memory (set in the [RV] section of the RV config) and spill the
+        rest to disk.
 
-            # Set NODATA pixels in imagery to predicted value of 0 (ie. ignore)
-            label_arr[np.sum(chip, axis=2) == 0] = 0
+        If predict_stride is set, the windows overlap and the scores predicted for
+        them are blended using a ScoreBandAccumulator.
 
-            print('.', end='', flush=True)
-            return label_arr
+        If the prediction label store has score_output set, the scores of each class
+        are stored in the labels as well. This requires a backend that implements
+        predict_scores.
+        """
+        log.info('Making predictions for scene')
+        raster_source = scene.raster_source
+        extent = raster_source.get_extent()
+        labels = SemanticSegmentationLabels(
+            max_memory=get_predict_label_memory())
+        label_store = scene.prediction_label_store
+        keep_scores = (isinstance(label_store, SemanticSegmentationRasterStore)
+                       and label_store.score_output)
+
+        def set_arrs(window, label_arr, score_arr):
+            labels.set_label_arr(window, label_arr)
+            if keep_scores:
+                labels.set_score_arr(window, score_arr)
+
+        blend = self.config.predict_stride is not None
+        if blend:
+            windows = self.get_overlapping_predict_windows(extent)
+            accumulator = ScoreBandAccumulator(
+                extent,
+                self.config.predict_chip_size,
+                self.config.predict_blend,
+                keep_scores=keep_scores)
+        else:
+            windows = self.get_predict_windows(extent)
+
+        # Read chips on a pool of threads ahead of the batch that is being
+        # predicted, so that reading and inference overlap.
+        batch_size = self.config.predict_batch_size
+        chips = prefetch_map(
+            raster_source.get_chip,
+            windows,
+            num_workers=self.config.predict_num_workers,
+            prefetch_size=self.config.predict_prefetch_batches * batch_size)
+
+        def predict_batch(batch_chips, batch_windows):
+            if blend:
+                batch_scores = self.backend.predict_scores(
+                    np.array(batch_chips), batch_windows, tmp_dir)
+                for window, chip, scores in zip(batch_windows, batch_chips,
+                                                batch_scores):
+                    for completed in accumulator.add(window, scores, chip):
+                        set_arrs(*completed)
+            elif keep_scores:
+                batch_scores = self.backend.predict_scores(
+                    np.array(batch_chips), batch_windows, tmp_dir)
+                for window, chip, scores in zip(batch_windows, batch_chips,
+                                                batch_scores):
+                    label_arr = np.argmax(scores, axis=2).astype(np.uint8)
+                    label_arr[np.sum(chip, axis=2) == 0] = 0
+                    set_arrs(window, label_arr, scores)
+            else:
+                batch_labels = self.backend.predict(
+                    np.array(batch_chips), batch_windows, tmp_dir)
+                for window, chip in zip(batch_windows, batch_chips):
+                    label_arr = batch_labels.get_label_arr(window)
+                    # Set NODATA pixels in imagery to predicted value of 0 (ie.
+                    # ignore)
+                    label_arr[np.sum(chip, axis=2) == 0] = 0
+                    labels.set_label_arr(window, label_arr)
+            print('.' * len(batch_windows), end='', flush=True)
+
+        batch_chips, batch_windows = [], []
+        for window, chip in zip(windows, chips):
+            batch_chips.append(chip)
+            batch_windows.append(window)
+            if len(batch_chips) >= batch_size:
+                predict_batch(batch_chips, batch_windows)
+                batch_chips, batch_windows = [], []
+        if batch_chips:
+            predict_batch(batch_chips, batch_windows)
+        if blend:
+            for completed in accumulator.finish():
+                set_arrs(*completed)
+        print()
 
-        return SemanticSegmentationLabels(windows, label_fn)
+        return labels
@@ -34,12 +34,27 @@ class SemanticSegmentationConfig(TaskConfig):
                  debug=True,
                  chip_size=300,
                  predict_chip_size=300,
-                 chip_options=None):
-        super().__init__(rv.SEMANTIC_SEGMENTATION, predict_batch_size,
-                         predict_package_uri, debug)
+                 predict_stride=None,
+                 predict_blend='cosine',
+                 chip_options=None,
+                 predict_num_workers=1,
+                 predict_prefetch_batches=1,
+                 chip_num_workers=1,
+                 chip_worker_memory_mb=0):
+        super().__init__(
+            rv.SEMANTIC_SEGMENTATION,
+            predict_batch_size,
+            predict_package_uri,
+            debug,
+            predict_num_workers=predict_num_workers,
+            predict_prefetch_batches=predict_prefetch_batches,
+            chip_num_workers=chip_num_workers,
+            chip_worker_memory_mb=chip_worker_memory_mb)
         self.class_map = class_map
         self.chip_size = chip_size
         self.predict_chip_size = predict_chip_size
+        self.predict_stride = predict_stride
+        self.predict_blend = predict_blend
         if chip_options is None:
             chip_options = SemanticSegmentationConfig.ChipOptions()
         self.chip_options = chip_options
@@ -68,6 +83,8 @@ class SemanticSegmentationConfig(TaskConfig):
         conf = TaskConfigMsg.SemanticSegmentationConfig(
             chip_size=self.chip_size,
             predict_chip_size=self.predict_chip_size,
+            predict_stride=self.predict_stride or 0,
+            predict_blend=self.predict_blend,
             class_items=self.class_map.to_proto(),
             chip_options=chip_options)
         msg.MergeFrom(
@@ -84,11 +101,17 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
         if prev:
             config = {
                 'predict_batch_size': prev.predict_batch_size,
+                'predict_num_workers': prev.predict_num_workers,
+                'predict_prefetch_batches': prev.predict_prefetch_batches,
+                'chip_num_workers': prev.chip_num_workers,
+                'chip_worker_memory_mb': prev.chip_worker_memory_mb,
                 'predict_package_uri': prev.predict_package_uri,
                 'debug': prev.debug,
                 'class_map': prev.class_map,
                 'chip_size': prev.chip_size,
                 'predict_chip_size': prev.predict_chip_size,
+                'predict_stride': prev.predict_stride,
+                'predict_blend': prev.predict_blend,
                 'chip_options': prev.chip_options
             }
         super().__init__(SemanticSegmentationConfig, config)
@@ -108,12 +131,21 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
         if predict_chip_size == 0:
             predict_chip_size = conf.chip_size
 
+        predict_stride = conf.predict_stride
+        if predict_stride == 0:
+            predict_stride = None
+
         return self.with_classes(list(conf.class_items)) \
                 .with_predict_batch_size(msg.predict_batch_size) \
                 .with_predict_package_uri(msg.predict_package_uri) \
                 .with_debug(msg.debug) \
+                .with_predict_prefetch(msg.predict_num_workers,
+                                       msg.predict_prefetch_batches) \
+                .with_chip_workers(msg.chip_num_workers,
+                                   msg.chip_worker_memory_mb) \
                 .with_chip_size(conf.chip_size) \
                 .with_predict_chip_size(predict_chip_size) \
+                .with_predict_stride(predict_stride, conf.predict_blend) \
                 .with_chip_options(
                     window_method=conf.chip_options.window_method,
                     target_classes=list(conf.chip_options.target_classes),
@@ -133,6 +165,20 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
                 'Cannot use more than {} classes with semantic segmentation.'.
                 format(max_classes))
 
+        predict_blend = self.config.get('predict_blend', 'cosine')
+        if predict_blend not in ['cosine', 'linear']:
+            raise rv.ConfigError(
+                'predict_blend must be cosine or linear, got {}'.format(
+                    predict_blend))
+        predict_stride = self.config.get('predict_stride')
+        predict_chip_size = self.config.get('predict_chip_size', 300)
+        valid_stride = (predict_stride is None
+                        or 0 < predict_stride <= predict_chip_size)
+        if not valid_stride:
+            raise rv.ConfigError(
+                'predict_stride must be between 1 and the predict_chip_size '
+                '({}), got {}'.format(predict_chip_size, predict_stride))
+
     def with_classes(
             self, classes: Union[ClassMap, List[str], List[ClassItemMsg], List[
                 ClassItem], Dict[str, int], Dict[str, Tuple[int, str]]]):
@@ -171,6 +217,27 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
         b.config['predict_chip_size'] = chip_size
         return b
 
+    def with_predict_stride(self, predict_stride, blend='cosine'):
+        """Predict on overlapping windows and blend their scores.
+
+        Windows of size predict_chip_size are placed every predict_stride pixels,
+        and the per-class scores predicted for each pixel are averaged with
+        weights that fall off towards the edges of windows, which removes
+        artifacts at the seams between windows. Only the scores for a band of
+        rows of the scene are kept in memory at a time. This requires a backend
+        that implements predict_scores.
+
+        Args:
+            predict_stride: (int) stride of the prediction windows in pixels, or
+                None to predict on windows that don't overlap
+            blend: (str) weights used to blend scores, either 'cosine' or
+                'linear'
+        """
+        b = deepcopy(self)
+        b.config['predict_stride'] = predict_stride
+        b.config['predict_blend'] = blend
+        return b
+
     def with_chip_options(self,
                           window_method='random_sample',
                           target_classes=None,
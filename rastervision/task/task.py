@@ -1,9 +1,11 @@
 from abc import abstractmethod
+import multiprocessing
 
 import numpy as np
 import logging
 
 from rastervision.core.training_data import TrainingData
+from rastervision.utils.misc import prefetch_map, get_available_memory
 
 # TODO: DRY... same keys as in ml_backends/tf_object_detection_api.py
 TRAIN = 'train'
@@ -11,6 +13,17 @@ VALIDATION = 'validation'
 
 log = logging.getLogger(__name__)
 
+# State shared with the processes that make chips. The processes are forked so
+# that the task and scenes are inherited rather than pickled.
+_chip_worker_state = None
+
+
+def _make_scene_chips_worker(job):
+    task, scenes, augmentors, tmp_dir = _chip_worker_state
+    type_, scene_ind = job
+    return task.make_scene_chips(scenes[type_][scene_ind], type_,
+                                 augmentors[type_], tmp_dir)
+
 
 class Task(object):
     """Functionality for a specific machine learning task.
@@ -92,45 +105,115 @@ class Task(object):
         chips in MLBackend-specific format, and write to URI specified in
         options.
 
+        If chip_num_workers > 1, scenes are processed concurrently by a pool of
+        processes.
+
         Args:
             train_scenes: list of Scenes
             validation_scenes: list of Scenes
                 (that is disjoint from train_scenes)
             augmentors: Augmentors used to augment training data
         """
-
-        def _process_scene(scene, type_, augment):
-            with scene.activate():
-                data = TrainingData()
-                log.info('Making {} chips for scene: {}'.format(
-                    type_, scene.id))
-                windows = self.get_train_windows(scene)
-                for window in windows:
-                    chip = scene.raster_source.get_chip(window)
-                    labels = self.get_train_labels(window, scene)
-                    data.append(chip, window, labels)
-                # Shuffle data so the first N samples which are displayed in
-                # Tensorboard are more diverse.
-                data.shuffle()
-
-                # Process augmentation
-                if augment:
-                    for augmentor in augmentors:
-                        data = augmentor.process(data, tmp_dir)
-
-                return self.backend.process_scene_data(scene, data, tmp_dir)
-
-        def _process_scenes(scenes, type_, augment):
-            return [_process_scene(scene, type_, augment) for scene in scenes]
-
-        processed_training_results = _process_scenes(
-            train_scenes, TRAIN, augment=True)
-        processed_validation_results = _process_scenes(
-            validation_scenes, VALIDATION, augment=False)
+        scenes = {TRAIN: train_scenes, VALIDATION: validation_scenes}
+        # Only training data is augmented.
+        type_augmentors = {TRAIN: augmentors, VALIDATION: []}
+        jobs = [(type_, scene_ind) for type_ in [TRAIN, VALIDATION]
+                for scene_ind in range(len(scenes[type_]))]
+
+        num_workers = self.get_chip_num_workers(len(jobs))
+        if num_workers > 1:
+            results = self._make_chips_in_pool(scenes, type_augmentors, jobs,
+                                               num_workers, tmp_dir)
+        else:
+            results = [
+                self.make_scene_chips(scenes[type_][scene_ind], type_,
+                                      type_augmentors[type_], tmp_dir)
+                for type_, scene_ind in jobs
+            ]
+
+        num_train = len(train_scenes)
+        processed_training_results = results[:num_train]
+        processed_validation_results = results[num_train:]
 
         self.backend.process_sceneset_results(
             processed_training_results, processed_validation_results, tmp_dir)
 
+    def get_chip_num_workers(self, num_scenes):
+        """Return the number of processes to use to make chips.
+
+        This is chip_num_workers, limited to the number of scenes and, if
+        chip_worker_memory_mb is set, to the number of workers that fit in the
+        available memory.
+        """
+        num_workers = min(self.config.chip_num_workers, num_scenes)
+        worker_memory = self.config.chip_worker_memory_mb * 1024 * 1024
+        available_memory = get_available_memory()
+        if worker_memory > 0 and available_memory is not None:
+            max_workers = max(1, available_memory // worker_memory)
+            if max_workers < num_workers:
+                log.info(
+                    'Using {} instead of {} processes to make chips due to '
+                    'available memory.'.format(max_workers, num_workers))
+                num_workers = max_workers
+        return num_workers
+
+    def _make_chips_in_pool(self, scenes, augmentors, jobs, num_workers,
+                            tmp_dir):
+        global _chip_worker_state
+
+        # Start with the largest scenes so that they don't hold up the end of
+        # the run.
+        def get_scene_size(job):
+            type_, scene_ind = job
+            extent = scenes[type_][scene_ind].raster_source.get_extent()
+            return extent.get_height() * extent.get_width()
+
+        sorted_jobs = sorted(jobs, key=get_scene_size, reverse=True)
+
+        log.info('Making chips for {} scenes using {} processes'.format(
+            len(jobs), num_workers))
+        _chip_worker_state = (self, scenes, augmentors, tmp_dir)
+        try:
+            ctx = multiprocessing.get_context('fork')
+            with ctx.Pool(num_workers) as pool:
+                sorted_results = pool.map(
+                    _make_scene_chips_worker, sorted_jobs, chunksize=1)
+        finally:
+            _chip_worker_state = None
+
+        job_results = dict(zip(sorted_jobs, sorted_results))
+        return [job_results[job] for job in jobs]
+
+    def make_scene_chips(self, scene, type_, augmentors, tmp_dir):
+        """Make training chips for a single scene.
+
+        Args:
+            scene: Scene
+            type_: TRAIN or VALIDATION
+            augmentors: Augmentors used to augment the training data
+            tmp_dir: (str) temporary directory to use
+
+        Returns:
+            the result of calling process_scene_data on the backend
+        """
+        with scene.activate():
+            data = TrainingData()
+            log.info('Making {} chips for scene: {}'.format(type_, scene.id))
+            windows = self.get_train_windows(scene)
+            for window in windows:
+                chip = scene.raster_source.get_chip(window)
+                labels = self.get_train_labels(window, scene)
+                data.append(chip, window, labels)
+            # Shuffle data so the first N samples which are displayed in
+            # Tensorboard are more diverse.
+            data.shuffle()
+
+            # Process augmentation
+            for augmentor in augmentors:
+                data = augmentor.process(data, tmp_dir)
+
+            return self.backend.process_scene_data(scene, data, tmp_dir)
+
     def train(self, tmp_dir):
         """Train a model.
         """
@@ -173,9 +256,18 @@ class Task(object):
             labels += new_labels
             print('.' * len(predict_chips), end='', flush=True)
 
+        # Read chips on a pool of threads ahead of the batch that is being
+        # predicted, so that reading and inference overlap.
+        prefetch_size = (self.config.predict_prefetch_batches *
+                         self.config.predict_batch_size)
+        chips = prefetch_map(
+            raster_source.get_chip,
+            windows,
+            num_workers=self.config.predict_num_workers,
+            prefetch_size=prefetch_size)
+
         batch_chips, batch_windows = [], []
-        for window in windows:
-            chip = raster_source.get_chip(window)
+        for window, chip in zip(windows, chips):
             if np.any(chip):
                 batch_chips.append(chip)
                 batch_windows.append(window)
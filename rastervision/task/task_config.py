@@ -13,12 +13,20 @@ class TaskConfig(BundledConfigMixin, Config):
                  predict_batch_size=10,
                  predict_package_uri=None,
                  debug=True,
-                 predict_debug_uri=None):
+                 predict_debug_uri=None,
+                 predict_num_workers=1,
+                 predict_prefetch_batches=1,
+                 chip_num_workers=1,
+                 chip_worker_memory_mb=0):
         self.task_type = task_type
         self.predict_batch_size = predict_batch_size
         self.predict_package_uri = predict_package_uri
         self.debug = debug
         self.predict_debug_uri = predict_debug_uri
+        self.predict_num_workers = predict_num_workers
+        self.predict_prefetch_batches = predict_prefetch_batches
+        self.chip_num_workers = chip_num_workers
+        self.chip_worker_memory_mb = chip_worker_memory_mb
 
     @abstractmethod
     def create_task(self, backend):
@@ -38,7 +46,11 @@ class TaskConfig(BundledConfigMixin, Config):
             predict_batch_size=self.predict_batch_size,
             predict_package_uri=self.predict_package_uri,
             debug=self.debug,
-            predict_debug_uri=self.predict_debug_uri)
+            predict_debug_uri=self.predict_debug_uri,
+            predict_num_workers=self.predict_num_workers,
+            predict_prefetch_batches=self.predict_prefetch_batches,
+            chip_num_workers=self.chip_num_workers,
+            chip_worker_memory_mb=self.chip_worker_memory_mb)
 
     @staticmethod
     def builder(task_type):
@@ -70,6 +82,10 @@ class TaskConfigBuilder(ConfigBuilder):
         b = b.with_predict_package_uri(msg.predict_package_uri)
         b = b.with_debug(msg.debug)
         b = b.with_predict_debug_uri(msg.predict_debug_uri)
+        b = b.with_predict_prefetch(msg.predict_num_workers,
+                                    msg.predict_prefetch_batches)
+        b = b.with_chip_workers(msg.chip_num_workers,
+                                msg.chip_worker_memory_mb)
         return b
 
     def with_predict_batch_size(self, predict_batch_size):
@@ -95,3 +111,35 @@ class TaskConfigBuilder(ConfigBuilder):
         b = deepcopy(self)
         b.config['predict_debug_uri'] = predict_debug_uri
         return b
+
+    def with_predict_prefetch(self, num_workers=1, prefetch_batches=1):
+        """Set how chips are read ahead of inference during prediction.
+
+        Chips are read on a pool of threads while the current batch is being
+        predicted, so that reading imagery and running inference overlap.
+
+        Args:
+            num_workers: (int) number of threads used to read chips. If 0, chips
+                are read on the same thread that runs inference.
+            prefetch_batches: (int) number of batches of chips to read ahead of
+                the batch being predicted
+        """
+        b = deepcopy(self)
+        b.config['predict_num_workers'] = num_workers
+        b.config['predict_prefetch_batches'] = prefetch_batches
+        return b
+
+    def with_chip_workers(self, num_workers=1, worker_memory_mb=0):
+        """Set how many scenes are made into chips concurrently.
+
+        Args:
+            num_workers: (int) number of processes used to make chips. Each process
+                makes the chips for one scene at a time.
+            worker_memory_mb: (int) estimate of the memory used by each process in
+                MB. If > 0, the number of processes is limited to what fits in the
+                available memory.
+        """
+        b = deepcopy(self)
+        b.config['chip_num_workers'] = num_workers
+        b.config['chip_worker_memory_mb'] = worker_memory_mb
+        return b
@@ -0,0 +1,255 @@
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack, contextmanager
+from threading import Lock
+
+from rastervision.filesystem.filesystem import FileSystem
+from rastervision.filesystem.local_filesystem import make_dir
+
+log = logging.getLogger(__name__)
+
+_download_cache = None
+_download_cache_lock = Lock()
+
+
+@contextmanager
+def _file_lock(lock_path, blocking=True):
+    """Hold an exclusive lock on a file, which works across processes.
+
+    Yields True if the lock was acquired, which is always the case when blocking.
+    """
+    with open(lock_path, 'a') as lock_file:
+        flags = fcntl.LOCK_EX
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class DownloadCache():
+    """A persistent cache of downloaded files that can be shared by processes.
+
+    Files are keyed by their URI and their version, which is the ETag of the file
+    if the file system supports it and its last modified time otherwise, so a file
+    that changes is downloaded again. Each file is downloaded while holding a lock,
+    so that concurrent workers wait for a download in progress instead of
+    downloading the same file, and a shared lock is held while the file is in use.
+    When the total size of the cached files exceeds max_bytes, the least recently
+    used files that aren't in use are deleted.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        """Constructor.
+
+        Args:
+            cache_dir: (str) local directory to store the cache in
+            max_bytes: (int) maximum total size of the cached files in bytes. If
+                None, files are never evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.files_dir = os.path.join(cache_dir, 'files')
+        self.locks_dir = os.path.join(cache_dir, 'locks')
+        make_dir(self.files_dir)
+        make_dir(self.locks_dir)
+
+    @staticmethod
+    def get_version(uri, fs):
+        """Return a string identifying the version of a file, or None if unknown."""
+        etag = fs.etag(uri)
+        if etag is not None:
+            return 'etag:{}'.format(etag)
+        last_modified = fs.last_modified(uri)
+        if last_modified is not None:
+            return 'last_modified:{}'.format(last_modified.isoformat())
+        return None
+
+    def _get_key(self, uri, version):
+        return hashlib.sha256('{}\n{}'.format(uri,
+                                              version).encode()).hexdigest()
+
+    def _get_lock_path(self, key):
+        return os.path.join(self.locks_dir, key + '.lock')
+
+    def _get_entry(self, uri, fs=None):
+        """Return (key, path) of the entry for a file, or None if it can't be cached.
+
+        Files can't be cached if their version can't be determined.
+        """
+        if not fs:
+            fs = FileSystem.get_file_system(uri, 'r')
+        version = self.get_version(uri, fs)
+        if version is None:
+            return None
+
+        key = self._get_key(uri, version)
+        # Keep the file name so that formats can still be inferred from it.
+        file_name = os.path.basename(fs.local_path(uri, '/')) or 'file'
+        return key, os.path.join(self.files_dir, key, file_name)
+
+    def _lock_entry(self, lock_file, uri, fs, path):
+        """Download a file if needed, and hold a shared lock on its entry.
+
+        Returns True if the file was downloaded.
+        """
+        entry_dir = os.path.dirname(path)
+        downloaded = False
+        while True:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            if os.path.isfile(path):
+                # The modification time of the entry is used to evict the least
+                # recently used files.
+                os.utime(entry_dir)
+                return downloaded
+
+            # Release the shared lock before waiting for an exclusive one, so that
+            # two processes missing the same file don't deadlock.
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not os.path.isfile(path):
+                log.debug('Downloading {} to cache {}'.format(
+                    uri, self.cache_dir))
+                make_dir(entry_dir)
+                # Download to a temporary path so that interrupted downloads are
+                # never mistaken for cached files.
+                fd, tmp_path = tempfile.mkstemp(dir=entry_dir, suffix='.tmp')
+                os.close(fd)
+                try:
+                    fs.copy_from(uri, tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.isfile(tmp_path):
+                        os.remove(tmp_path)
+                downloaded = True
+            # The entry could be evicted between downgrading the lock and
+            # acquiring the shared lock, so check that it exists again.
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def use(self, uris, fs=None):
+        """Use cached copies of files, downloading them if needed.
+
+        A shared lock is held on each entry until the context exits, so that the
+        files aren't evicted while they are in use, by this or any other process.
+
+        Args:
+            uris: (list of str) URIs of files
+            fs: Optional FileSystem to use for all of the files
+
+        Yields:
+            (list of str) paths of the cached files. A path is None if the version
+                of the file can't be determined, in which case it can't be cached.
+        """
+        entries = [self._get_entry(uri, fs=fs) for uri in uris]
+        # Protect all the files from eviction, not just the last one downloaded,
+        # since they are used together.
+        keep_keys = [entry[0] for entry in entries if entry is not None]
+
+        with ExitStack() as stack:
+            paths = []
+            for uri, entry in zip(uris, entries):
+                if entry is None:
+                    paths.append(None)
+                    continue
+                key, path = entry
+                lock_file = stack.enter_context(
+                    open(self._get_lock_path(key), 'a'))
+                uri_fs = fs or FileSystem.get_file_system(uri, 'r')
+                if self._lock_entry(lock_file, uri, uri_fs, path):
+                    self.misses += 1
+                    self.evict(keep_keys=keep_keys)
+                else:
+                    self.hits += 1
+                paths.append(path)
+            yield paths
+
+    def get_size(self):
+        """Return the total size of the cached files in bytes."""
+        return sum(size for _, _, size in self._get_entries())
+
+    def _get_entries(self):
+        """Return a list of (access time, key, size) for each entry in the cache."""
+        entries = []
+        for key in os.listdir(self.files_dir):
+            entry_dir = os.path.join(self.files_dir, key)
+            try:
+                atime = os.path.getmtime(entry_dir)
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, file_name))
+                    for file_name in os.listdir(entry_dir))
+            except FileNotFoundError:
+                # Another process deleted the entry.
+                continue
+            entries.append((atime, key, size))
+        return entries
+
+    def evict(self, keep_keys=None):
+        """Delete least recently used files until the cache fits in max_bytes.
+
+        Files that are being downloaded or used by any process are skipped.
+
+        Args:
+            keep_keys: keys of entries that should not be deleted
+        """
+        if self.max_bytes is None:
+            return
+        keep_keys = set(keep_keys or [])
+
+        with _file_lock(os.path.join(self.cache_dir, 'evict.lock')):
+            entries = sorted(self._get_entries())
+            num_bytes = sum(size for _, _, size in entries)
+            for _, key, size in entries:
+                if num_bytes <= self.max_bytes:
+                    break
+                if key in keep_keys:
+                    continue
+                with _file_lock(
+                        self._get_lock_path(key), blocking=False) as locked:
+                    if not locked:
+                        continue
+                    shutil.rmtree(
+                        os.path.join(self.files_dir, key), ignore_errors=True)
+                    num_bytes -= size
+
+    def get_stats(self):
+        """Return a dict with the number of hits and misses of this cache."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def get_download_cache():
+    """Return the DownloadCache configured in the RV config, or None if not set.
+
+    The cache is enabled by setting download_cache_dir in the [RV] section of the
+    config (or the RV_DOWNLOAD_CACHE_DIR environment variable), and its size is set
+    by download_cache_size_mb.
+    """
+    global _download_cache
+    # Import here to avoid circular reference.
+    from rastervision.rv_config import RVConfig
+
+    rv_config = RVConfig.get_instance()
+    subconfig = rv_config.get_subconfig('RV')
+    cache_dir = subconfig('download_cache_dir', default='')
+    if not cache_dir:
+        return None
+    cache_size_mb = subconfig('download_cache_size_mb', default='')
+    max_bytes = int(cache_size_mb) * 1024 * 1024 if cache_size_mb else None
+
+    with _download_cache_lock:
+        if (_download_cache is None or _download_cache.cache_dir != cache_dir
+                or _download_cache.max_bytes != max_bytes):
+            _download_cache = DownloadCache(cache_dir, max_bytes)
+        return _download_cache
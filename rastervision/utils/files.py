@@ -7,12 +7,14 @@ import time
 import logging
 import json
 import zipfile
+from contextlib import contextmanager
 
 from google.protobuf import json_format
 
 from rastervision.filesystem.filesystem import FileSystem
 from rastervision.filesystem.filesystem import ProtobufParseException
 from rastervision.filesystem.local_filesystem import make_dir
+from rastervision.utils.download_cache import get_download_cache
 
 log = logging.getLogger(__name__)
 
@@ -113,7 +115,7 @@ def start_sync(src_dir_uri, dest_dir_uri, sync_interval=600,
     return SyncThread()
 
 
-def download_if_needed(uri, download_dir, fs=None):
+def download_if_needed(uri, download_dir, fs=None, use_cache=False):
     """Download a file into a directory if it's remote.
 
     If uri is local, there is no need to download the file.
@@ -122,6 +124,10 @@ def download_if_needed(uri, download_dir, fs=None):
         uri: (string) URI of file
         download_dir: (string) local directory to download file into
         fs: Optional FileSystem to use.
+        use_cache: If True and a download cache is configured (see
+            get_download_cache), the file is only downloaded if it isn't already
+            cached, and is then linked (or copied) from the cache into
+            download_dir.
 
     Returns:
         (string) path to local file
@@ -136,6 +142,14 @@ def download_if_needed(uri, download_dir, fs=None):
         fs = FileSystem.get_file_system(uri, 'r')
 
     path = get_local_path(uri, download_dir, fs=fs)
+    if use_cache and path != uri:
+        download_cache = get_download_cache()
+        if download_cache is not None:
+            with download_cache.use([uri], fs=fs) as (cached_path, ):
+                if cached_path is not None:
+                    _link_or_copy(cached_path, path)
+                    return path
+
     make_dir(path, use_dirname=True)
 
     if path != uri:
@@ -146,6 +160,54 @@ def download_if_needed(uri, download_dir, fs=None):
     return path
 
 
+def _link_or_copy(src_path, dst_path):
+    """Hard link a file, or copy it if it can't be linked.
+
+    A hard link is cheap and remains valid when the source file is deleted.
+    """
+    make_dir(dst_path, use_dirname=True)
+    if os.path.isfile(dst_path):
+        os.remove(dst_path)
+    try:
+        os.link(src_path, dst_path)
+    except OSError:
+        shutil.copyfile(src_path, dst_path)
+
+
+@contextmanager
+def download_all_if_needed(uris, download_dir, fs=None):
+    """Download files into a directory if they're remote, using the download cache.
+
+    If a download cache is configured (see get_download_cache), the paths of the
+    cached copies of the files are used, and they can't be evicted until the
+    context exits. Otherwise, this is the same as calling download_if_needed for
+    each file.
+
+    Args:
+        uris: (list of string) URIs of files
+        download_dir: (string) local directory to download files into if they
+            can't be cached
+        fs: Optional FileSystem to use for all of the files
+
+    Yields:
+        (list of string) paths to local files
+    """
+    download_cache = get_download_cache()
+    if download_cache is None:
+        yield [download_if_needed(uri, download_dir, fs=fs) for uri in uris]
+        return
+
+    remote_uris = [
+        uri for uri in uris if get_local_path(uri, download_dir, fs=fs) != uri
+    ]
+    with download_cache.use(remote_uris, fs=fs) as cached_paths:
+        cached_paths = dict(zip(remote_uris, cached_paths))
+        yield [
+            cached_paths.get(uri)
+            or download_if_needed(uri, download_dir, fs=fs) for uri in uris
+        ]
+
+
 def download_or_copy(uri, target_dir, fs=None):
     """Downloads or copies a file to a directory
 
@@ -165,6 +227,33 @@ def file_exists(uri, fs=None, include_dir=True):
     return fs.file_exists(uri, include_dir)
 
 
+def files_exist(uris, include_dir=True):
+    """Check if each of a list of files exists.
+
+    The URIs are grouped by FileSystem, and the files of each FileSystem are checked
+    together using FileSystem.files_exist, which is much faster than calling
+    file_exists for each remote file.
+
+    Args:
+        uris: list of URIs to check
+        include_dir: See file_exists
+
+    Returns:
+        list with a bool for each URI
+    """
+    fs_to_inds = {}
+    for ind, uri in enumerate(uris):
+        fs = FileSystem.get_file_system(uri, 'r')
+        fs_to_inds.setdefault(fs, []).append(ind)
+
+    exists = [False] * len(uris)
+    for fs, inds in fs_to_inds.items():
+        fs_exists = fs.files_exist([uris[ind] for ind in inds], include_dir)
+        for ind, uri_exists in zip(inds, fs_exists):
+            exists[ind] = uri_exists
+    return exists
+
+
 def list_paths(uri, ext='', fs=None):
     if uri is None:
         return None
@@ -1,5 +1,8 @@
 import io
+import os
 from math import ceil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image
 import numpy as np
@@ -155,3 +158,74 @@ def split_into_groups(lst, num_groups):
     group_size = max(int(ceil((len(lst)) / num_groups)), 1)
 
     return grouped(lst, group_size)
+
+
+def prefetch_map(fn, items, num_workers=1, prefetch_size=1):
+    """Lazily map a function over items using a pool of threads.
+
+    Up to prefetch_size calls to fn are run ahead of the item that is currently being
+    consumed, so that the work done by fn (eg. reading chips) overlaps with the work
+    done by the consumer (eg. running inference). The results are yielded in the
+    same order as items.
+
+    Args:
+        fn: function to apply to each item
+        items: iterable of items
+        num_workers: number of threads used to call fn. If 0, fn is called on the
+            current thread as each result is needed.
+        prefetch_size: maximum number of results computed ahead of the consumer
+
+    Returns:
+        generator of fn(item) for each item in items
+    """
+    if num_workers == 0:
+        for item in items:
+            yield fn(item)
+        return
+
+    items = iter(items)
+    futures = deque()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        try:
+            for item in items:
+                futures.append(executor.submit(fn, item))
+                if len(futures) > prefetch_size:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            # If the consumer stops early, don't run the remaining calls.
+            for future in futures:
+                future.cancel()
+
+
+def get_available_memory():
+    """Return the amount of available physical memory in bytes.
+
+    This includes memory used by the page cache that can be reclaimed, so it's
+    read using psutil if it's installed, and otherwise from MemAvailable in
+    /proc/meminfo. If neither is available, the amount of free memory is
+    returned.
+
+    Returns:
+        (int) number of bytes, or None if this can't be determined on this platform
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    # The value is in kB.
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
@@ -57,8 +57,17 @@ def load_conf_list(s):
         return list(map(lambda x: x.strip(), s.split(',')))
 
 
-def system_init(profile=None, verbosity=Verbosity.NORMAL):
-    _rv_config.reset(profile=profile, verbosity=verbosity)
+def system_init(profile=None,
+                verbosity=Verbosity.NORMAL,
+                rv_home=None,
+                config_overrides=None,
+                tmp_dir=None):
+    _rv_config.reset(
+        profile=profile,
+        verbosity=verbosity,
+        rv_home=rv_home,
+        config_overrides=config_overrides,
+        tmp_dir=tmp_dir)
 
     plugin_config = _rv_config.get_subconfig('PLUGINS')
     if plugin_config:
@@ -1,13 +1,76 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rastervision.v2.core import _rv_config, system_init
 from rastervision.v2.core.main import _run_command
 
 INPROCESS = 'inprocess'
 
 
+def _init_split_worker(rv_config_dict):
+    # Worker processes are spawned, so they need to be initialized like this one,
+    # including any config overrides.
+    system_init(**rv_config_dict)
+
+
 class InProcessRunner():
+    """Runs commands on this machine, running the splits of commands in parallel.
+
+    Commands are run in this process, except for the splits of split commands,
+    which are run in a pool of up to num_workers processes. The next command is
+    run once all the splits have finished. num_workers is set by the num_workers
+    option in the [INPROCESS] section of the RV config, and defaults to the number
+    of CPUs. Splits of commands that use the GPU share it, so they are run by up to
+    gpu_num_workers processes instead, which is set by the gpu_num_workers option
+    and defaults to 1. The worker processes are spawned rather than forked, so that
+    it's safe to run them after a command that used the GPU in this process.
+    """
+
+    def __init__(self, num_workers=None, gpu_num_workers=None):
+        inprocess_config = _rv_config.get_subconfig('INPROCESS')
+        if num_workers is None:
+            num_workers = inprocess_config(
+                'num_workers',
+                parser=int,
+                default=str(multiprocessing.cpu_count()))
+        if gpu_num_workers is None:
+            gpu_num_workers = inprocess_config(
+                'gpu_num_workers', parser=int, default='1')
+        self.num_workers = num_workers
+        self.gpu_num_workers = gpu_num_workers
+
+    def run_splits(self, cfg_json_uri, command, num_splits, use_gpu=False):
+        num_workers = self.gpu_num_workers if use_gpu else self.num_workers
+        num_workers = min(num_workers, num_splits)
+        if num_workers <= 1:
+            for split_ind in range(num_splits):
+                _run_command(cfg_json_uri, command, split_ind, num_splits)
+            return
+
+        initargs = (_rv_config.get_config_dict(), )
+        with ProcessPoolExecutor(
+                num_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_split_worker,
+                initargs=initargs) as executor:
+            futures = [
+                executor.submit(_run_command, cfg_json_uri, command, split_ind,
+                                num_splits) for split_ind in range(num_splits)
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                # Don't start the remaining splits if one fails.
+                for future in futures:
+                    future.cancel()
+                raise
+
     def run(self, cfg_json_uri, pipeline, commands, num_splits=1):
         for command in commands:
             if command in pipeline.split_commands and num_splits > 1:
-                for split_ind in range(num_splits):
-                    _run_command(cfg_json_uri, command, split_ind, num_splits)
+                use_gpu = command in pipeline.gpu_commands
+                self.run_splits(
+                    cfg_json_uri, command, num_splits, use_gpu=use_gpu)
             else:
                 _run_command(cfg_json_uri, command, 0, 1)
@@ -54,9 +54,11 @@ class RVConfig:
                 profile = os.environ.get('RV_PROFILE')
             else:
                 profile = RVConfig.DEFAULT_PROFILE
+        self.profile = profile
 
         if config_overrides is None:
             config_overrides = {}
+        self.config_overrides = config_overrides
 
         if rv_home is None:
             home = os.path.expanduser('~')
@@ -189,3 +191,20 @@ class RVConfig:
 
     def get_verbosity(self):
         return self.verbosity
+
+    def get_config_dict(self):
+        """Return the arguments to reset() that recreate this config.
+
+        This is used to initialize the config in other processes in the same way,
+        including any overrides.
+        """
+        return {
+            'profile': self.profile,
+            'rv_home': self.rv_home,
+            'config_overrides': self.config_overrides,
+            'tmp_dir': RVConfig.get_tmp_dir_root(),
+            'verbosity': self.verbosity
+        }
+
+    def get_profile(self):
+        return self.profile
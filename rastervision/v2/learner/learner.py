@@ -9,6 +9,7 @@ import shutil
 import os
 import math
 import logging
+from contextlib import ExitStack
 
 import click
 import matplotlib
@@ -40,8 +41,11 @@ class Learner(ABC):
         self.data_cache_dir = '/opt/data/data-cache'
         make_dir(self.data_cache_dir)
 
+        self.amp_dtype = self.get_amp_dtype() if cfg.solver.amp else None
         self.model = self.build_model()
         self.model.to(self.device)
+        if cfg.solver.channels_last:
+            self.model.to(memory_format=torch.channels_last)
 
         if model_path is not None:
             if isfile(model_path):
@@ -73,19 +77,22 @@ class Learner(ABC):
             self.last_model_path = join(self.output_dir, 'last-model.pth')
             self.config_path = join(self.output_dir, 'config.json')
             self.train_state_path = join(self.output_dir, 'train-state.json')
+            self.grad_scaler_path = join(self.output_dir,
+                                         'last-grad-scaler.pth')
             self.log_path = join(self.output_dir, 'log.csv')
             model_bundle_fn = basename(cfg.get_model_bundle_uri())
             self.model_bundle_path = join(self.output_dir, model_bundle_fn)
             self.metric_names = self.build_metric_names()
 
             json_to_file(self.cfg.dict(), self.config_path)
+            self.grad_scaler = self.build_grad_scaler()
             self.load_init_weights()
             self.load_checkpoint()
             self.opt = self.build_optimizer()
             self.build_data()
             self.start_epoch = self.get_start_epoch()
-            self.steps_per_epoch = len(
-                self.train_ds) // self.cfg.solver.batch_sz
+            self.steps_per_epoch = math.ceil(
+                len(self.train_dl) / self.cfg.solver.grad_accum_steps)
             self.step_scheduler = self.build_step_scheduler()
             self.epoch_scheduler = self.build_epoch_scheduler()
 
@@ -134,6 +141,65 @@ class Learner(ABC):
     def build_optimizer(self):
         return optim.Adam(self.model.parameters(), lr=self.cfg.solver.lr)
 
+    def get_amp_dtype(self):
+        amp_dtype = self.cfg.solver.amp_dtype
+        if amp_dtype is None:
+            amp_dtype = 'float16' if self.device == 'cuda' else 'bfloat16'
+        return getattr(torch, amp_dtype)
+
+    def build_grad_scaler(self):
+        """Return a GradScaler, or None if gradients don't need to be scaled.
+
+        Gradients are only scaled when using float16 on a GPU, since bfloat16 has
+        the range of float32.
+        """
+        if not (self.cfg.solver.amp and self.amp_dtype == torch.float16
+                and self.device == 'cuda'):
+            return None
+        # torch.amp.GradScaler replaced torch.cuda.amp.GradScaler in torch 2.3.
+        if hasattr(torch.amp, 'GradScaler'):
+            return torch.amp.GradScaler('cuda')
+        return torch.cuda.amp.GradScaler()
+
+    def autocast(self):
+        """Return a context in which forward passes run in mixed precision.
+
+        This does nothing unless the amp solver option is set.
+        """
+        if not self.cfg.solver.amp:
+            return ExitStack()
+        return torch.autocast(self.device, dtype=self.amp_dtype)
+
+    def backward(self, loss):
+        """Compute the gradients of a loss, scaling it if needed."""
+        if self.grad_scaler is None:
+            loss.backward()
+        else:
+            self.grad_scaler.scale(loss).backward()
+
+    def optimizer_step(self):
+        """Step the optimizer.
+
+        Returns:
+            False if the step was skipped because the gradients overflowed
+        """
+        if self.grad_scaler is None:
+            self.opt.step()
+            return True
+        # The GradScaler skips the optimizer step and decreases the scale when the
+        # gradients overflow.
+        scale = self.grad_scaler.get_scale()
+        self.grad_scaler.step(self.opt)
+        self.grad_scaler.update()
+        return self.grad_scaler.get_scale() >= scale
+
+    def to_device(self, x):
+        """Move a batch of images to the device in the model's memory format."""
+        x = x.to(self.device)
+        if self.cfg.solver.channels_last and x.ndim == 4:
+            x = x.contiguous(memory_format=torch.channels_last)
+        return x
+
     def build_step_scheduler(self):
         scheduler = None
         cfg = self.cfg
@@ -211,7 +277,7 @@ class Learner(ABC):
         x = self.to_batch(x)
         if normalize:
             x = self.normalize_input(x)
-        x = x.to(self.device)
+        x = self.to_device(x)
         with torch.no_grad():
             out = self.model(x)
             if not raw_out:
@@ -241,7 +307,7 @@ class Learner(ABC):
         xs, ys, zs = [], [], []
         with torch.no_grad():
             for x, y in dl:
-                x = x.to(self.device)
+                x = self.to_device(x)
                 z = self.post_forward(self.model(x))
                 x = x.cpu()
                 z = z.cpu()
@@ -351,25 +417,42 @@ class Learner(ABC):
             log.info('Loading checkpoint from {}'.format(self.last_model_path))
             self.model.load_state_dict(
                 torch.load(self.last_model_path, map_location=self.device))
+        if self.grad_scaler is not None and isfile(self.grad_scaler_path):
+            self.grad_scaler.load_state_dict(torch.load(self.grad_scaler_path))
+
+    def save_checkpoint(self):
+        torch.save(self.model.state_dict(), self.last_model_path)
+        if self.grad_scaler is not None:
+            torch.save(self.grad_scaler.state_dict(), self.grad_scaler_path)
 
     def train_epoch(self):
         start = time.time()
         self.model.train()
         num_samples = 0
         outputs = []
+        accum_steps = self.cfg.solver.grad_accum_steps
+        num_batches = len(self.train_dl)
+        self.opt.zero_grad()
         with click.progressbar(self.train_dl, label='Training') as bar:
             for batch_ind, (x, y) in enumerate(bar):
-                x = x.to(self.device)
+                x = self.to_device(x)
                 y = y.to(self.device)
                 batch = (x, y)
-                self.opt.zero_grad()
-                output = self.train_step(batch, batch_ind)
+                with self.autocast():
+                    output = self.train_step(batch, batch_ind)
                 outputs.append(output)
+                # Training losses are summed over samples, so accumulating their
+                # gradients over batches is the same as using a larger batch.
                 loss = output['train_loss']
-                loss.backward()
-                self.opt.step()
-                if self.step_scheduler:
-                    self.step_scheduler.step()
+                self.backward(loss)
+                if ((batch_ind + 1) % accum_steps == 0
+                        or batch_ind + 1 == num_batches):
+                    stepped = self.optimizer_step()
+                    self.opt.zero_grad()
+                    # The scheduler doesn't step when the optimizer step was
+                    # skipped.
+                    if self.step_scheduler and stepped:
+                        self.step_scheduler.step()
                 num_samples += x.shape[0]
         metrics = self.train_end(outputs, num_samples)
         end = time.time()
@@ -385,10 +468,11 @@ class Learner(ABC):
         with torch.no_grad():
             with click.progressbar(dl, label='Validating') as bar:
                 for batch_ind, (x, y) in enumerate(bar):
-                    x = x.to(self.device)
+                    x = self.to_device(x)
                     y = y.to(self.device)
                     batch = (x, y)
-                    output = self.validate_step(batch, batch_ind)
+                    with self.autocast():
+                        output = self.validate_step(batch, batch_ind)
                     outputs.append(output)
                     num_samples += x.shape[0]
         end = time.time()
@@ -402,7 +486,7 @@ class Learner(ABC):
         self.on_overfit_start()
 
         x, y = next(iter(self.train_dl))
-        x = x.to(self.device)
+        x = self.to_device(x)
         y = y.to(self.device)
         batch = (x, y)
 
@@ -410,15 +494,16 @@ class Learner(ABC):
                 range(self.cfg.solver.overfit_num_steps),
                 label='Overfitting') as bar:
             for step in bar:
-                loss = self.train_step(batch, step)['train_loss']
-                loss.backward()
-                self.opt.step()
+                with self.autocast():
+                    loss = self.train_step(batch, step)['train_loss']
+                self.backward(loss)
+                self.optimizer_step()
 
                 if (step + 1) % 25 == 0:
                     log.info('\nstep: {}'.format(step))
                     log.info('train_loss: {}'.format(loss))
 
-        torch.save(self.model.state_dict(), self.last_model_path)
+        self.save_checkpoint()
 
     def train(self):
         self.on_train_start()
@@ -456,7 +541,7 @@ class Learner(ABC):
             row = [metrics[k] for k in self.metric_names]
             log_writer.writerow(row)
 
-        torch.save(self.model.state_dict(), self.last_model_path)
+        self.save_checkpoint()
 
         if (curr_epoch + 1) % self.cfg.solver.sync_interval == 0:
             self.sync_to_cloud()
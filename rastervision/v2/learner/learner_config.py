@@ -24,9 +24,35 @@ class SolverConfig(Config):
     batch_sz: int = 32
     one_cycle: bool = True
     multi_stage: List = []
+    # Run forward passes under autocast, with a GradScaler when using float16.
+    amp: bool = False
+    # One of 'float16' or 'bfloat16'. Defaults to float16 on GPUs and bfloat16 on
+    # CPUs.
+    amp_dtype: str = None
+    channels_last: bool = False
+    # Number of batches whose gradients are accumulated for each optimizer step.
+    grad_accum_steps: int = 1
 
     def update(self, learner=None):
-        pass
+        if self.amp_dtype not in (None, 'float16', 'bfloat16'):
+            raise ValueError(
+                'amp_dtype must be float16 or bfloat16, got {}'.format(
+                    self.amp_dtype))
+        if self.amp or self.channels_last:
+            # Import here so that configs can be used without torch.
+            import torch
+            if self.amp and not hasattr(torch, 'autocast'):
+                raise ValueError(
+                    'amp requires torch 1.10 or later, but torch {} is '
+                    'installed'.format(torch.__version__))
+            if self.channels_last and not hasattr(torch, 'channels_last'):
+                raise ValueError(
+                    'channels_last requires torch 1.5 or later, but torch {} '
+                    'is installed'.format(torch.__version__))
+        if self.grad_accum_steps < 1:
+            raise ValueError(
+                'grad_accum_steps must be at least 1, got {}'.format(
+                    self.grad_accum_steps))
 
 
 @register_config('data')
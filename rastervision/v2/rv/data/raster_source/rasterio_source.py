@@ -5,6 +5,7 @@ import pyproj
 import subprocess
 from decimal import Decimal
 import tempfile
+from threading import Lock
 
 import numpy as np
 import rasterio
@@ -91,6 +92,7 @@ class RasterioSource(ActivateMixin, RasterSource):
         self.image_dataset = None
         self.x_shift = x_shift
         self.y_shift = y_shift
+        self.read_lock = None
 
         num_channels = None
 
@@ -150,16 +152,19 @@ class RasterioSource(ActivateMixin, RasterSource):
         if self.image_dataset is None:
             raise ActivationError('RasterSource must be activated before use')
         shifted_window = self._get_shifted_window(window)
-        return load_window(
-            self.image_dataset,
-            window=shifted_window.rasterio_format(),
-            is_masked=self.is_masked)
+        # Rasterio datasets can't be read from concurrently.
+        with self.read_lock:
+            return load_window(
+                self.image_dataset,
+                window=shifted_window.rasterio_format(),
+                is_masked=self.is_masked)
 
     def _activate(self):
         # Download images to temporary directory and delete it when done.
         self.image_tmp_dir = tempfile.TemporaryDirectory(dir=self.tmp_dir)
         self.imagery_path = self._download_data(self.image_tmp_dir.name)
         self.image_dataset = rasterio.open(self.imagery_path)
+        self.read_lock = Lock()
         self._set_crs_transformer()
 
     def _set_crs_transformer(self):
@@ -175,6 +180,7 @@ class RasterioSource(ActivateMixin, RasterSource):
     def _deactivate(self):
         self.image_dataset.close()
         self.image_dataset = None
+        self.read_lock = None
         self.image_tmp_dir.cleanup()
         self.image_tmp_dir = None
 
@@ -1,4 +1,6 @@
 import json
+import multiprocessing
+import random
 
 import numpy as np
 
@@ -51,12 +53,141 @@ def parallel_mean(mean_a, count_a, mean_b, count_b):
     return mean
 
 
+# State shared with the processes that compute stats. The processes are forked
+# so that the raster sources are inherited rather than pickled.
+_stats_worker_state = None
+
+
+class ChannelStats():
+    """Running count, mean and variance of the valid values in each channel.
+
+    Values that are 0 or NaN are NODATA and are not counted. Stats for different
+    parts of the data can be merged using parallel_mean and parallel_variance.
+    """
+
+    def __init__(self, nb_channels, histograms=False):
+        self.count = np.zeros((nb_channels, ))
+        self.mean = np.zeros((nb_channels, ))
+        self.var = np.zeros((nb_channels, ))
+        self.histograms = [
+            np.zeros((0, ), dtype=np.int64) for _ in range(nb_channels)
+        ] if histograms else None
+
+    def update(self, chip):
+        """Update the stats with the values in a chip.
+
+        Args:
+            chip: np.ndarray of shape [height, width, nb_channels]
+        """
+        chip = np.reshape(chip, (-1, chip.shape[2]))
+        if (self.histograms is not None
+                and not np.issubdtype(chip.dtype, np.unsignedinteger)):
+            raise ValueError(
+                'Histograms can only be computed for rasters with unsigned '
+                'integer values, got {}.'.format(chip.dtype))
+        valid = chip != 0
+        if np.issubdtype(chip.dtype, np.floating):
+            valid &= ~np.isnan(chip)
+        chip_count = np.sum(valid, axis=0)
+        if not np.any(chip_count):
+            return
+
+        chip = np.where(valid, chip, 0).astype(np.float64)
+        chip_sum = np.sum(chip, axis=0)
+        chip_sq_sum = np.sum(chip * chip, axis=0)
+
+        chip_stats = ChannelStats(len(chip_count))
+        chip_stats.count = chip_count.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chip_stats.mean = np.where(chip_count > 0, chip_sum / chip_count,
+                                       0.)
+            chip_stats.var = np.where(
+                chip_count > 1,
+                (chip_sq_sum - chip_sum * chip_stats.mean) / (chip_count - 1),
+                0.)
+        chip_stats.var = np.maximum(chip_stats.var, 0.)
+
+        if self.histograms is not None:
+            chip_stats.histograms = [
+                np.bincount(
+                    chip[valid[:, c], c].astype(np.int64), minlength=1)
+                for c in range(chip.shape[1])
+            ]
+        self.merge(chip_stats)
+
+    def merge(self, other):
+        """Merge stats computed over another part of the data into these stats."""
+        count = self.count + other.count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = parallel_variance(self.mean, self.count, self.var,
+                                    other.mean, other.count, other.var)
+            mean = parallel_mean(self.mean, self.count, other.mean,
+                                 other.count)
+        self.var = np.where(count > 1, var, 0.)
+        self.mean = np.where(count > 0, mean, 0.)
+        self.count = count
+
+        if self.histograms is not None and other.histograms is not None:
+            self.histograms = [
+                _add_histograms(h, other_h)
+                for h, other_h in zip(self.histograms, other.histograms)
+            ]
+
+
+def _add_histograms(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    a = a.copy()
+    a[:len(b)] += b
+    return a
+
+
+def _get_windows(extent, sample_prob, seed):
+    if sample_prob is None:
+        return extent.get_windows(chip_sz, chip_sz)
+    num_pixels = extent.get_width() * extent.get_height()
+    num_chips = round(sample_prob * (num_pixels / (chip_sz**2)))
+    num_chips = max(1, num_chips)
+    rng_state = random.getstate()
+    random.seed(seed)
+    try:
+        return [extent.make_random_square(chip_sz) for _ in range(num_chips)]
+    finally:
+        random.setstate(rng_state)
+
+
+def _compute_stats(raster_source, sample_prob, seed, nb_channels, histograms):
+    """Compute the stats for a raster source.
+
+    The raster source is activated once, and the windows are computed and read
+    during that activation, so a remote raster is only downloaded once.
+    """
+    stats = ChannelStats(nb_channels, histograms=histograms)
+    with raster_source.activate():
+        extent = raster_source.get_extent()
+        for window in _get_windows(extent, sample_prob, seed):
+            stats.update(raster_source.get_raw_chip(window))
+    return stats
+
+
+def _compute_stats_worker(job):
+    raster_sources, sample_prob, nb_channels, histograms = _stats_worker_state
+    source_ind, seed = job
+    return _compute_stats(raster_sources[source_ind], sample_prob, seed,
+                          nb_channels, histograms)
+
+
 class RasterStats():
     def __init__(self):
         self.means = None
         self.stds = None
+        self.histograms = None
 
-    def compute(self, raster_sources, sample_prob=None):
+    def compute(self,
+                raster_sources,
+                sample_prob=None,
+                num_workers=1,
+                histograms=False):
         """Compute the mean and stds over all the raster_sources.
 
         This ignores NODATA values.
@@ -68,78 +199,58 @@ class RasterStats():
         uniformly sampled from the scene with replacement. Otherwise, it uses a sliding
         window over the entire scene to compute stats.
 
+        The stats are accumulated in a single pass over the chips. If num_workers > 1,
+        the scenes are split between a pool of processes and the partial stats are
+        merged at the end. Each raster source is activated only once, so remote
+        scenes are only downloaded once.
+
         Args:
             raster_sources: list of RasterSource
             sample_prob: (float or None) between 0 and 1
+            num_workers: (int) number of processes to use, which is at most the
+                number of raster sources
+            histograms: (bool) if True, also compute a histogram of the integer
+                values in each channel, which is stored in self.histograms
         """
-        stride = chip_sz
+        global _stats_worker_state
+
         nb_channels = raster_sources[0].num_channels
+        # Seeds for sampling windows are drawn here so that the samples don't
+        # depend on which process computes the stats for a scene.
+        jobs = [(source_ind, random.getrandbits(32))
+                for source_ind in range(len(raster_sources))]
+
+        stats = ChannelStats(nb_channels, histograms=histograms)
+        num_workers = min(num_workers, len(jobs))
+        if num_workers > 1:
+            _stats_worker_state = (raster_sources, sample_prob, nb_channels,
+                                   histograms)
+            try:
+                ctx = multiprocessing.get_context('fork')
+                with ctx.Pool(num_workers) as pool:
+                    for job_stats in pool.imap_unordered(
+                            _compute_stats_worker, jobs):
+                        stats.merge(job_stats)
+            finally:
+                _stats_worker_state = None
+        else:
+            for source_ind, seed in jobs:
+                stats.merge(
+                    _compute_stats(raster_sources[source_ind], sample_prob,
+                                   seed, nb_channels, histograms))
 
-        def get_chip(raster_source, window):
-            """Return chip or None if all values are NODATA."""
-            chip = raster_source.get_raw_chip(window).astype(np.float32)
-            # Convert shape from [h,w,c] to [c,h*w]
-            chip = np.reshape(np.transpose(chip, [2, 0, 1]), (nb_channels, -1))
-
-            # Ignore NODATA values.
-            chip[chip == 0.0] = np.nan
-            if np.any(~np.isnan(chip)):
-                return chip
-            return None
-
-        def sliding_chip_stream():
-            """Get stream of chips using a sliding window of size 300."""
-            for raster_source in raster_sources:
-                with raster_source.activate():
-                    windows = raster_source.get_extent().get_windows(
-                        chip_sz, stride)
-                    for window in windows:
-                        chip = get_chip(raster_source, window)
-                        if chip is not None:
-                            yield chip
-
-        def random_chip_stream():
-            """Get random stream of chips."""
-            for raster_source in raster_sources:
-                with raster_source.activate():
-                    extent = raster_source.get_extent()
-                    num_pixels = extent.get_width() * extent.get_height()
-                    num_chips = round(
-                        sample_prob * (num_pixels / (chip_sz**2)))
-                    num_chips = max(1, num_chips)
-                    for _ in range(num_chips):
-                        window = raster_source.get_extent().make_random_square(
-                            chip_sz)
-                        chip = get_chip(raster_source, window)
-                        if chip is not None:
-                            yield chip
-
-        # For each chip, compute the mean and var of that chip and then update the
-        # running mean and var.
-        count = 0
-        mean = np.zeros((nb_channels, ))
-        var = np.zeros((nb_channels, ))
-        chip_stream = (sliding_chip_stream()
-                       if sample_prob is None else random_chip_stream())
-
-        for c in chip_stream:
-            chip_means = np.nanmean(c, axis=1)
-            chip_vars = np.nanvar(c, axis=1)
-            chip_count = np.sum(c[0] != np.nan)
-
-            var = parallel_variance(chip_means, chip_count, chip_vars, mean,
-                                    count, var)
-            mean = parallel_mean(chip_means, chip_count, mean, count)
-            count += chip_count
-
-        self.means = mean
-        self.stds = np.sqrt(var)
+        self.means = stats.mean
+        self.stds = np.sqrt(stats.var)
+        if histograms:
+            self.histograms = stats.histograms
 
     def save(self, stats_uri):
         # Ensure lists
         means = list(self.means)
         stds = list(self.stds)
         stats = {'means': means, 'stds': stds}
+        if self.histograms is not None:
+            stats['histograms'] = [h.tolist() for h in self.histograms]
         str_to_file(json.dumps(stats), stats_uri)
 
     @staticmethod
@@ -148,4 +259,6 @@ class RasterStats():
         stats = RasterStats()
         stats.means = stats_json['means']
         stats.stds = stats_json['stds']
+        if 'histograms' in stats_json:
+            stats.histograms = [np.array(h) for h in stats_json['histograms']]
         return stats
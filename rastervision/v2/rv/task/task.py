@@ -5,6 +5,7 @@ import numpy as np
 from rastervision.v2.core.pipeline import Pipeline
 from rastervision.v2.rv import TrainingData
 from rastervision.v2.rv.task import TRAIN, VALIDATION
+from rastervision.v2.rv.utils.misc import prefetch_map
 
 log = logging.getLogger(__name__)
 
@@ -136,9 +137,18 @@ class Task(Pipeline):
             labels += new_labels
             print('.' * len(predict_chips), end='', flush=True)
 
+        # Read chips on a pool of threads ahead of the batch that is being
+        # predicted, so that reading and inference overlap.
+        prefetch_sz = (self.config.predict_prefetch_batches *
+                       self.config.predict_batch_sz)
+        chips = prefetch_map(
+            raster_source.get_chip,
+            windows,
+            num_workers=self.config.predict_num_workers,
+            prefetch_sz=prefetch_sz)
+
         batch_chips, batch_windows = [], []
-        for window in windows:
-            chip = raster_source.get_chip(window)
+        for window, chip in zip(windows, chips):
             if np.any(chip):
                 batch_chips.append(chip)
                 batch_windows.append(window)
@@ -18,6 +18,10 @@ class TaskConfig(PipelineConfig):
     train_chip_sz: int = 200
     predict_chip_sz: int = 800
     predict_batch_sz: int = 8
+    # Number of threads used to read chips during prediction, and the number of
+    # batches of chips to read ahead of the batch being predicted.
+    predict_num_workers: int = 1
+    predict_prefetch_batches: int = 1
 
     analyze_uri: str = None
     chip_uri: str = None
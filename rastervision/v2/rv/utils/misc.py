@@ -1,5 +1,7 @@
 import io
 from math import ceil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image
 import numpy as np
@@ -155,3 +157,42 @@ def split_into_groups(lst, num_groups):
     group_sz = max(int(ceil((len(lst)) / num_groups)), 1)
 
     return grouped(lst, group_sz)
+
+
+def prefetch_map(fn, items, num_workers=1, prefetch_sz=1):
+    """Lazily map a function over items using a pool of threads.
+
+    Up to prefetch_sz calls to fn are run ahead of the item that is currently being
+    consumed, so that the work done by fn (eg. reading chips) overlaps with the work
+    done by the consumer (eg. running inference). The results are yielded in the
+    same order as items.
+
+    Args:
+        fn: function to apply to each item
+        items: iterable of items
+        num_workers: number of threads used to call fn. If 0, fn is called on the
+            current thread as each result is needed.
+        prefetch_sz: maximum number of results computed ahead of the consumer
+
+    Returns:
+        generator of fn(item) for each item in items
+    """
+    if num_workers == 0:
+        for item in items:
+            yield fn(item)
+        return
+
+    items = iter(items)
+    futures = deque()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        try:
+            for item in items:
+                futures.append(executor.submit(fn, item))
+                if len(futures) > prefetch_sz:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            # If the consumer stops early, don't run the remaining calls.
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,90 @@
+import os
+from os.path import join
+import unittest
+
+from rastervision.v2.core import _rv_config, system_init
+from rastervision.v2.core.config import register_config
+from rastervision.v2.core.filesystem import file_to_json, json_to_file
+from rastervision.v2.core.pipeline import Pipeline
+from rastervision.v2.core.pipeline_config import PipelineConfig
+from rastervision.v2.core.rv_config import RVConfig
+from rastervision.v2.core.runner import InProcessRunner
+
+
+class SplitPipeline(Pipeline):
+    commands = ['split', 'merge']
+    split_commands = ['split']
+    gpu_commands = []
+
+    def split(self, split_ind=0, num_splits=1):
+        value = _rv_config.get_subconfig('TEST')('value', default='')
+        json_to_file({
+            'split_ind': split_ind,
+            'pid': os.getpid(),
+            'value': value
+        }, join(self.config.root_uri, 'split-{}.json'.format(split_ind)))
+
+    def merge(self):
+        outputs = [
+            file_to_json(join(self.config.root_uri, file_name))
+            for file_name in sorted(os.listdir(self.config.root_uri))
+            if file_name.startswith('split-')
+        ]
+        json_to_file(outputs, join(self.config.root_uri, 'merged.json'))
+
+
+class GPUSplitPipeline(SplitPipeline):
+    gpu_commands = ['split']
+
+
+@register_config('test_split_pipeline')
+class SplitPipelineConfig(PipelineConfig):
+    use_gpu: bool = False
+
+    def build(self, tmp_dir):
+        if self.use_gpu:
+            return GPUSplitPipeline(self, tmp_dir)
+        return SplitPipeline(self, tmp_dir)
+
+
+class TestInProcessRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+        # The spawned workers only know about SplitPipelineConfig if they load this
+        # module as a plugin, so this also checks that overrides reach them.
+        system_init(config_overrides={
+            'PLUGINS_modules': __name__,
+            'TEST_value': 'override'
+        })
+
+    def tearDown(self):
+        system_init()
+        self.tmp_dir.cleanup()
+
+    def run_pipeline(self, runner, num_splits, use_gpu=False):
+        cfg = SplitPipelineConfig(root_uri=self.tmp_dir.name, use_gpu=use_gpu)
+        cfg_json_uri = join(self.tmp_dir.name, 'pipeline.json')
+        json_to_file(cfg.dict(), cfg_json_uri)
+        pipeline = cfg.build(self.tmp_dir.name)
+        runner.run(
+            cfg_json_uri, pipeline, pipeline.commands, num_splits=num_splits)
+        return file_to_json(join(self.tmp_dir.name, 'merged.json'))
+
+    def test_run_splits(self):
+        outputs = self.run_pipeline(InProcessRunner(num_workers=2), 3)
+        self.assertListEqual([o['split_ind'] for o in outputs], [0, 1, 2])
+        self.assertTrue(all(o['value'] == 'override' for o in outputs))
+        # The splits are run in the pool rather than in this process.
+        self.assertNotIn(os.getpid(), [o['pid'] for o in outputs])
+
+    def test_run_gpu_splits(self):
+        runner = InProcessRunner(num_workers=2)
+        self.assertEqual(runner.gpu_num_workers, 1)
+        outputs = self.run_pipeline(runner, 3, use_gpu=True)
+        self.assertListEqual([o['split_ind'] for o in outputs], [0, 1, 2])
+        # With one worker, the splits are run in this process.
+        self.assertListEqual([o['pid'] for o in outputs], [os.getpid()] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import math
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import torch
+from torch import nn
+from torch.nn import functional as F
+from torch.utils.data import DataLoader, TensorDataset
+
+from rastervision.v2.core import RVConfig
+from rastervision.v2.learner.learner import Learner
+from rastervision.v2.learner.learner_config import (LearnerConfig, ModelConfig,
+                                                    SolverConfig, DataConfig)
+
+
+class SimpleLearner(Learner):
+    def build_model(self):
+        return nn.Conv2d(3, 2, 1)
+
+    def build_data(self):
+        x = torch.randn(10, 3, 4, 4)
+        y = torch.randint(0, 2, (10, 4, 4))
+        self.train_ds = TensorDataset(x, y)
+        self.train_dl = DataLoader(self.train_ds, batch_size=3)
+        self.inf_loss_batches = []
+
+    def train_step(self, batch, batch_ind):
+        x, y = batch
+        out = self.model(x)
+        self.out_dtype = out.dtype
+        loss = F.cross_entropy(out.float(), y, reduction='sum')
+        if batch_ind in self.inf_loss_batches:
+            loss = loss * float('inf')
+        return {'train_loss': loss}
+
+    def validate_step(self, batch, batch_ind):
+        return self.train_step(batch, batch_ind)
+
+    def plot_xyz(self, ax, x, y, z=None):
+        pass
+
+
+class TestLearner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_learner(self, **solver_kwargs):
+        cfg = LearnerConfig(
+            model=ModelConfig(),
+            solver=SolverConfig(**solver_kwargs),
+            data=DataConfig(),
+            output_uri=self.tmp_dir.name)
+        cfg.update()
+        with patch('torch.cuda.is_available', return_value=False):
+            return SimpleLearner(cfg, self.tmp_dir.name)
+
+    def test_get_amp_dtype(self):
+        learner = self.make_learner(amp=True)
+        self.assertEqual(learner.get_amp_dtype(), torch.bfloat16)
+        learner.device = 'cuda'
+        self.assertEqual(learner.get_amp_dtype(), torch.float16)
+        learner.cfg.solver.amp_dtype = 'bfloat16'
+        self.assertEqual(learner.get_amp_dtype(), torch.bfloat16)
+
+    def test_train_epoch_amp_cpu(self):
+        learner = self.make_learner(amp=True, channels_last=True)
+        self.assertIsNone(learner.grad_scaler)
+        weight = learner.model.weight.detach().clone()
+        metrics = learner.train_epoch()
+
+        # The forward pass runs in bfloat16, but the weights stay in float32.
+        self.assertEqual(learner.out_dtype, torch.bfloat16)
+        self.assertEqual(learner.model.weight.dtype, torch.float32)
+        self.assertFalse(torch.equal(learner.model.weight, weight))
+        self.assertTrue(math.isfinite(metrics['train_loss']))
+
+    def test_train_epoch_without_amp(self):
+        # Without amp, the torch APIs that need newer versions are not used.
+        learner = self.make_learner()
+        self.assertIsNone(learner.grad_scaler)
+        with patch('torch.autocast', side_effect=AttributeError):
+            metrics = learner.train_epoch()
+        self.assertEqual(learner.out_dtype, torch.float32)
+        self.assertTrue(math.isfinite(metrics['train_loss']))
+
+    def test_old_torch(self):
+        old_torch = SimpleNamespace(__version__='1.2.0')
+        with patch.dict(sys.modules, {'torch': old_torch}):
+            SolverConfig().update()
+            with self.assertRaises(ValueError):
+                SolverConfig(amp=True).update()
+            with self.assertRaises(ValueError):
+                SolverConfig(channels_last=True).update()
+
+    def test_grad_accum_steps(self):
+        learner = self.make_learner(grad_accum_steps=3)
+        # There are 4 batches, so the last step only accumulates 1 batch.
+        self.assertEqual(len(learner.train_dl), 4)
+        self.assertEqual(learner.steps_per_epoch, 2)
+
+        learner.step_scheduler = Mock()
+        with patch.object(
+                learner.opt, 'step', wraps=learner.opt.step) as opt_step:
+            learner.train_epoch()
+        self.assertEqual(opt_step.call_count, learner.steps_per_epoch)
+        self.assertEqual(learner.step_scheduler.step.call_count,
+                         learner.steps_per_epoch)
+
+    def test_skipped_step(self):
+        learner = self.make_learner(amp=True)
+        learner.grad_scaler = torch.amp.GradScaler('cpu')
+        learner.step_scheduler = Mock()
+        learner.inf_loss_batches = [1]
+        learner.train_epoch()
+
+        # The step with overflowing gradients is skipped by the GradScaler, which
+        # decreases the scale, and the scheduler doesn't step for it.
+        self.assertLess(learner.grad_scaler.get_scale(), 2.0**16)
+        self.assertEqual(learner.step_scheduler.step.call_count,
+                         len(learner.train_dl) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
 import unittest
+from unittest.mock import Mock
+
+import numpy as np
 
 import rastervision as rv
+from rastervision.core import Box
+from rastervision.rv_config import RVConfig
 
 
 @unittest.skipIf(not rv.backend.pytorch_available, 'PyTorch is not available')
@@ -33,6 +39,83 @@ class TestPyTorchSemanticSegmentationConfig(unittest.TestCase):
         self.assertEqual(backend.train_opts.batch_size, batch_size)
         self.assertEqual(backend.train_opts.num_epochs, num_epochs)
 
+    def get_task(self, chip_size=4):
+        return rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                            .with_chip_size(chip_size) \
+                            .with_classes(['red', 'green']) \
+                            .build()
+
+    def test_chip_format(self):
+        backend = rv.BackendConfig.builder(rv.PYTORCH_SEMANTIC_SEGMENTATION) \
+            .with_task(self.get_task()) \
+            .with_train_options(chip_format='npy') \
+            .build()
+
+        msg = backend.to_proto()
+        backend = rv.BackendConfig.builder(rv.PYTORCH_SEMANTIC_SEGMENTATION) \
+            .from_proto(msg).build()
+        self.assertEqual(backend.train_opts.chip_format, 'npy')
+
+        with self.assertRaises(rv.ConfigError):
+            rv.BackendConfig.builder(rv.PYTORCH_SEMANTIC_SEGMENTATION) \
+              .with_task(self.get_task()) \
+              .with_train_options(chip_format='tif') \
+              .build()
+
+    def test_write_shards(self):
+        from rastervision.backend.torch_utils.semantic_segmentation.data import (
+            build_dataset)
+
+        task = self.get_task()
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            chip_uri = os.path.join(tmp_dir, 'chips')
+            backend = rv.BackendConfig.builder(
+                rv.PYTORCH_SEMANTIC_SEGMENTATION) \
+                .with_task(task) \
+                .with_train_options(chip_format='npy') \
+                .build() \
+                .create_backend(task)
+            backend.backend_opts.chip_uri = chip_uri
+
+            window = Box.make_square(0, 0, 4)
+            chips = np.random.randint(0, 256, (6, 4, 4, 3), dtype=np.uint8)
+            label_arrs = np.random.randint(0, 3, (6, 4, 4), dtype=np.uint8)
+
+            def make_data(inds):
+                labels = [
+                    Mock(get_label_arr=Mock(return_value=label_arrs[i]))
+                    for i in inds
+                ]
+                return [(chips[i], window, labels[j])
+                        for j, i in enumerate(inds)]
+
+            results = []
+            for scene_id, inds in [('a', [0, 1]), ('b', [2, 3, 4]), ('c',
+                                                                     [5])]:
+                scene_dir = backend.process_scene_data(
+                    Mock(id=scene_id),
+                    make_data(inds),
+                    os.path.join(tmp_dir, 'scenes'))
+                results.append(scene_dir)
+            backend.process_sceneset_results(results[0:2], results[2:],
+                                             tmp_dir)
+
+            # A pair of shards is written for each split.
+            shard_names = sorted('-'.join(name.split('-')[-2:])
+                                 for name in os.listdir(chip_uri))
+            self.assertListEqual(shard_names, [
+                'train-img.npy', 'train-labels.npy', 'valid-img.npy',
+                'valid-labels.npy'
+            ])
+
+            train_ds = build_dataset(chip_uri)
+            self.assertEqual(len(train_ds), 6)
+            xs, ys = zip(*[train_ds[i] for i in range(len(train_ds))])
+            # The order of the shards depends on their random names.
+            self.assertEqual(
+                sorted(x.tobytes() for x in xs),
+                sorted(chip.tobytes() for chip in chips))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import rastervision as rv
+
+if rv.backend.pytorch_available:
+    import torch
+    import torch.nn.functional as F
+    from rastervision.backend.torch_utils.batch_augment import BatchAugmentor
+    from rastervision.backend.torch_utils.object_detection.boxlist import (
+        BoxList)
+
+
+@unittest.skipIf(not rv.backend.pytorch_available, 'PyTorch is not available')
+class TestBatchAugmentor(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.x = torch.rand((8, 3, 10, 10)) * 0.9
+        # Each image has a box around a rectangle of ones, and masks are computed
+        # from the first channel, so they should stay in sync with the images.
+        self.x[:, :, 2:5, 1:7] = 1.0
+        self.masks = (self.x[:, 0] > 0.5).long()
+        self.boxlists = [
+            BoxList(
+                torch.tensor([[2., 1., 5., 7.]]), labels=torch.tensor([1]))
+            for _ in range(8)
+        ]
+
+    def augment(self, augmentors, **kwargs):
+        augmentor = BatchAugmentor(augmentors, prob=1.0, **kwargs)
+        return augmentor(self.x, masks=self.masks, boxlists=self.boxlists)
+
+    def assert_consistent(self, x, masks, boxlists):
+        self.assertEqual(x.shape, self.x.shape)
+        self.assertTrue(torch.equal(masks, (x[:, 0] > 0.5).long()))
+        for i, boxlist in enumerate(boxlists):
+            self.assertEqual(len(boxlist), 1)
+            self.assertEqual(boxlist.get_field('labels').tolist(), [1])
+            ymin, xmin, ymax, xmax = boxlist.boxes[0].long().tolist()
+            self.assertTrue((x[i, :, ymin:ymax, xmin:xmax] == 1.0).all())
+            self.assertEqual((x[i] == 1.0).sum(), 3 * 18)
+
+    def test_flips(self):
+        for augmentor in ['HorizontalFlip', 'VerticalFlip']:
+            x, masks, boxlists = self.augment([augmentor])
+            self.assertFalse(torch.equal(x, self.x))
+            self.assert_consistent(x, masks, boxlists)
+
+    def test_rotate90(self):
+        x, masks, boxlists = self.augment(['RandomRotate90'])
+        self.assertFalse(torch.equal(x, self.x))
+        self.assert_consistent(x, masks, boxlists)
+
+    def test_inputs_unchanged(self):
+        x = self.x.clone()
+        masks = self.masks.clone()
+        self.augment(['HorizontalFlip', 'RandomRotate90', 'ColorJitter'])
+        self.assertTrue(torch.equal(x, self.x))
+        self.assertTrue(torch.equal(masks, self.masks))
+
+    def test_resized_crop(self):
+        x, masks, boxlists = self.augment(['RandomResizedCrop'])
+        self.assertEqual(x.shape, self.x.shape)
+        self.assertEqual(masks.dtype, self.masks.dtype)
+        self.assertTrue(set(masks.unique().tolist()) <= {0, 1})
+        for boxlist in boxlists:
+            boxes = boxlist.boxes
+            self.assertTrue(((boxes >= 0) & (boxes <= 10)).all())
+
+        # Cropping the bottom right quarter drops the box in the top left corner.
+        augmentor = BatchAugmentor(
+            ['RandomResizedCrop'],
+            prob=1.0,
+            crop_scale=(0.25, 0.25),
+            crop_ratio=(1.0, 1.0))
+        boxes = torch.tensor([[0., 0., 2., 2.], [4., 4., 10., 10.]])
+        boxlists = [BoxList(boxes, labels=torch.tensor([1, 2]))]
+
+        def rand(num, device=None):
+            return torch.full((num, ), 0.999)
+
+        with mock.patch('torch.rand', rand):
+            _, _, boxlists = augmentor(
+                torch.zeros((1, 3, 10, 10)), boxlists=boxlists)
+        self.assertEqual(boxlists[0].get_field('labels').tolist(), [2])
+        torch.testing.assert_close(boxlists[0].boxes,
+                                   torch.tensor([[0., 0., 10., 10.]]))
+
+    def test_resized_crop_old_torch(self):
+        # Before torch 1.3, grids always aligned corners and there was no
+        # align_corners argument.
+        def affine_grid(theta, size):
+            return F.affine_grid(theta, size, align_corners=True)
+
+        def grid_sample(x, grid, mode):
+            return F.grid_sample(x, grid, mode=mode, align_corners=True)
+
+        torch.manual_seed(1)
+        x, masks, boxlists = self.augment(['RandomResizedCrop'])
+
+        old_F = SimpleNamespace(
+            affine_grid=affine_grid, grid_sample=grid_sample)
+        module = 'rastervision.backend.torch_utils.batch_augment'
+        with mock.patch(module + '.F', old_F), \
+                mock.patch(module + '._has_align_corners', False):
+            torch.manual_seed(1)
+            old_x, old_masks, old_boxlists = self.augment(
+                ['RandomResizedCrop'])
+
+        # The same crops are sampled.
+        torch.testing.assert_close(old_x, x)
+        self.assertTrue(torch.equal(old_masks, masks))
+        for old_boxlist, boxlist in zip(old_boxlists, boxlists):
+            torch.testing.assert_close(old_boxlist.boxes, boxlist.boxes)
+
+    def test_color_jitter(self):
+        x, masks, _ = self.augment(['ColorJitter'], jitter=0.5)
+        self.assertFalse(torch.equal(x, self.x))
+        self.assertTrue(((x >= 0) & (x <= 1)).all())
+        self.assertTrue(torch.equal(masks, self.masks))
+
+    def test_unknown_augmentor(self):
+        with self.assertLogs(
+                'rastervision.backend.torch_utils.batch_augment',
+                level='WARNING'):
+            augmentor = BatchAugmentor(['HorizontalFlip', 'Foo'])
+        self.assertEqual(augmentor.augmentors, ['HorizontalFlip'])
+
+    def test_no_augmentors(self):
+        x, masks, boxlists = BatchAugmentor([])(self.x, masks=self.masks)
+        self.assertIs(x, self.x)
+        self.assertIs(masks, self.masks)
+        self.assertIsNone(boxlists)
+
+
+if __name__ == '__main__':
+    unittest.main()
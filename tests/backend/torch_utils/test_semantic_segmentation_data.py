@@ -0,0 +1,86 @@
+import os
+import unittest
+
+import numpy as np
+from PIL import Image
+
+import rastervision as rv
+from rastervision.rv_config import RVConfig
+from rastervision.backend.torch_utils.shards import NpyShardWriter
+
+
+@unittest.skipIf(not rv.backend.pytorch_available, 'PyTorch is not available')
+class TestSemanticSegmentationData(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+        self.chips = np.random.randint(0, 256, (10, 4, 4, 3), dtype=np.uint8)
+        self.labels = np.random.randint(0, 3, (10, 4, 4), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_shards(self, data_dir):
+        os.makedirs(data_dir)
+        with NpyShardWriter(os.path.join(data_dir, 'a-img.npy')) as writer:
+            writer.write_all(self.chips)
+        with NpyShardWriter(os.path.join(data_dir, 'a-labels.npy')) as writer:
+            writer.write_all(self.labels)
+
+    def test_to_tensor(self):
+        import torch
+        from rastervision.backend.torch_utils.semantic_segmentation.data import (
+            ToTensor)
+
+        x, y = ToTensor()(Image.fromarray(self.chips[0]),
+                          Image.fromarray(self.labels[0]))
+        self.assertEqual(x.dtype, torch.uint8)
+        self.assertEqual(x.shape, (3, 4, 4))
+        self.assertEqual(y.dtype, torch.uint8)
+        np.testing.assert_array_equal(
+            x.permute(1, 2, 0).numpy(), self.chips[0])
+        np.testing.assert_array_equal(y.numpy(), self.labels[0])
+
+        # Arrays are not copied.
+        chip = self.chips[0]
+        x, y = ToTensor()(chip, self.labels[0])
+        self.assertTrue(np.shares_memory(x.numpy(), chip))
+
+    def test_prepare_batch(self):
+        import torch
+        from rastervision.backend.torch_utils.semantic_segmentation.train import (
+            prepare_batch)
+
+        x = torch.from_numpy(self.chips).permute(0, 3, 1, 2)
+        y = torch.from_numpy(self.labels)
+        x, y = prepare_batch(x, y, 'cpu')
+        self.assertEqual(x.dtype, torch.float32)
+        self.assertEqual(y.dtype, torch.int64)
+        np.testing.assert_allclose(
+            x.permute(0, 2, 3, 1).numpy(), self.chips / 255, rtol=1e-6)
+        np.testing.assert_array_equal(y.numpy(), self.labels)
+
+    def test_databunch_with_workers(self):
+        from rastervision.backend.torch_utils.semantic_segmentation.data import (
+            build_databunch)
+
+        chip_dir = self.tmp_dir.name
+        self.write_shards(os.path.join(chip_dir, 'train'))
+        self.write_shards(os.path.join(chip_dir, 'valid'))
+
+        databunch = build_databunch(
+            chip_dir, 4, 3, ['a', 'b', 'c'], [], num_workers=2)
+        xs, ys = zip(*databunch.valid_dl)
+        x = np.concatenate([x.numpy() for x in xs])
+        y = np.concatenate([y.numpy() for y in ys])
+        np.testing.assert_array_equal(x.transpose(0, 2, 3, 1), self.chips)
+        np.testing.assert_array_equal(y, self.labels)
+
+        # Writing to a sample doesn't change the shard file.
+        x, _ = databunch.valid_ds[0]
+        x[:] = 0
+        np.testing.assert_array_equal(
+            np.load(os.path.join(chip_dir, 'valid', 'a-img.npy')), self.chips)
+
+
+if __name__ == '__main__':
+    unittest.main()
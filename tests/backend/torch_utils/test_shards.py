@@ -0,0 +1,84 @@
+import os
+import unittest
+
+import numpy as np
+
+import rastervision as rv
+from rastervision.rv_config import RVConfig
+from rastervision.backend.torch_utils.shards import (NpyShardWriter,
+                                                     load_shard)
+
+
+class TestNpyShardWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write(self):
+        path = os.path.join(self.tmp_dir.name, 'shard.npy')
+        arrs = np.random.randint(0, 256, (600, 4, 5, 3), dtype=np.uint8)
+        with NpyShardWriter(path) as writer:
+            writer.write(arrs[0])
+            writer.write_all(arrs[1:], block_size=256)
+
+        shard = load_shard(path)
+        self.assertIsInstance(shard, np.memmap)
+        np.testing.assert_array_equal(shard, arrs)
+        np.testing.assert_array_equal(np.load(path), arrs)
+
+    def test_write_mismatch(self):
+        path = os.path.join(self.tmp_dir.name, 'shard.npy')
+        with NpyShardWriter(path) as writer:
+            writer.write(np.zeros((4, 4), dtype=np.uint8))
+            with self.assertRaises(ValueError):
+                writer.write(np.zeros((4, 5), dtype=np.uint8))
+            with self.assertRaises(ValueError):
+                writer.write(np.zeros((4, 4), dtype=np.float32))
+        self.assertEqual(len(load_shard(path)), 1)
+
+    def test_no_arrays(self):
+        path = os.path.join(self.tmp_dir.name, 'shard.npy')
+        with NpyShardWriter(path):
+            pass
+        self.assertFalse(os.path.exists(path))
+
+
+@unittest.skipIf(not rv.backend.pytorch_available, 'PyTorch is not available')
+class TestShardSegmentationDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_dataset(self):
+        from rastervision.backend.torch_utils.semantic_segmentation.data import (
+            build_dataset, ShardSegmentationDataset)
+
+        chips = np.random.randint(0, 256, (5, 4, 4, 3), dtype=np.uint8)
+        labels = np.random.randint(0, 3, (5, 4, 4), dtype=np.uint8)
+        for name, start, end in [('a', 0, 2), ('b', 2, 5)]:
+            with NpyShardWriter(
+                    os.path.join(self.tmp_dir.name,
+                                 '{}-img.npy'.format(name))) as writer:
+                writer.write_all(chips[start:end])
+            with NpyShardWriter(
+                    os.path.join(self.tmp_dir.name,
+                                 '{}-labels.npy'.format(name))) as writer:
+                writer.write_all(labels[start:end])
+
+        ds = build_dataset(self.tmp_dir.name)
+        self.assertIsInstance(ds, ShardSegmentationDataset)
+        self.assertEqual(len(ds), 5)
+        for ind in range(5):
+            x, y = ds[ind]
+            np.testing.assert_array_equal(x, chips[ind])
+            np.testing.assert_array_equal(y, labels[ind])
+        with self.assertRaises(IndexError):
+            ds[5]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import os
+from unittest.mock import Mock
 
 import numpy as np
 
@@ -17,7 +18,7 @@ class TestStatsAnalyzer(unittest.TestCase):
     def tearDown(self):
         self.temp_dir.cleanup()
 
-    def _test(self, is_random=False, is_backcompat=False):
+    def _test(self, is_random=False, is_backcompat=False, num_workers=1):
         stats_uri = os.path.join(self.temp_dir.name, 'stats.json')
         scenes = []
         raster_sources = []
@@ -34,6 +35,7 @@ class TestStatsAnalyzer(unittest.TestCase):
 
             imgs.append(img)
             rs.set_raster(img)
+            rs._activate = Mock()
             raster_sources.append(rs)
             scenes.append(Scene(str(i), rs))
 
@@ -44,7 +46,8 @@ class TestStatsAnalyzer(unittest.TestCase):
         exp_means = np.nanmean(channel_vals, axis=1)
         exp_stds = np.nanstd(channel_vals, axis=1)
 
-        analyzer_builder = rv.AnalyzerConfig.builder(rv.STATS_ANALYZER)
+        analyzer_builder = rv.AnalyzerConfig.builder(rv.STATS_ANALYZER) \
+                             .with_num_workers(num_workers)
         if is_random:
             analyzer_builder = analyzer_builder.with_sample_prob(sample_prob)
         analyzer_msg = analyzer_builder.with_stats_uri(stats_uri) \
@@ -61,7 +64,11 @@ class TestStatsAnalyzer(unittest.TestCase):
         stats = RasterStats.load(stats_uri)
         np.testing.assert_array_almost_equal(stats.means, exp_means, decimal=3)
         np.testing.assert_array_almost_equal(stats.stds, exp_stds, decimal=3)
-        if is_random:
+        if num_workers == 1:
+            # Each scene is only activated (ie. downloaded) once.
+            for rs in raster_sources:
+                self.assertEqual(rs._activate.call_count, 1)
+        if is_random and num_workers == 1:
             for rs in raster_sources:
                 width = rs.get_extent().get_width()
                 height = rs.get_extent().get_height()
@@ -78,6 +85,36 @@ class TestStatsAnalyzer(unittest.TestCase):
     def test_sliding_backcompat(self):
         self._test(is_random=False, is_backcompat=True)
 
+    def test_sliding_parallel(self):
+        self._test(is_random=False, num_workers=2)
+
+    def test_random_parallel(self):
+        self._test(is_random=True, num_workers=2)
+
+    def test_nodata_counts_per_channel(self):
+        img = np.ones((400, 400, 2), dtype=np.uint8)
+        img[:, :, 1] = 3
+        img[0:100, :, 1] = 5
+        # NODATA pixels in the first channel only.
+        img[200:, :, 0] = 0
+        rs = MockRasterSource([0, 1], 2)
+        rs.set_raster(img)
+
+        stats = RasterStats()
+        stats.compute([rs], histograms=True)
+
+        np.testing.assert_array_almost_equal(stats.means, [1, 3.5])
+        np.testing.assert_array_almost_equal(
+            stats.stds, [0, np.std(img[:, :, 1])], decimal=3)
+        np.testing.assert_array_equal(stats.histograms[0], [0, 80000])
+        np.testing.assert_array_equal(stats.histograms[1],
+                                      [0, 0, 0, 120000, 0, 40000])
+
+        stats_uri = os.path.join(self.temp_dir.name, 'stats.json')
+        stats.save(stats_uri)
+        stats = RasterStats.load(stats_uri)
+        np.testing.assert_array_equal(stats.histograms[0], [0, 80000])
+
 
 if __name__ == '__main__':
     unittest.main()
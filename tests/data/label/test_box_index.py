@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from rastervision.data.label.box_index import BoxIndex
+
+
+class TestBoxIndex(unittest.TestCase):
+    def brute_force_query(self, npboxes, npbox):
+        return np.nonzero((npboxes[:, 0] <= npbox[2])
+                          & (npboxes[:, 2] >= npbox[0])
+                          & (npboxes[:, 1] <= npbox[3])
+                          & (npboxes[:, 3] >= npbox[1]))[0]
+
+    def test_query(self):
+        np.random.seed(0)
+        num_boxes = 1000
+        mins = np.random.uniform(0, 1000, size=(num_boxes, 2))
+        sizes = np.random.uniform(1, 20, size=(num_boxes, 2))
+        # Add a few large boxes which are not stored in the grid.
+        sizes[0:5] = 500
+        npboxes = np.concatenate([mins, mins + sizes], axis=1)
+        box_index = BoxIndex(npboxes)
+        self.assertEqual(len(box_index.large_box_inds), 5)
+
+        queries = [
+            np.array([0, 0, 50, 50]),
+            np.array([100, 200, 400, 300]),
+            np.array([-100, -100, -50, -50]),
+            np.array([990, 990, 2000, 2000]), npboxes[10]
+        ]
+        for npbox in queries:
+            np.testing.assert_array_equal(
+                box_index.query(npbox), self.brute_force_query(npboxes, npbox))
+
+    def test_empty(self):
+        box_index = BoxIndex(np.empty((0, 4)))
+        self.assertEqual(len(box_index.query(np.array([0, 0, 10, 10]))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
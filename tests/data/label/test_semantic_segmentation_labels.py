@@ -44,6 +44,101 @@ class TestSemanticSegmentationLabels(unittest.TestCase):
             self.windows[1], clip_extent=clip_extent)
         np.testing.assert_array_equal(label_arr, exp_label_arr[:, 0:8])
 
+    def test_get_with_aoi_keeps_label_arr(self):
+        labels = SemanticSegmentationLabels()
+        labels.set_label_arr(self.windows[1], self.label_arr1.copy())
+        aoi_polygons = [Box.make_square(5, 15, 2).to_shapely()]
+        labels.filter_by_aoi(aoi_polygons).get_label_arr(self.windows[1])
+        np.testing.assert_array_equal(
+            labels.get_label_arr(self.windows[1]), self.label_arr1)
+
+    def test_set_label_arr(self):
+        labels = SemanticSegmentationLabels()
+        labels.set_label_arr(self.windows[0], self.label_arr0)
+        labels.set_label_arr(self.windows[1], self.label_arr1)
+        labels.set_label_arr(self.windows[0], self.label_arr1)
+        self.assertListEqual(labels.get_windows(), self.windows)
+        np.testing.assert_array_equal(
+            labels.get_label_arr(self.windows[0]), self.label_arr1)
+        # Class ids are stored as uint8.
+        self.assertEqual(
+            labels.label_arrs.get(self.windows[0]).dtype, np.uint8)
+        with self.assertRaises(ValueError):
+            labels.get_label_arr(Box.make_square(10, 10, 10))
+
+    def test_add(self):
+        labels0 = SemanticSegmentationLabels()
+        labels0.set_label_arr(self.windows[0], self.label_arr0)
+        labels1 = SemanticSegmentationLabels()
+        labels1.set_label_arr(self.windows[1], self.label_arr1)
+
+        labels = labels0 + labels1
+        self.assertListEqual(labels.get_windows(), self.windows)
+        self.assertListEqual(labels0.get_windows(), self.windows[0:1])
+
+        labels0 += labels1
+        self.assertListEqual(labels0.get_windows(), self.windows)
+        np.testing.assert_array_equal(
+            labels0.get_label_arr(self.windows[1]), self.label_arr1)
+        self.assertEqual(labels, labels0)
+
+        # Windows without label arrays use the label_fn.
+        labels = SemanticSegmentationLabels() + self.labels
+        np.testing.assert_array_equal(
+            labels.get_label_arr(self.windows[0]), self.label_arr0)
+
+    def test_spill_to_disk(self):
+        label_arrs = [
+            np.random.randint(0, 3, (10, 10), dtype=np.uint8) for _ in range(4)
+        ]
+        windows = [Box.make_square(0, 10 * i, 10) for i in range(4)]
+        max_memory = label_arrs[0].nbytes
+        labels0 = SemanticSegmentationLabels(max_memory=max_memory)
+        labels1 = SemanticSegmentationLabels(max_memory=max_memory)
+        for i, (window, label_arr) in enumerate(zip(windows, label_arrs)):
+            (labels0 if i < 2 else labels1).set_label_arr(window, label_arr)
+
+        self.assertEqual(labels0.label_arrs.memory_used, max_memory)
+        self.assertIsNotNone(labels0.label_arrs.spill_file)
+
+        labels0 += labels1
+        self.assertEqual(labels0.label_arrs.memory_used, max_memory)
+        del labels1
+        for window, label_arr in zip(windows, label_arrs):
+            np.testing.assert_array_equal(
+                labels0.get_label_arr(window), label_arr)
+
+    def test_scores(self):
+        score_arr = np.random.rand(10, 10, 3)
+        labels = SemanticSegmentationLabels()
+        self.assertFalse(labels.has_scores())
+        labels.set_label_arr(self.windows[0], self.label_arr0)
+        labels.set_score_arr(self.windows[0], score_arr)
+        self.assertTrue(labels.has_scores())
+        self.assertEqual(
+            labels.score_arrs.get(self.windows[0]).dtype, np.uint8)
+
+        # Scores are quantized to 256 levels.
+        np.testing.assert_allclose(
+            labels.get_score_arr(self.windows[0]), score_arr, atol=1 / 510)
+        clip_extent = Box(0, 0, 8, 10)
+        self.assertEqual(
+            labels.get_score_arr(self.windows[0], clip_extent).shape,
+            (8, 10, 3))
+        with self.assertRaises(ValueError):
+            labels.get_score_arr(self.windows[1])
+
+        labels = SemanticSegmentationLabels() + labels
+        np.testing.assert_allclose(
+            labels.get_score_arr(self.windows[0]), score_arr, atol=1 / 510)
+
+        labels = SemanticSegmentationLabels(
+            self.windows,
+            self.label_fn,
+            score_fn=lambda w: np.full((10, 10, 3), 255, dtype=np.uint8))
+        np.testing.assert_array_equal(
+            labels.get_score_arr(self.windows[1]), np.ones((10, 10, 3)))
+
 
 if __name__ == '__main__':
     unittest.main()
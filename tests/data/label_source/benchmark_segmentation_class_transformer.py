@@ -0,0 +1,40 @@
+"""Microbenchmark for SegmentationClassTransformer.
+
+Run with:
+    python -m tests.data.label_source.benchmark_segmentation_class_transformer
+"""
+import timeit
+
+import numpy as np
+
+from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.data.label_source.segmentation_class_transformer \
+    import SegmentationClassTransformer
+
+
+def main(window_size=1000, num_classes=10, number=10):
+    colors = [
+        'red', 'green', 'blue', 'yellow', 'orange', 'purple', 'white', 'pink',
+        'brown', 'gray'
+    ]
+    class_map = ClassMap([
+        ClassItem(id=i + 1, color=colors[i % len(colors)])
+        for i in range(num_classes)
+    ])
+    transformer = SegmentationClassTransformer(class_map)
+
+    class_labels = np.random.randint(
+        0, num_classes + 1, size=(window_size, window_size), dtype=np.uint8)
+    rgb_labels = transformer.class_to_rgb(class_labels)
+
+    for name, fn, arg in [('rgb_to_class', transformer.rgb_to_class,
+                           rgb_labels),
+                          ('class_to_rgb', transformer.class_to_rgb,
+                           class_labels)]:
+        secs = timeit.timeit(lambda: fn(arg), number=number) / number
+        print('{}: {:.1f} ms per {}x{} window'.format(
+            name, secs * 1000, window_size, window_size))
+
+
+if __name__ == '__main__':
+    main()
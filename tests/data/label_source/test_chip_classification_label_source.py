@@ -6,7 +6,7 @@ from shapely.strtree import STRtree
 
 import rastervision as rv
 from rastervision.rv_config import RVConfig
-from rastervision.data.label_source import (infer_cell)
+from rastervision.data.label_source import (infer_cell, infer_labels)
 from rastervision.core.box import Box
 from rastervision.core.class_map import ClassMap, ClassItem
 from rastervision.utils.files import json_to_file
@@ -185,6 +185,69 @@ class TestChipClassificationLabelSource(unittest.TestCase):
                               pick_min_class_id)
         self.assertEqual(class_id, self.class_id2)
 
+    def test_infer_labels(self):
+        # Polygons that are inside of a cell, cross the seams between cells, and
+        # overlap enough cells to be rasterized.
+        geojson = {
+            'type':
+            'FeatureCollection',
+            'features': [{
+                'geometry': {
+                    'type':
+                    'Polygon',
+                    'coordinates': [[[1., 1.], [1., 2.], [2., 2.], [2., 1.],
+                                     [1., 1.]]]
+                },
+                'properties': {
+                    'class_id': 2
+                }
+            }, {
+                'geometry': {
+                    'type':
+                    'Polygon',
+                    'coordinates': [[[3., 5.], [3., 11.], [8., 11.], [8., 5.],
+                                     [3., 5.]]]
+                },
+                'properties': {
+                    'class_id': 1
+                }
+            }, {
+                'geometry': {
+                    'type': 'Polygon',
+                    'coordinates': [[[2., 7.], [12., 21.], [23., 9.], [2.,
+                                                                       7.]]]
+                },
+                'properties': {
+                    'class_id': 3
+                }
+            }]
+        }
+        geoms = []
+        for f in geojson['features']:
+            g = shape(f['geometry'])
+            g.class_id = f['properties']['class_id']
+            geoms.append(g)
+        str_tree = STRtree(geoms)
+        extent = Box(0, 0, 22, 25)
+
+        for ioa_thresh in [0.0, 0.1, 0.5]:
+            for use_intersection_over_cell in [False, True]:
+                for pick_min_class_id in [False, True]:
+                    for background_class_id in [None, 0, 4]:
+                        args = (ioa_thresh, use_intersection_over_cell,
+                                pick_min_class_id, background_class_id)
+                        labels = infer_labels(geojson, extent, 3, *args)
+                        cells = extent.get_windows(3, 3)
+                        self.assertListEqual(labels.get_cells(), cells)
+                        for cell in cells:
+                            class_id = infer_cell(cell, str_tree, ioa_thresh,
+                                                  use_intersection_over_cell,
+                                                  background_class_id,
+                                                  pick_min_class_id)
+                            self.assertEqual(
+                                labels.get_cell_class_id(cell), class_id,
+                                (cell, args))
+
     def test_get_labels_inferred(self):
         extent = Box.make_square(0, 0, 8)
 
@@ -33,6 +33,23 @@ class TestSegmentationClassTransformer(unittest.TestCase):
         expected_rgb_image = self.rgb_image
         np.testing.assert_array_equal(rgb_image, expected_rgb_image)
 
+    def test_unknown_values(self):
+        rgb_image = np.zeros((2, 2, 3), dtype=np.uint8)
+        rgb_image[0, 0, :] = color_to_triple('red')
+        rgb_image[0, 1, :] = color_to_triple('white')
+        rgb_image[1, 0, :] = (255, 0, 1)
+        class_image = self.transformer.rgb_to_class(rgb_image)
+        np.testing.assert_array_equal(class_image, [[1, 0], [0, 0]])
+        self.assertEqual(class_image.dtype, np.uint8)
+
+        class_image = np.array([[0, 1], [3, 7]])
+        rgb_image = self.transformer.class_to_rgb(class_image)
+        expected_rgb_image = np.zeros((2, 2, 3), dtype=np.uint8)
+        expected_rgb_image[0, 1, :] = color_to_triple('red')
+        expected_rgb_image[1, 0, :] = color_to_triple('blue')
+        np.testing.assert_array_equal(rgb_image, expected_rgb_image)
+        self.assertEqual(rgb_image.dtype, np.uint8)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,274 @@
+import unittest
+import os
+import json
+
+from unittest.mock import patch
+
+import numpy as np
+import rasterio
+from rasterio.features import shapes
+from shapely.geometry import mapping, shape
+from shapely.ops import transform as transform_geom
+
+import rastervision as rv
+from rastervision.core.box import Box
+from rastervision.core.class_map import ClassMap
+from rastervision.data import (SemanticSegmentationRasterStore,
+                               SemanticSegmentationLabels,
+                               IdentityCRSTransformer)
+from rastervision.rv_config import RVConfig
+
+try:
+    import mask_to_polygons  # noqa
+    mask_to_polygons_available = True
+except ImportError:
+    mask_to_polygons_available = False
+
+
+class TestSemanticSegmentationRasterStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+        self.extent = Box.make_square(0, 0, 40)
+        self.label_arr = np.zeros((40, 40), dtype=np.uint8)
+        # A shape that crosses the seams of 16x16 windows, and a small square.
+        self.label_arr[4:30, 10:20] = 1
+        self.label_arr[10:20, 4:30] = 1
+        self.label_arr[34:38, 34:38] = 1
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_labels(self):
+        windows = self.extent.get_windows(20, 20)
+
+        def label_fn(window):
+            return self.label_arr[window.ymin:window.ymax, window.xmin:
+                                  window.xmax].copy()
+
+        return SemanticSegmentationLabels(windows, label_fn)
+
+    def save_vector_output(self, name, vector_window_size):
+        vector_uri = os.path.join(self.tmp_dir.name, name + '.json')
+        store = SemanticSegmentationRasterStore(
+            os.path.join(self.tmp_dir.name, name + '.tif'),
+            self.extent,
+            IdentityCRSTransformer(),
+            self.tmp_dir.name,
+            vector_output=[{
+                'denoise': 0,
+                'uri': vector_uri,
+                'mode': 'polygons',
+                'class_id': 1
+            }],
+            vector_window_size=vector_window_size)
+        store.save(self.get_labels())
+        with open(vector_uri) as f:
+            return [shape(f['geometry']) for f in json.load(f)['features']]
+
+    @unittest.skipIf(not mask_to_polygons_available,
+                     'mask_to_polygons is not available')
+    def test_windowed_vector_output(self):
+        polygons = self.save_vector_output('full', 0)
+        windowed_polygons = self.save_vector_output('windowed', 16)
+
+        self.assertEqual(len(windowed_polygons), len(polygons))
+        area = sum(p.area for p in polygons)
+        windowed_area = sum(p.area for p in windowed_polygons)
+        self.assertAlmostEqual(windowed_area, area, delta=area * 0.05)
+
+    def test_windowed_vector_output_seams(self):
+        # Vectorize polygons without mask_to_polygons, so that the polygons stitched
+        # together across the seams can be compared exactly.
+        def get_geojson(store, vo, class_mask, transform):
+            features = []
+            for geom, _ in shapes(class_mask, mask=class_mask.astype(bool)):
+                polygon = transform_geom(transform, shape(geom))
+                features.append({
+                    'type': 'Feature',
+                    'geometry': mapping(polygon),
+                    'properties': {}
+                })
+            return json.dumps({
+                'type': 'FeatureCollection',
+                'features': features
+            })
+
+        with patch.object(SemanticSegmentationRasterStore, '_get_geojson',
+                          get_geojson):
+            polygons = self.save_vector_output('full', 0)
+            windowed_polygons = self.save_vector_output('windowed', 16)
+
+        def sort_key(polygon):
+            return polygon.bounds
+
+        polygons = sorted(polygons, key=sort_key)
+        windowed_polygons = sorted(windowed_polygons, key=sort_key)
+        self.assertEqual(len(windowed_polygons), 2)
+        self.assertEqual(len(windowed_polygons), len(polygons))
+        for windowed_polygon, polygon in zip(windowed_polygons, polygons):
+            self.assertTrue(windowed_polygon.equals(polygon))
+
+    def save_raster(self, extent, label_arr, window_size, class_map=None):
+        uri = os.path.join(self.tmp_dir.name, 'labels.tif')
+        windows = extent.get_windows(window_size, window_size)
+
+        def label_fn(window):
+            return label_arr[window.ymin:window.ymax, window.xmin:
+                             window.xmax].copy()
+
+        store = SemanticSegmentationRasterStore(
+            uri,
+            extent,
+            IdentityCRSTransformer(),
+            self.tmp_dir.name,
+            class_map=class_map)
+        store.save(SemanticSegmentationLabels(windows, label_fn))
+        return uri
+
+    def read_labels(self, uri, extent, class_map=None):
+        store = SemanticSegmentationRasterStore(
+            uri,
+            extent,
+            IdentityCRSTransformer(),
+            self.tmp_dir.name,
+            class_map=class_map)
+        with store.activate():
+            labels = store.get_labels()
+            return labels.get_label_arr(extent)
+
+    def test_save_tiled(self):
+        # Windows that aren't aligned with the blocks of the GeoTIFF, and a scene
+        # that isn't a multiple of the window size.
+        extent = Box(0, 0, 700, 600)
+        label_arr = np.random.randint(0, 3, (700, 600), dtype=np.uint8)
+        uri = self.save_raster(extent, label_arr, 300)
+
+        with rasterio.open(uri) as dataset:
+            self.assertEqual(dataset.count, 1)
+            self.assertEqual(dataset.dtypes[0], 'uint8')
+            self.assertEqual((dataset.height, dataset.width), (700, 600))
+            self.assertTrue(dataset.profile['tiled'])
+            self.assertEqual(dataset.block_shapes[0], (256, 256))
+            self.assertEqual(dataset.compression.value, 'DEFLATE')
+            self.assertEqual(dataset.overviews(1), [2])
+            np.testing.assert_array_equal(dataset.read(1), label_arr)
+
+        np.testing.assert_array_equal(self.read_labels(uri, extent), label_arr)
+
+    def test_save_palette(self):
+        class_map = ClassMap.construct_from({
+            'a': (1, 'red'),
+            'b': (2, 'blue')
+        })
+        label_arr = np.random.randint(1, 3, (40, 40), dtype=np.uint8)
+        uri = self.save_raster(self.extent, label_arr, 20, class_map)
+
+        with rasterio.open(uri) as dataset:
+            self.assertEqual(dataset.count, 1)
+            colormap = dataset.colormap(1)
+            self.assertEqual(colormap[1][:3], (255, 0, 0))
+            self.assertEqual(colormap[2][:3], (0, 0, 255))
+            np.testing.assert_array_equal(dataset.read(1), label_arr)
+
+        np.testing.assert_array_equal(
+            self.read_labels(uri, self.extent, class_map), label_arr)
+
+    def test_get_labels_rgb(self):
+        # GeoTIFFs that were saved with RGB bands can still be read.
+        class_map = ClassMap.construct_from({
+            'a': (1, 'red'),
+            'b': (2, 'blue')
+        })
+        label_arr = np.random.randint(1, 3, (40, 40), dtype=np.uint8)
+        rgb_arr = np.zeros((3, 40, 40), dtype=np.uint8)
+        rgb_arr[0][label_arr == 1] = 255
+        rgb_arr[2][label_arr == 2] = 255
+        uri = os.path.join(self.tmp_dir.name, 'rgb.tif')
+        with rasterio.open(
+                uri,
+                'w',
+                driver='GTiff',
+                height=40,
+                width=40,
+                count=3,
+                dtype=np.uint8) as dataset:
+            dataset.write(rgb_arr)
+
+        np.testing.assert_array_equal(
+            self.read_labels(uri, self.extent, class_map), label_arr)
+
+    def test_score_output(self):
+        extent = Box(0, 0, 300, 280)
+        score_arr = np.random.rand(300, 280, 3)
+        labels = SemanticSegmentationLabels()
+        for window in extent.get_windows(200, 200):
+            label_arr = np.zeros(
+                (window.get_height(), window.get_width()), dtype=np.uint8)
+            labels.set_label_arr(window, label_arr)
+            labels.set_score_arr(
+                window,
+                score_arr[window.ymin:window.ymax, window.xmin:window.xmax])
+
+        uri = os.path.join(self.tmp_dir.name, 'labels.tif')
+        store = SemanticSegmentationRasterStore(
+            uri,
+            extent,
+            IdentityCRSTransformer(),
+            self.tmp_dir.name,
+            score_output=True)
+        store.save(labels)
+
+        score_uri = os.path.join(self.tmp_dir.name, 'labels-scores.tif')
+        with rasterio.open(score_uri) as dataset:
+            self.assertEqual(dataset.count, 3)
+            self.assertEqual(dataset.dtypes[0], 'uint8')
+            self.assertTrue(dataset.profile['tiled'])
+
+        store = SemanticSegmentationRasterStore(
+            uri,
+            extent,
+            IdentityCRSTransformer(),
+            self.tmp_dir.name,
+            score_output=True)
+        with store.activate():
+            labels = store.get_labels(chip_size=100)
+            self.assertTrue(labels.has_scores())
+            window = Box(100, 100, 200, 200)
+            np.testing.assert_allclose(
+                labels.get_score_arr(window),
+                score_arr[100:200, 100:200],
+                atol=1 / 510)
+
+    def test_score_output_from_proto(self):
+        config = rv.LabelStoreConfig.builder(rv.SEMANTIC_SEGMENTATION_RASTER) \
+                                    .with_uri('x.tif') \
+                                    .with_score_output(True) \
+                                    .build()
+        msg = config.to_proto()
+        config = rv.LabelStoreConfig.from_proto(msg)
+        self.assertTrue(config.score_output)
+
+    def test_vector_window_size_from_proto(self):
+        config = rv.LabelStoreConfig.builder(rv.SEMANTIC_SEGMENTATION_RASTER) \
+                                    .with_uri('x.tif') \
+                                    .with_vector_window_size(512) \
+                                    .build()
+        msg = config.to_proto()
+        config = rv.LabelStoreConfig.from_proto(msg)
+        self.assertEqual(config.vector_window_size, 512)
+
+    def test_vector_window_size_buildings(self):
+        builder = rv.LabelStoreConfig.builder(rv.SEMANTIC_SEGMENTATION_RASTER) \
+                                     .with_uri('x.tif') \
+                                     .with_vector_output([{
+                                         'mode': 'buildings',
+                                         'uri': 'x.json',
+                                         'class_id': 1
+                                     }])
+        builder.build()
+        with self.assertRaises(rv.ConfigError):
+            builder.with_vector_window_size(512).build()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from shapely.geometry import box
+
+from rastervision.data.label_store.utils import merge_touching_polygons
+
+
+class TestMergeTouchingPolygons(unittest.TestCase):
+    def test_merges_polygons_across_seams(self):
+        # An L-shape split over three windows, and a separate square.
+        polygons = [
+            box(0, 0, 10, 10),
+            box(10, 0, 15, 10),
+            box(0, 10, 5, 20),
+            box(30, 30, 35, 35)
+        ]
+        merged = merge_touching_polygons(polygons)
+
+        self.assertEqual(len(merged), 2)
+        areas = sorted([p.area for p in merged])
+        self.assertListEqual(areas, [25, 200])
+
+    def test_does_not_merge_corners(self):
+        polygons = [box(0, 0, 10, 10), box(10, 10, 20, 20)]
+        merged = merge_touching_polygons(polygons)
+        self.assertEqual(len(merged), 2)
+
+    def test_empty(self):
+        self.assertListEqual(merge_touching_polygons([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from rastervision.data.raster_source.block_cache import BlockCache
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = BlockCache(100)
+        block = np.ones((10, ), dtype=np.uint8)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', block)
+        np.testing.assert_equal(cache.get('a'), block)
+        self.assertEqual(cache.get_stats(), {
+            'hits': 1,
+            'misses': 1,
+            'blocks': 1,
+            'bytes': 10
+        })
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(30)
+        for key in ['a', 'b', 'c']:
+            cache.put(key, np.zeros((10, ), dtype=np.uint8))
+        # Make 'a' the most recently used block, so 'b' is evicted next.
+        cache.get('a')
+        cache.put('d', np.zeros((10, ), dtype=np.uint8))
+
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.num_bytes, 30)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertIsNotNone(cache.get('d'))
+
+    def test_skips_large_blocks(self):
+        cache = BlockCache(5)
+        cache.put('a', np.zeros((10, ), dtype=np.uint8))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.num_bytes, 0)
+
+    def test_clear(self):
+        cache = BlockCache(100)
+        cache.put('a', np.zeros((10, ), dtype=np.uint8))
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.num_bytes, 0)
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,11 +9,13 @@ import rastervision as rv
 from rastervision.core import (RasterStats)
 from rastervision.utils.misc import save_img
 from rastervision.data.raster_source import ChannelOrderError, RasterioSourceConfig
+from rastervision.data.raster_source.rasterio_source import get_vsi_path
 from rastervision.rv_config import RVConfig
 from rastervision.utils.files import make_dir
 from rastervision.protos.raster_source_pb2 import RasterSourceConfig as RasterSourceMsg
 
 from tests import data_file_path
+from tests.mock.http_server import RangeRequestServer
 
 
 class TestRasterioSource(unittest.TestCase):
@@ -78,6 +80,150 @@ class TestRasterioSource(unittest.TestCase):
                 expected_out_chip = np.zeros((height, width, nb_channels))
                 np.testing.assert_equal(out_chip, expected_out_chip)
 
+    def test_block_cache(self):
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            image_path = os.path.join(tmp_dir, 'temp.tif')
+            height = 100
+            width = 120
+            nb_channels = 3
+            with rasterio.open(
+                    image_path,
+                    'w',
+                    driver='GTiff',
+                    height=height,
+                    width=width,
+                    count=nb_channels,
+                    dtype=np.uint8,
+                    tiled=True,
+                    blockxsize=32,
+                    blockysize=32,
+                    nodata=1) as image_dataset:
+                im = np.random.randint(
+                    0, 256, (nb_channels, height, width)).astype(np.uint8)
+                image_dataset.write(im)
+
+            config = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                                          .with_uri(image_path) \
+                                          .build()
+            source = config.create_source(tmp_dir=tmp_dir)
+            cached_source = config.to_builder() \
+                                  .with_block_cache_size(1) \
+                                  .build() \
+                                  .create_source(tmp_dir=tmp_dir)
+            self.assertIsNone(source.get_block_cache_stats())
+
+            windows = rv.core.Box.make_square(-10, -10, 140).get_windows(
+                40, 20)
+            with source.activate():
+                expected_chips = [source.get_chip(w) for w in windows]
+            # Blocks may have been read when constructing the source.
+            init_misses = cached_source.get_block_cache_stats()['misses']
+            with cached_source.activate():
+                chips = [cached_source.get_chip(w) for w in windows]
+            for chip, expected_chip in zip(chips, expected_chips):
+                np.testing.assert_equal(chip, expected_chip)
+
+            stats = cached_source.get_block_cache_stats()
+            # Each of the 16 blocks is only decoded once.
+            self.assertEqual(stats['misses'] - init_misses, 16)
+            self.assertGreater(stats['hits'], 0)
+            self.assertEqual(stats['blocks'], 0)
+
+    def test_block_cache_size_from_proto(self):
+        msg = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                                   .with_uri('a.tif') \
+                                   .with_block_cache_size(64) \
+                                   .build() \
+                                   .to_proto()
+        config = rv.RasterSourceConfig.from_proto(msg)
+        self.assertEqual(config.block_cache_size_mb, 64)
+
+    def write_stream_image(self, image_path, tiled):
+        height = 512
+        width = 512
+        nb_channels = 3
+        with rasterio.open(
+                image_path,
+                'w',
+                driver='GTiff',
+                height=height,
+                width=width,
+                count=nb_channels,
+                dtype=np.uint8,
+                tiled=tiled,
+                blockxsize=64,
+                blockysize=64) as image_dataset:
+            im = np.random.randint(
+                0, 256, (nb_channels, height, width)).astype(np.uint8)
+            image_dataset.write(im)
+        return np.transpose(im, axes=[1, 2, 0])
+
+    def test_stream(self):
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            image_path = os.path.join(tmp_dir, 'tiled.tif')
+            im = self.write_stream_image(image_path, tiled=True)
+            file_size = os.path.getsize(image_path)
+
+            with RangeRequestServer(tmp_dir) as server:
+                source = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                                              .with_uri(server.get_url('tiled.tif')) \
+                                              .with_stream(readahead_kb=16) \
+                                              .build() \
+                                              .create_source(tmp_dir=tmp_dir)
+                with source.activate():
+                    self.assertTrue(
+                        source.imagery_path.startswith('/vsicurl/'))
+                    chip = source.get_raw_chip(
+                        rv.core.Box.make_square(100, 100, 50))
+                np.testing.assert_equal(chip, im[100:150, 100:150, :])
+
+                # Only a small part of the file is fetched with range requests.
+                num_bytes = sum(
+                    end - start + 1 for _, start, end in server.requests)
+                self.assertLess(num_bytes, file_size / 4)
+
+    def test_stream_not_tiled(self):
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            image_path = os.path.join(tmp_dir, 'striped.tif')
+            im = self.write_stream_image(image_path, tiled=False)
+
+            with RangeRequestServer(tmp_dir) as server:
+                source = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                                              .with_uri(server.get_url('striped.tif')) \
+                                              .with_stream() \
+                                              .build() \
+                                              .create_source(tmp_dir=tmp_dir)
+                with source.activate():
+                    # The file is downloaded since it can't be streamed.
+                    self.assertTrue(os.path.isfile(source.imagery_path))
+                    chip = source.get_raw_chip(
+                        rv.core.Box.make_square(100, 100, 50))
+                np.testing.assert_equal(chip, im[100:150, 100:150, :])
+
+    def test_stream_from_proto(self):
+        msg = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                                   .with_uri('s3://bucket/a.tif') \
+                                   .with_stream(cache_size_mb=32, readahead_kb=512) \
+                                   .build() \
+                                   .to_proto()
+        config = rv.RasterSourceConfig.from_proto(msg)
+        self.assertTrue(config.stream)
+        self.assertEqual(config.stream_cache_size_mb, 32)
+        self.assertEqual(config.stream_readahead_kb, 512)
+
+        # Streamed files are not downloaded when making a local config.
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            local_config = config.create_local(tmp_dir)
+        self.assertListEqual(local_config.uris, ['s3://bucket/a.tif'])
+
+    def test_get_vsi_path(self):
+        self.assertEqual(
+            get_vsi_path('s3://bucket/dir/a.tif'), '/vsis3/bucket/dir/a.tif')
+        self.assertEqual(
+            get_vsi_path('https://x.com/a.tif'),
+            '/vsicurl/https://x.com/a.tif')
+        self.assertIsNone(get_vsi_path('/tmp/a.tif'))
+
     def test_get_dtype(self):
         img_path = data_file_path('small-rgb-tile.tif')
         with RVConfig.get_tmp_dir() as tmp_dir:
@@ -2,7 +2,10 @@ import unittest
 
 import numpy as np
 
+import rastervision as rv
 from rastervision.evaluation import ObjectDetectionEvaluation
+from rastervision.evaluation.object_detection_evaluation import (
+    compute_metrics, compute_ap)
 from rastervision.core.class_map import ClassItem, ClassMap
 from rastervision.core.box import Box
 from rastervision.data.label import ObjectDetectionLabels
@@ -110,6 +113,95 @@ class TestObjectDetectionEvaluation(unittest.TestCase):
         self.assertEqual(avg_item.recall, None)
         self.assertEqual(avg_item.f1, None)
 
+    def test_compute_ap(self):
+        eval = ObjectDetectionEvaluation(self.make_class_map())
+        eval.compute(self.make_ground_truth_labels(),
+                     self.make_predicted_labels())
+        self.assertAlmostEqual(eval.class_to_eval_item[1].ap, 1.0)
+        self.assertAlmostEqual(eval.class_to_eval_item[2].ap, 0.5)
+        self.assertAlmostEqual(eval.avg_item.ap, 0.75)
+
+    def test_compute_multiple_thresholds(self):
+        # The offset predictions have an IoU of 0.9 / 1.1 ~= 0.82.
+        gt_labels = self.make_ground_truth_labels()
+        pred_labels = self.make_predicted_labels()
+        tp, fp, fn, ap = compute_metrics(
+            gt_labels, pred_labels, 2, iou_threshs=[0.5, 0.9])
+        np.testing.assert_array_equal(tp, [[2, 1], [0, 0]])
+        np.testing.assert_array_equal(fp, [[0, 0], [2, 1]])
+        np.testing.assert_array_equal(fn, [[0, 1], [2, 2]])
+        self.assertListEqual(ap[1], [0., 0.])
+
+        eval = ObjectDetectionEvaluation(
+            self.make_class_map(), iou_threshs=[0.5, 0.9])
+        eval.compute(gt_labels, pred_labels)
+        self.assertEqual(eval.class_to_eval_item[1].recall, 1.0)
+        self.assertAlmostEqual(eval.class_to_eval_item[1].ap, 0.5)
+
+    def test_matching_is_by_score(self):
+        gt = Box.make_square(0, 0, 100)
+        npboxes = Box.to_npboxes([gt])
+        gt_labels = ObjectDetectionLabels(npboxes, np.array([1]))
+
+        # The best localized prediction has a lower score, so the other
+        # prediction is matched first and it becomes a false positive.
+        pred_npboxes = Box.to_npboxes(
+            [Box.make_square(0, 0, 100),
+             Box.make_square(10, 10, 100)])
+        pred_labels = ObjectDetectionLabels(
+            pred_npboxes, np.array([1, 1]), scores=np.array([0.5, 0.9]))
+        tp, fp, fn, ap = compute_metrics(gt_labels, pred_labels, 1)
+        np.testing.assert_array_equal(tp, [[1]])
+        np.testing.assert_array_equal(fp, [[1]])
+        np.testing.assert_array_equal(fn, [[0]])
+        self.assertAlmostEqual(ap[0][0], 1.0)
+
+    def test_matching_many_boxes(self):
+        # A grid of boxes that spans several blocks of predictions, with every
+        # other prediction shifted off of its ground truth box.
+        boxes = [
+            Box.make_square(row * 20, col * 20, 10) for row in range(50)
+            for col in range(50)
+        ]
+        npboxes = Box.to_npboxes(boxes)
+        class_ids = np.ones((len(boxes), ))
+        gt_labels = ObjectDetectionLabels(npboxes, class_ids)
+
+        pred_npboxes = npboxes.copy()
+        pred_npboxes[::2] += 8
+        pred_labels = ObjectDetectionLabels(pred_npboxes, class_ids)
+        tp, fp, fn, _ = compute_metrics(gt_labels, pred_labels, 1)
+        np.testing.assert_array_equal(tp, [[len(boxes) / 2]])
+        np.testing.assert_array_equal(fp, [[len(boxes) / 2]])
+        np.testing.assert_array_equal(fn, [[len(boxes) / 2]])
+
+    def test_compute_ap_fn(self):
+        is_tp = np.array([True, False, True, False])
+        scores = np.array([0.9, 0.8, 0.7, 0.6])
+        # Precision is 1 at recall 1/3 and 2/3 at recall 2/3.
+        self.assertAlmostEqual(compute_ap(is_tp, scores, 3), 1 / 3 + 2 / 9)
+        self.assertEqual(compute_ap(is_tp, scores, 0), None)
+        self.assertEqual(
+            compute_ap(np.empty((0, ), dtype=bool), np.empty((0, )), 3), 0.)
+
+    def test_evaluator_config(self):
+        config = rv.EvaluatorConfig.builder(rv.OBJECT_DETECTION_EVALUATOR) \
+                                   .with_class_map(self.make_class_map()) \
+                                   .with_output_uri('/tmp/eval.json') \
+                                   .with_iou_thresholds([0.5, 0.75]) \
+                                   .build()
+        msg = config.to_proto()
+        config = rv.EvaluatorConfig.from_proto(msg)
+        self.assertListEqual(config.iou_thresholds, [0.5, 0.75])
+        self.assertListEqual(config.create_evaluator().iou_thresholds,
+                             [0.5, 0.75])
+
+        with self.assertRaises(rv.ConfigError):
+            rv.EvaluatorConfig.builder(rv.OBJECT_DETECTION_EVALUATOR) \
+                              .with_class_map(self.make_class_map()) \
+                              .with_iou_thresholds([1.5]) \
+                              .build()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,6 +3,7 @@ import unittest
 import rastervision as rv
 
 from tests import data_file_path
+import tests.mock as mk
 
 
 @unittest.skipIf(not rv.backend.tf_available, 'TF is not available')
@@ -245,5 +246,44 @@ class TestExperimentConfig(unittest.TestCase):
                                .build()
 
 
+class TestExperimentConfigScores(mk.MockMixin, unittest.TestCase):
+    def get_exp_builder(self, task, predicts_scores, score_output=False):
+        backend = rv.BackendConfig.builder(mk.MOCK_BACKEND).build()
+        backend.mock.predicts_scores.return_value = predicts_scores
+        raster_source = rv.RasterSourceConfig.builder(mk.MOCK_SOURCE).build()
+        label_store = rv.LabelStoreConfig.builder(
+            rv.SEMANTIC_SEGMENTATION_RASTER) \
+            .with_score_output(score_output) \
+            .build()
+        scene = rv.SceneConfig.builder() \
+                              .with_id('test') \
+                              .with_raster_source(raster_source) \
+                              .with_label_store(label_store) \
+                              .build()
+        dataset = rv.DatasetConfig.builder() \
+                                  .with_test_scene(scene) \
+                                  .build()
+        return rv.ExperimentConfig.builder() \
+                                  .with_id('test') \
+                                  .with_root_uri('/some/dummy/root') \
+                                  .with_task(task) \
+                                  .with_backend(backend) \
+                                  .with_dataset(dataset)
+
+    def test_scores_require_backend_support(self):
+        task = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                            .with_classes(['a', 'b']) \
+                            .build()
+        stride_task = task.to_builder().with_predict_stride(150).build()
+
+        self.get_exp_builder(task, False).build()
+        self.get_exp_builder(stride_task, True).build()
+        self.get_exp_builder(task, True, score_output=True).build()
+        with self.assertRaises(rv.ConfigError):
+            self.get_exp_builder(stride_task, False).build()
+        with self.assertRaises(rv.ConfigError):
+            self.get_exp_builder(task, False, score_output=True).build()
+
+
 if __name__ == '__main__':
     unittest.main()
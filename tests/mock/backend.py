@@ -38,6 +38,9 @@ class MockBackend(Backend):
         else:
             return result
 
+    def predict_scores(self, chips, windows, tmp_dir):
+        return self.mock.predict_scores(chips, windows, tmp_dir)
+
 
 class MockBackendConfig(SupressDeepCopyMixin, BackendConfig):
     def __init__(self):
@@ -49,6 +52,10 @@ class MockBackendConfig(SupressDeepCopyMixin, BackendConfig):
         self.mock.update_for_command.return_value = None
         self.mock.save_bundle_files.return_value = (self, [])
         self.mock.load_bundle_files.return_value = self
+        self.mock.predicts_scores.return_value = True
+
+    def predicts_scores(self):
+        return self.mock.predicts_scores()
 
     def to_proto(self):
         result = self.mock.to_proto()
@@ -0,0 +1,82 @@
+import os
+import re
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from a directory and supports single byte range requests.
+
+    This stands in for servers like S3 that cloud-optimized GeoTIFFs are streamed
+    from. The path and range of each GET request are recorded in the server's
+    requests list.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        file_size = os.path.getsize(path)
+        start, end = 0, file_size - 1
+        range_header = self.headers.get('Range')
+        match = re.match(r'bytes=(\d+)-(\d*)$', range_header or '')
+        if match:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), file_size - 1)
+            if start >= file_size:
+                self.send_error(416)
+                return
+        self.server.requests.append((self.path, start, end))
+
+        if match:
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                start, end, file_size))
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+
+        with open(path, 'rb') as f:
+            f.seek(start)
+            self.wfile.write(f.read(end - start + 1))
+
+
+class RangeRequestServer():
+    """A local HTTP server that supports range requests, run in a thread.
+
+    Use as a context manager, which returns the server. The URL of a file in
+    root_dir is given by get_url.
+    """
+
+    def __init__(self, root_dir):
+        handler = partial(RangeRequestHandler, directory=root_dir)
+        self.server = HTTPServer(('127.0.0.1', 0), handler)
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def get_url(self, file_name):
+        host, port = self.server.server_address
+        return 'http://{}:{}/{}'.format(host, port, file_name)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
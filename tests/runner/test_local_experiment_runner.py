@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import unittest
+
+from rastervision.rv_config import RVConfig
+from rastervision.runner.local_experiment_runner import (LocalJob,
+                                                         LocalJobScheduler)
+
+
+def python_command(code):
+    return '{} -c "{}"'.format(sys.executable, code)
+
+
+class TestLocalJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_runs_in_dependency_order(self):
+        path = os.path.join(self.tmp_dir.name, 'output.txt')
+        write = python_command("open('{}', 'w').write('x')".format(path))
+        check = python_command(
+            "import os, sys; print('checking'); "
+            "sys.exit(0 if os.path.exists('{}') else 1)".format(path))
+        jobs = [
+            LocalJob(0, 'write', write, [], False),
+            LocalJob(1, 'check', check, [0], False),
+        ]
+        log_dir = os.path.join(self.tmp_dir.name, 'logs')
+        scheduler = LocalJobScheduler(cpu_slots=4, log_dir=log_dir)
+
+        self.assertDictEqual(scheduler.run(jobs), {0: 0, 1: 0})
+        with open(scheduler.get_log_path(jobs[1])) as log_file:
+            self.assertEqual(log_file.read(), 'checking\n')
+
+    def test_respects_slots(self):
+        # Each job fails if another job is running at the same time.
+        lock_path = os.path.join(self.tmp_dir.name, 'lock')
+        command = python_command(
+            "import os, time; fd = os.open('{0}', os.O_CREAT | os.O_EXCL); "
+            "time.sleep(0.2); os.close(fd); os.remove('{0}')".format(
+                lock_path))
+        jobs = [LocalJob(i, str(i), command, [], i % 2 == 0) for i in range(4)]
+        cpu_jobs = [job for job in jobs if not job.utilizes_gpu]
+        gpu_jobs = [job for job in jobs if job.utilizes_gpu]
+
+        scheduler = LocalJobScheduler(cpu_slots=1)
+        self.assertDictEqual(scheduler.run(cpu_jobs), {1: 0, 3: 0})
+
+        # GPU jobs run one at a time by default, even without any GPU slots
+        # (like on a machine without a GPU) and with free CPU slots.
+        scheduler = LocalJobScheduler(cpu_slots=4, gpu_slots=0)
+        self.assertDictEqual(scheduler.run(gpu_jobs), {0: 0, 2: 0})
+
+        # A CPU job and a GPU job can run at the same time.
+        scheduler = LocalJobScheduler(cpu_slots=1, gpu_slots=1)
+        exit_codes = scheduler.run(jobs)
+        self.assertTrue(any(code != 0 for code in exit_codes.values()))
+
+    def test_continue_after_failure(self):
+        jobs = [
+            LocalJob(0, 'fail', python_command('import sys; sys.exit(3)'), [],
+                     False),
+            LocalJob(1, 'downstream', python_command('pass'), [0], False),
+            LocalJob(2, 'independent', python_command('pass'), [], False),
+        ]
+        scheduler = LocalJobScheduler(cpu_slots=1, fail_fast=False)
+        self.assertDictEqual(scheduler.run(jobs), {0: 3, 1: None, 2: 0})
+        self.assertEqual(scheduler.first_failed_id, 0)
+
+    def test_fail_fast(self):
+        jobs = [
+            LocalJob(0, 'fail', python_command('import sys; sys.exit(3)'), [],
+                     False),
+            LocalJob(1, 'slow', python_command('import time; time.sleep(30)'),
+                     [], False),
+            LocalJob(2, 'downstream', python_command('pass'), [1], False),
+        ]
+        scheduler = LocalJobScheduler(cpu_slots=2, fail_fast=True)
+
+        start = time.time()
+        exit_codes = scheduler.run(jobs)
+        self.assertLess(time.time() - start, 10)
+        self.assertEqual(exit_codes[0], 3)
+        self.assertNotEqual(exit_codes[1], 0)
+        self.assertIsNone(exit_codes[2])
+        # The terminated job is not reported as the failure.
+        self.assertEqual(scheduler.first_failed_id, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
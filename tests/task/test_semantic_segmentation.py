@@ -0,0 +1,226 @@
+import unittest
+from unittest.mock import Mock, patch
+import os
+
+import numpy as np
+
+import rastervision as rv
+from rastervision.core.box import Box
+from rastervision.data import (SemanticSegmentationLabels,
+                               SemanticSegmentationRasterStore,
+                               IdentityCRSTransformer)
+from rastervision.rv_config import RVConfig
+from rastervision.task.semantic_segmentation import (
+    get_blend_weights, get_sliding_positions, get_predict_label_memory)
+
+from tests.mock.backend import MockBackend
+from tests.mock.raster_source import MockRasterSource
+
+
+class TestSemanticSegmentation(unittest.TestCase):
+    def test_predict_scene_batches_windows(self):
+        raster = np.ones((10, 10, 3), dtype=np.uint8)
+        raster[0:2, 0:2, :] = 0
+        raster_source = MockRasterSource([0, 1, 2], 3)
+        raster_source.set_raster(raster)
+        scene = Mock(raster_source=raster_source)
+
+        def predict(chips, windows, tmp_dir):
+            self.assertEqual(len(chips), len(windows))
+
+            def label_fn(window):
+                return np.full(
+                    (window.get_height(), window.get_width()),
+                    2,
+                    dtype=np.uint8)
+
+            return SemanticSegmentationLabels(windows, label_fn)
+
+        backend = MockBackend()
+        backend.mock.predict.side_effect = predict
+
+        task_config = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                                   .with_classes(['one', 'two']) \
+                                   .with_predict_chip_size(5) \
+                                   .with_predict_batch_size(3) \
+                                   .build()
+        task = task_config.create_task(backend)
+
+        with raster_source.activate():
+            labels = task.predict_scene(scene, '/tmp')
+            label_arrs = [
+                labels.get_label_arr(window)
+                for window in labels.get_windows()
+            ]
+
+        # 4 windows are predicted in two batches.
+        self.assertEqual(len(label_arrs), 4)
+        self.assertEqual(backend.mock.predict.call_count, 2)
+        batch_sizes = [
+            len(call[0][1]) for call in backend.mock.predict.call_args_list
+        ]
+        self.assertListEqual(batch_sizes, [3, 1])
+
+        # NODATA pixels are predicted as 0.
+        expected = np.full((5, 5), 2, dtype=np.uint8)
+        expected[0:2, 0:2] = 0
+        np.testing.assert_array_equal(label_arrs[0], expected)
+        for label_arr in label_arrs[1:]:
+            np.testing.assert_array_equal(label_arr, np.full((5, 5), 2))
+
+    def test_predict_scene_blends_overlapping_windows(self):
+        raster = np.ones((10, 10, 3), dtype=np.uint8)
+        raster[8:10, 0:2, :] = 0
+        raster_source = MockRasterSource([0, 1, 2], 3)
+        raster_source.set_raster(raster)
+        scene = Mock(raster_source=raster_source)
+
+        def predict_scores(chips, windows, tmp_dir):
+            # Windows on the left predict class 1 with low confidence, and
+            # windows on the right predict class 2 with high confidence.
+            scores = np.zeros((len(windows), 6, 6, 3), dtype=np.float32)
+            for i, window in enumerate(windows):
+                if window.xmin == 0:
+                    scores[i, :, :, 1:] = [0.6, 0.4]
+                else:
+                    scores[i, :, :, 1:] = [0.1, 0.9]
+            return scores
+
+        backend = MockBackend()
+        backend.mock.predict_scores.side_effect = predict_scores
+
+        task_config = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                                   .with_classes(['one', 'two']) \
+                                   .with_predict_chip_size(6) \
+                                   .with_predict_stride(4) \
+                                   .with_predict_batch_size(3) \
+                                   .build()
+        task = task_config.create_task(backend)
+
+        with raster_source.activate():
+            labels = task.predict_scene(scene, '/tmp')
+
+        predict_windows = [
+            w for call in backend.mock.predict_scores.call_args_list
+            for w in call[0][1]
+        ]
+        self.assertListEqual(predict_windows, [
+            Box(0, 0, 6, 6),
+            Box(0, 4, 6, 10),
+            Box(4, 0, 10, 6),
+            Box(4, 4, 10, 10)
+        ])
+
+        # Labels are computed for bands of rows between the window tops.
+        self.assertListEqual(labels.get_windows(), [
+            Box(0, 0, 4, 6),
+            Box(0, 6, 4, 10),
+            Box(4, 0, 10, 6),
+            Box(4, 6, 10, 10)
+        ])
+        label_arr = np.zeros((10, 10), dtype=np.uint8)
+        for window in labels.get_windows():
+            label_arr[window.ymin:window.ymax, window.xmin:window.xmax] = \
+                labels.get_label_arr(window)
+
+        # In the overlap, the weights of the left windows are higher in column 4
+        # and lower in column 5.
+        expected = np.full((10, 10), 2, dtype=np.uint8)
+        expected[:, 0:5] = 1
+        expected[8:10, 0:2] = 0
+        np.testing.assert_array_equal(label_arr, expected)
+
+    def test_predict_scene_with_score_output(self):
+        raster = np.ones((10, 10, 3), dtype=np.uint8)
+        raster[0:2, 0:2, :] = 0
+        raster_source = MockRasterSource([0, 1, 2], 3)
+        raster_source.set_raster(raster)
+        extent = raster_source.get_extent()
+
+        def predict_scores(chips, windows, tmp_dir):
+            scores = np.random.rand(*chips.shape[0:3], 3)
+            return scores / scores.sum(axis=3, keepdims=True)
+
+        backend = MockBackend()
+        backend.mock.predict_scores.side_effect = predict_scores
+
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            label_store = SemanticSegmentationRasterStore(
+                os.path.join(tmp_dir, 'labels.tif'),
+                extent,
+                IdentityCRSTransformer(),
+                tmp_dir,
+                score_output=True)
+            scene = Mock(
+                raster_source=raster_source,
+                prediction_label_store=label_store)
+
+            for chip_size, predict_stride in [(5, None), (6, 4)]:
+                task_config = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                                           .with_classes(['one', 'two']) \
+                                           .with_predict_chip_size(chip_size) \
+                                           .with_predict_stride(predict_stride) \
+                                           .build()
+                task = task_config.create_task(backend)
+
+                with raster_source.activate():
+                    labels = task.predict_scene(scene, tmp_dir)
+
+                self.assertTrue(labels.has_scores())
+                for window in labels.get_windows():
+                    label_arr = labels.get_label_arr(window, extent)
+                    score_arr = labels.get_score_arr(window, extent)
+                    self.assertEqual(score_arr.shape, label_arr.shape + (3, ))
+                    np.testing.assert_allclose(
+                        score_arr.sum(axis=2), 1, atol=0.01)
+                    nodata = np.sum(
+                        raster[window.ymin:window.ymax, window.xmin:
+                               window.xmax],
+                        axis=2) == 0
+                    # The predicted class has the highest score, up to the
+                    # quantization of the scores.
+                    label_scores = np.take_along_axis(
+                        score_arr, label_arr[:, :, np.newaxis],
+                        axis=2)[:, :, 0]
+                    self.assertTrue(
+                        np.all(label_scores[~nodata] >= score_arr.max(
+                            axis=2)[~nodata] - 1 / 255 - 1e-6))
+
+    def test_get_predict_label_memory(self):
+        module = 'rastervision.task.semantic_segmentation'
+        rv_config = RVConfig.get_instance()
+
+        def subconfig(key, default=''):
+            return default
+
+        with patch.object(rv_config, 'get_subconfig', return_value=subconfig):
+            # Defaults to a quarter of the available memory.
+            with patch(
+                    module + '.get_available_memory', return_value=4 * 2**20):
+                self.assertEqual(get_predict_label_memory(), 2**20)
+            with patch(module + '.get_available_memory', return_value=None):
+                self.assertIsNone(get_predict_label_memory())
+
+        with patch.object(
+                rv_config,
+                'get_subconfig',
+                return_value=lambda key, default='': '3'):
+            self.assertEqual(get_predict_label_memory(), 3 * 2**20)
+
+    def test_blend_weights(self):
+        for blend in ['cosine', 'linear']:
+            weights = get_blend_weights(6, blend)
+            self.assertEqual(weights.shape, (6, 6))
+            self.assertTrue(np.all(weights > 0))
+            np.testing.assert_allclose(weights, weights.T)
+            np.testing.assert_allclose(weights, weights[::-1, ::-1])
+            self.assertEqual(weights.argmax(), 2 * 6 + 2)
+
+    def test_get_sliding_positions(self):
+        self.assertListEqual(get_sliding_positions(0, 10, 6, 4), [0, 4])
+        self.assertListEqual(get_sliding_positions(0, 11, 6, 4), [0, 4, 5])
+        self.assertListEqual(get_sliding_positions(2, 6, 6, 4), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
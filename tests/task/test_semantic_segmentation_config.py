@@ -71,6 +71,55 @@ class TestSemanticSegmentationConfig(unittest.TestCase):
 
         self.assertDictEqual(actual_class_items, expected_class_items)
 
+    def test_predict_prefetch_round_trip(self):
+        t = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                         .with_classes(['car', 'boat']) \
+                         .with_predict_prefetch(num_workers=4,
+                                                prefetch_batches=2) \
+                         .build()
+        self.assertEqual(t.predict_num_workers, 4)
+        self.assertEqual(t.predict_prefetch_batches, 2)
+
+        t2 = rv.TaskConfig.from_proto(t.to_proto())
+        self.assertEqual(t2.predict_num_workers, 4)
+        self.assertEqual(t2.predict_prefetch_batches, 2)
+
+        t3 = t2.to_builder().build()
+        self.assertEqual(t3.predict_num_workers, 4)
+        self.assertEqual(t3.predict_prefetch_batches, 2)
+
+    def test_predict_stride_round_trip(self):
+        t = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                         .with_classes(['car', 'boat']) \
+                         .with_predict_chip_size(200) \
+                         .with_predict_stride(100, blend='linear') \
+                         .build()
+        self.assertEqual(t.predict_stride, 100)
+        self.assertEqual(t.predict_blend, 'linear')
+
+        t2 = rv.TaskConfig.from_proto(t.to_proto())
+        self.assertEqual(t2.predict_stride, 100)
+        self.assertEqual(t2.predict_blend, 'linear')
+
+        t3 = t2.to_builder().build()
+        self.assertEqual(t3.predict_stride, 100)
+
+        t4 = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                          .with_classes(['car', 'boat']) \
+                          .build()
+        t4 = rv.TaskConfig.from_proto(t4.to_proto())
+        self.assertIsNone(t4.predict_stride)
+        self.assertEqual(t4.predict_blend, 'cosine')
+
+    def test_invalid_predict_stride(self):
+        b = rv.TaskConfig.builder(rv.SEMANTIC_SEGMENTATION) \
+                         .with_classes(['car', 'boat']) \
+                         .with_predict_chip_size(200)
+        with self.assertRaises(rv.ConfigError):
+            b.with_predict_stride(300).build()
+        with self.assertRaises(rv.ConfigError):
+            b.with_predict_stride(100, blend='gaussian').build()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.data import Scene
+
+from tests.mock.backend import MockBackend
+from tests.mock.raster_source import MockRasterSource
+from tests.mock.task import MockTask, MockTaskConfig
+
+
+class TestTask(unittest.TestCase):
+    def make_task(self, num_workers, worker_memory_mb=0):
+        task_config = MockTaskConfig()
+        task_config.chip_num_workers = num_workers
+        task_config.chip_worker_memory_mb = worker_memory_mb
+
+        backend = MockBackend()
+        backend.mock.process_scene_data.side_effect = \
+            lambda scene, data, tmp_dir: '{}-dir'.format(scene.id)
+        task = MockTask(task_config, backend)
+        task.mock.get_train_windows.return_value = [Box.make_square(0, 0, 2)]
+        return task
+
+    def make_scenes(self, prefix, sizes):
+        scenes = []
+        for ind, size in enumerate(sizes):
+            raster_source = MockRasterSource([0, 1, 2], 3)
+            raster_source.set_raster(np.ones((size, size, 3), dtype=np.uint8))
+            scenes.append(Scene('{}-{}'.format(prefix, ind), raster_source))
+        return scenes
+
+    def test_make_chips_in_pool(self):
+        train_scenes = self.make_scenes('train', [2, 8, 4])
+        val_scenes = self.make_scenes('val', [4, 16])
+        expected_train = ['train-0-dir', 'train-1-dir', 'train-2-dir']
+        expected_val = ['val-0-dir', 'val-1-dir']
+
+        for num_workers in [1, 3]:
+            task = self.make_task(num_workers)
+            task.make_chips(train_scenes, val_scenes, [], '/tmp')
+            task.backend.mock.process_sceneset_results.assert_called_once_with(
+                expected_train, expected_val, '/tmp')
+
+    def test_get_chip_num_workers(self):
+        task = self.make_task(8)
+        self.assertEqual(task.get_chip_num_workers(4), 4)
+        self.assertEqual(task.get_chip_num_workers(10), 8)
+
+        task = self.make_task(8, worker_memory_mb=100)
+        with patch(
+                'rastervision.task.task.get_available_memory',
+                return_value=300 * 1024 * 1024):
+            self.assertEqual(task.get_chip_num_workers(10), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import os
+import shutil
+import unittest
+from threading import Thread
+from unittest.mock import patch
+
+import numpy as np
+import rasterio
+
+import rastervision as rv
+from rastervision.rv_config import RVConfig
+from rastervision.utils.download_cache import (DownloadCache,
+                                               get_download_cache)
+from rastervision.utils.files import download_if_needed, file_to_str
+
+from tests.mock.http_server import RangeRequestServer
+
+
+class TestDownloadCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = RVConfig.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+        self.server_dir = os.path.join(self.tmp_dir, 'server')
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        os.makedirs(self.server_dir)
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def write_file(self, file_name, content, mtime=None):
+        path = os.path.join(self.server_dir, file_name)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def get_num_downloads(self, server, file_name):
+        return len([r for r in server.requests if r[0] == '/' + file_name])
+
+    def get(self, cache, uri):
+        with cache.use([uri]) as (path, ):
+            return path
+
+    def test_hit_and_miss(self):
+        self.write_file('a.txt', 'aaa')
+        cache = DownloadCache(self.cache_dir)
+        with RangeRequestServer(self.server_dir) as server:
+            uri = server.get_url('a.txt')
+            path1 = self.get(cache, uri)
+            path2 = self.get(cache, uri)
+            self.assertEqual(self.get_num_downloads(server, 'a.txt'), 1)
+
+            # The cache persists across instances.
+            other_cache = DownloadCache(self.cache_dir)
+            self.get(other_cache, uri)
+            self.assertEqual(self.get_num_downloads(server, 'a.txt'), 1)
+
+        self.assertEqual(path1, path2)
+        self.assertEqual(os.path.basename(path1), 'a.txt')
+        self.assertEqual(file_to_str(path1), 'aaa')
+        self.assertDictEqual(cache.get_stats(), {'hits': 1, 'misses': 1})
+        self.assertDictEqual(other_cache.get_stats(), {'hits': 1, 'misses': 0})
+
+    def test_changed_file(self):
+        self.write_file('a.txt', 'aaa', mtime=1000000)
+        cache = DownloadCache(self.cache_dir)
+        with RangeRequestServer(self.server_dir) as server:
+            uri = server.get_url('a.txt')
+            self.assertEqual(file_to_str(self.get(cache, uri)), 'aaa')
+            self.write_file('a.txt', 'bbb', mtime=2000000)
+            self.assertEqual(file_to_str(self.get(cache, uri)), 'bbb')
+            self.assertEqual(self.get_num_downloads(server, 'a.txt'), 2)
+
+    def test_evict(self):
+        cache = DownloadCache(self.cache_dir, max_bytes=25)
+        with RangeRequestServer(self.server_dir) as server:
+            paths = []
+            for i, file_name in enumerate(['a.txt', 'b.txt', 'c.txt']):
+                self.write_file(file_name, file_name[0] * 10)
+                paths.append(self.get(cache, server.get_url(file_name)))
+                # Make sure that the access times are different.
+                os.utime(os.path.dirname(paths[-1]), (i, i))
+
+        # The least recently used file is deleted.
+        self.assertFalse(os.path.isfile(paths[0]))
+        self.assertTrue(os.path.isfile(paths[1]))
+        self.assertTrue(os.path.isfile(paths[2]))
+        self.assertEqual(cache.get_size(), 20)
+
+    def test_evict_in_use(self):
+        cache = DownloadCache(self.cache_dir, max_bytes=15)
+        with RangeRequestServer(self.server_dir) as server:
+            for file_name in ['a.txt', 'b.txt', 'c.txt']:
+                self.write_file(file_name, file_name[0] * 10)
+            uris = [server.get_url(f) for f in ['a.txt', 'b.txt', 'c.txt']]
+            with cache.use(uris[:2]) as paths:
+                # Files that are used together are not evicted by each other, or
+                # by another process.
+                self.get(DownloadCache(self.cache_dir, max_bytes=15), uris[2])
+                self.assertTrue(all(os.path.isfile(p) for p in paths))
+                self.assertEqual(cache.get_size(), 30)
+
+            # Once they aren't in use, they can be evicted.
+            cache.evict()
+            self.assertFalse(any(os.path.isfile(p) for p in paths))
+            self.assertEqual(cache.get_size(), 10)
+
+    def test_concurrent_get(self):
+        self.write_file('a.txt', 'a' * 1000000)
+        with RangeRequestServer(self.server_dir) as server:
+            uri = server.get_url('a.txt')
+            paths = []
+
+            def get():
+                paths.append(self.get(DownloadCache(self.cache_dir), uri))
+
+            threads = [Thread(target=get) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(self.get_num_downloads(server, 'a.txt'), 1)
+        self.assertEqual(len(set(paths)), 1)
+
+    def test_vrt_larger_than_cache(self):
+        # Each tile is 768KB, so the tiles of the VRT don't fit in a 1MB cache.
+        tile_shape = (3, 512, 512)
+        for i in range(2):
+            with rasterio.open(
+                    os.path.join(self.server_dir, '{}.tif'.format(i)),
+                    'w',
+                    driver='GTiff',
+                    height=tile_shape[1],
+                    width=tile_shape[2],
+                    count=tile_shape[0],
+                    dtype=np.uint8) as dataset:
+                dataset.write(np.full(tile_shape, i, dtype=np.uint8))
+
+        vrt_tile_paths = []
+
+        def build_vrt(vrt_path, image_paths, gdal_options=None):
+            # All of the tiles must still exist when the VRT is built.
+            self.assertTrue(all(os.path.isfile(p) for p in image_paths))
+            vrt_tile_paths.extend(image_paths)
+            shutil.copyfile(image_paths[0], vrt_path)
+
+        overrides = {
+            'RV_download_cache_dir': self.cache_dir,
+            'RV_download_cache_size_mb': '1'
+        }
+        rv._registry.initialize_config(config_overrides=overrides)
+        try:
+            with RangeRequestServer(self.server_dir) as server:
+                source = rv.RasterSourceConfig.builder(rv.RASTERIO_SOURCE) \
+                    .with_uris([server.get_url('0.tif'),
+                                server.get_url('1.tif')]) \
+                    .build()
+                with patch(
+                        'rastervision.data.raster_source.rasterio_source.build_vrt',
+                        side_effect=build_vrt):
+                    source = source.create_source(tmp_dir=self.tmp_dir)
+                    with source.activate():
+                        # The tiles are not evicted while the source is active.
+                        self.assertTrue(
+                            all(
+                                p.startswith(self.cache_dir)
+                                for p in vrt_tile_paths))
+                        self.assertTrue(
+                            all(os.path.isfile(p) for p in vrt_tile_paths))
+
+            cache = get_download_cache()
+            self.assertGreater(cache.get_size(), cache.max_bytes)
+            cache.evict()
+            self.assertLessEqual(cache.get_size(), cache.max_bytes)
+        finally:
+            rv._registry.initialize_config()
+
+    def test_download_if_needed(self):
+        self.write_file('a.txt', 'aaa')
+        download_dir = os.path.join(self.tmp_dir, 'download')
+        overrides = {'RV_download_cache_dir': self.cache_dir}
+        rv._registry.initialize_config(config_overrides=overrides)
+        try:
+            self.assertEqual(get_download_cache().cache_dir, self.cache_dir)
+            with RangeRequestServer(self.server_dir) as server:
+                uri = server.get_url('a.txt')
+                path = download_if_needed(uri, download_dir, use_cache=True)
+                # The file is linked into the download directory, so that it
+                # remains valid if it is evicted from the cache.
+                self.assertTrue(path.startswith(download_dir))
+                self.assertEqual(get_download_cache().get_size(), 3)
+                path = download_if_needed(uri, download_dir, use_cache=True)
+                self.assertEqual(file_to_str(path), 'aaa')
+                path = download_if_needed(uri, download_dir)
+                self.assertEqual(self.get_num_downloads(server, 'a.txt'), 2)
+        finally:
+            # Reset the config.
+            rv._registry.initialize_config()
+        self.assertIsNone(get_download_cache())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,9 +12,11 @@ import rastervision as rv
 from rastervision.utils.files import (
     file_to_str, str_to_file, download_if_needed, upload_or_copy,
     load_json_config, ProtobufParseException, make_dir, get_local_path,
-    file_exists, sync_from_dir, sync_to_dir, list_paths, get_cached_file)
+    file_exists, files_exist, sync_from_dir, sync_to_dir, list_paths,
+    get_cached_file)
 from rastervision.filesystem import (NotReadableError, NotWritableError)
 from rastervision.filesystem.filesystem import FileSystem
+from rastervision.filesystem.s3_filesystem import S3FileSystem
 from rastervision.protos.task_pb2 import TaskConfig as TaskConfigMsg
 from rastervision.rv_config import RVConfig
 
@@ -353,6 +355,132 @@ class TestS3Misc(unittest.TestCase):
         self.assertFalse(
             file_exists(s3_directory + 'NOTPOSSIBLE', include_dir=False))
 
+    def test_files_exist_s3(self):
+        s3_dir = 's3://{}/xxx/'.format(self.bucket_name)
+        for name in ['a.txt', 'b.txt', 'c/d.txt']:
+            str_to_file(self.lorem, s3_dir + name)
+        uris = [
+            s3_dir + 'a.txt', s3_dir + 'b.txt', s3_dir + 'x.txt', s3_dir + 'c',
+            s3_dir, 's3://{}/yyy/a.txt'.format(self.bucket_name)
+        ]
+
+        # The files in xxx/ are checked with a single listing, and the only
+        # file in yyy/ is checked on its own.
+        S3FileSystem.reset_request_counts()
+        self.assertListEqual(
+            files_exist(uris), [True, True, False, True, True, False])
+        self.assertDictEqual(S3FileSystem.get_request_counts(), {
+            'ListObjectsV2': 2,
+            'HeadObject': 1
+        })
+
+        self.assertListEqual(
+            files_exist(uris, include_dir=False),
+            [True, True, False, False, False, False])
+        self.assertListEqual(
+            files_exist(uris),
+            [file_exists(uri, include_dir=True) for uri in uris])
+
+    def make_sync_files(self, dir_path):
+        str_to_file(self.lorem, os.path.join(dir_path, 'a.txt'))
+        str_to_file(self.lorem * 2, os.path.join(dir_path, 'b', 'c.txt'))
+
+    def test_sync_to_and_from_dir_s3(self):
+        src = os.path.join(self.temp_dir.name, 'src')
+        dst = os.path.join(self.temp_dir.name, 'dst')
+        s3_directory = 's3://{}/xxx'.format(self.bucket_name)
+        self.make_sync_files(src)
+
+        sync_to_dir(src, s3_directory)
+        self.assertSetEqual(
+            set(list_paths(s3_directory)), {
+                's3://{}/xxx/a.txt'.format(self.bucket_name),
+                's3://{}/xxx/b/c.txt'.format(self.bucket_name)
+            })
+
+        sync_from_dir(s3_directory, dst)
+        self.assertEqual(file_to_str(os.path.join(dst, 'a.txt')), self.lorem)
+        self.assertEqual(
+            file_to_str(os.path.join(dst, 'b', 'c.txt')), self.lorem * 2)
+
+        # Files that are up to date are not transferred again.
+        with patch('boto3.s3.inject.download_file') as download_file:
+            sync_from_dir(s3_directory, dst)
+            download_file.assert_not_called()
+        with patch('boto3.s3.inject.upload_file') as upload_file:
+            sync_to_dir(src, s3_directory)
+            upload_file.assert_not_called()
+
+    def test_sync_delete_s3(self):
+        src = os.path.join(self.temp_dir.name, 'src')
+        dst = os.path.join(self.temp_dir.name, 'dst')
+        s3_directory = 's3://{}/xxx/'.format(self.bucket_name)
+        self.make_sync_files(src)
+        sync_to_dir(src, s3_directory)
+        sync_from_dir(s3_directory, dst)
+
+        os.remove(os.path.join(src, 'a.txt'))
+        sync_to_dir(src, s3_directory, delete=False)
+        self.assertEqual(len(list_paths(s3_directory)), 2)
+        sync_to_dir(src, s3_directory, delete=True)
+        self.assertEqual(len(list_paths(s3_directory)), 1)
+
+        sync_from_dir(s3_directory, dst, delete=True)
+        self.assertFalse(os.path.isfile(os.path.join(dst, 'a.txt')))
+        self.assertTrue(os.path.isfile(os.path.join(dst, 'b', 'c.txt')))
+
+    def test_multipart_transfer_s3(self):
+        path = os.path.join(self.temp_dir.name, 'big.bin')
+        download_path = os.path.join(self.temp_dir.name, 'download', 'big.bin')
+        s3_path = 's3://{}/big.bin'.format(self.bucket_name)
+        data = os.urandom(12 * 1024 * 1024)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        overrides = {'AWS_S3_transfer_part_size_mb': '5'}
+        rv._registry.initialize_config(config_overrides=overrides)
+        try:
+            upload_or_copy(path, s3_path)
+            download_if_needed(s3_path, os.path.dirname(download_path))
+        finally:
+            # Reset the config.
+            rv._registry.initialize_config()
+
+        # The file is uploaded in 3 parts.
+        etag = self.s3.head_object(
+            Bucket=self.bucket_name, Key='big.bin')['ETag']
+        self.assertTrue(etag.endswith('-3"'))
+        with open(
+                get_local_path(s3_path, os.path.dirname(download_path)),
+                'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_client_pool_s3(self):
+        s3_path = 's3://{}/xxx/lorem.txt'.format(self.bucket_name)
+        str_to_file(self.lorem, s3_path)
+
+        # The same client is used for all calls.
+        client = S3FileSystem.get_client()
+        self.assertIs(S3FileSystem.get_client(), client)
+
+        S3FileSystem.reset_request_counts()
+        self.assertTrue(file_exists(s3_path, include_dir=False))
+        self.assertFalse(file_exists(s3_path + 'x', include_dir=False))
+        self.assertDictEqual(S3FileSystem.get_request_counts(),
+                             {'HeadObject': 2})
+        self.assertEqual(file_to_str(s3_path), self.lorem)
+        self.assertGreater(S3FileSystem.get_request_counts()['GetObject'], 0)
+
+        overrides = {'AWS_S3_max_pool_connections': '3'}
+        rv._registry.initialize_config(config_overrides=overrides)
+        try:
+            new_client = S3FileSystem.get_client()
+        finally:
+            # Reset the config.
+            rv._registry.initialize_config()
+        self.assertIsNot(new_client, client)
+        self.assertEqual(new_client.meta.config.max_pool_connections, 3)
+
 
 class TestLocalMisc(unittest.TestCase):
     def setUp(self):
@@ -457,6 +585,17 @@ class TestLocalMisc(unittest.TestCase):
         self.assertFalse(
             fs.file_exists(dir1 + 'NOTPOSSIBLE', include_dir=False))
 
+    def test_files_exist(self):
+        path1 = os.path.join(self.temp_dir.name, 'lorem', 'ipsum.txt')
+        dir1 = os.path.dirname(path1)
+        str_to_file(self.lorem, path1)
+
+        uris = [path1, dir1, dir1 + 'NOTPOSSIBLE']
+        self.assertListEqual(files_exist(uris), [True, True, False])
+        self.assertListEqual(
+            files_exist(uris, include_dir=False), [True, False, False])
+        self.assertListEqual(files_exist([]), [])
+
 
 class TestHttpMisc(unittest.TestCase):
     def setUp(self):
@@ -1,7 +1,10 @@
+import sys
 import unittest
+from unittest.mock import mock_open, patch
 
 from rastervision.utils.misc import (replace_nones_in_dict, set_nested_keys,
-                                     split_into_groups)
+                                     split_into_groups, prefetch_map,
+                                     get_available_memory)
 
 
 class TestMiscUtils(unittest.TestCase):
@@ -224,3 +227,39 @@ class TestMiscUtils(unittest.TestCase):
 
         g4 = split_into_groups(lst, 3)
         self.assertEqual(g4, [[1, 2], [3, 4], [5, 6]])
+
+    def test_prefetch_map(self):
+        items = list(range(20))
+        expected = [i * 2 for i in items]
+
+        for num_workers in [0, 1, 4]:
+            for prefetch_size in [0, 1, 5, 50]:
+                results = list(
+                    prefetch_map(
+                        lambda i: i * 2,
+                        items,
+                        num_workers=num_workers,
+                        prefetch_size=prefetch_size))
+                self.assertEqual(results, expected)
+
+    def test_prefetch_map_raises(self):
+        def fn(i):
+            if i == 3:
+                raise ValueError()
+            return i
+
+        with self.assertRaises(ValueError):
+            list(prefetch_map(fn, range(10), num_workers=2, prefetch_size=2))
+
+    def test_get_available_memory(self):
+        meminfo = ('MemTotal:       16384 kB\n'
+                   'MemFree:         1024 kB\n'
+                   'MemAvailable:    8192 kB\n')
+        # Without psutil, reclaimable memory is read from /proc/meminfo.
+        with patch.dict(sys.modules, {'psutil': None}):
+            with patch('builtins.open', mock_open(read_data=meminfo)):
+                self.assertEqual(get_available_memory(), 8192 * 1024)
+
+            with patch('builtins.open', side_effect=OSError()), \
+                    patch('os.sysconf', return_value=4):
+                self.assertEqual(get_available_memory(), 16)